@@ -1,6 +1,8 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file, Response, stream_with_context, abort, session
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from sqlalchemy import func, text
+import click
+import json
 import os
 from dotenv import load_dotenv
 
@@ -8,31 +10,65 @@ load_dotenv()
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///jobtracker.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///jobtracker.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['UPLOAD_FOLDER'] = 'static/uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['MAX_BATCH_URLS'] = int(os.getenv('MAX_BATCH_URLS', 100))
 
-from models import db, Job, User, Application, Company, JobNote, FollowUp, Contact
+from models import db, Job, User, Application, Company, JobNote, FollowUp, Contact, CVDocument, SavedSearch, DEFAULT_USER_ID, upgrade_schema
 from services.ai_service import ai_service
-from services.job_scraper import job_scraper
+from services.job_scraper import job_scraper, JOBSPY_SITES
+from services.async_job_scraper import scrape_worker
 from services.cv_processor import cv_processor
+from services.pdf_extractor import pdf_extractor
+from services.extraction_pipeline import extraction_pipeline
+from services.artifact_store import artifact_store
+from services.fit_scorer import fit_scorer
+from services.job_deduplicator import job_deduplicator
+from services.search_scheduler import search_scheduler
+from services.tracing import tracer
+from services.profiler import profiler, PROFILE_PARAM
+from services.read_models import JOB_CARD, JOB_SEARCH_RESULT
+from services.fragment_cache import fragment_cache
 
+# First, so the request span covers the other extensions' request hooks
+tracer.init_app(app)
+profiler.init_app(app)
 db.init_app(app)
+extraction_pipeline.init_app(app)
+fit_scorer.init_app(app)
+job_deduplicator.init_app(app)
+search_scheduler.init_app(app)
+fragment_cache.init_app(app)
+
+def current_user_id(user_session=None) -> int:
+    """
+    Owner of everything the request reads or writes: ``session['user_id']``
+
+    Nothing sets that key yet (there is no sign-in), so every request runs as
+    DEFAULT_USER_ID until one does; the per-user scoping is in place for it.
+    Pass ``user_session`` to read a session opened outside a request context.
+    """
+    return (session if user_session is None else user_session).get('user_id', DEFAULT_USER_ID)
+
+def _user_job(job_id: int) -> Job:
+    """The current user's job, or 404 (other users' jobs don't exist as far as the request knows)"""
+    return Job.query.filter_by(id=job_id, user_id=current_user_id()).first_or_404()
 
 @app.route('/')
 def index():
-    jobs = Job.query.all()
-    saved_jobs = Job.query.filter_by(status='saved').all()
-    applied_jobs = Job.query.filter_by(status='applied').all()
-    interview_jobs = Job.query.filter_by(status='interview').all()
-    offered_jobs = Job.query.filter_by(status='offered').all()
+    # One projection query for the whole board instead of a full Job load per column
+    columns = {'saved': [], 'applied': [], 'interview': [], 'offered': []}
+    board = JOB_CARD.select().where(JOB_CARD.c.user_id == current_user_id(), JOB_CARD.c.status.in_(columns))
+    for job in JOB_CARD.all(board.order_by(JOB_CARD.c.id)):
+        columns[job.status].append(job)
     
     return render_template('index.html', 
-                         saved_jobs=saved_jobs,
-                         applied_jobs=applied_jobs,
-                         interview_jobs=interview_jobs,
-                         offered_jobs=offered_jobs)
+                         saved_jobs=columns['saved'],
+                         applied_jobs=columns['applied'],
+                         interview_jobs=columns['interview'],
+                         offered_jobs=columns['offered'])
 
 @app.route('/add_job', methods=['GET', 'POST'])
 def add_job():
@@ -44,6 +80,7 @@ def add_job():
         location = request.form.get('location', '')
         
         job = Job(
+            user_id=current_user_id(),
             url=url,
             title=title,
             company=company,
@@ -57,21 +94,45 @@ def add_job():
         db.session.commit()
         
         flash('Job added successfully!', 'success')
+        duplicate = job_deduplicator.duplicate_of(job.id)
+        if duplicate:
+            flash(f'This looks like a repost of "{duplicate[0].title}" at {duplicate[0].company} '
+                  f'({duplicate[1]:.0%} similar). You can merge it from the job page.', 'warning')
         return redirect(url_for('index'))
     
     return render_template('job_form.html')
 
 @app.route('/job/<int:job_id>')
 def job_detail(job_id):
-    job = Job.query.get_or_404(job_id)
-    return render_template('job_detail.html', job=job)
+    job = _user_job(job_id)
+    duplicate = job_deduplicator.duplicate_of(job_id)
+    return render_template('job_detail.html', job=job,
+                           duplicate_of=duplicate[0] if duplicate else None,
+                           duplicate_similarity=duplicate[1] if duplicate else None)
+
+@app.route('/merge_job/<int:job_id>', methods=['POST'])
+def merge_job(job_id):
+    """Merge a flagged near-duplicate job into the original posting"""
+    _user_job(job_id)
+    duplicate = job_deduplicator.duplicate_of(job_id)
+    if duplicate is None:
+        flash('This job is not flagged as a duplicate', 'error')
+        return redirect(url_for('job_detail', job_id=job_id))
+    
+    original = duplicate[0]
+    if job_deduplicator.merge(job_id, original.id):
+        flash('Duplicate merged into the original posting', 'success')
+        return redirect(url_for('job_detail', job_id=original.id))
+    
+    flash('Failed to merge duplicate job', 'error')
+    return redirect(url_for('job_detail', job_id=job_id))
 
 @app.route('/update_job_status', methods=['POST'])
 def update_job_status():
     job_id = request.json['job_id']
     new_status = request.json['status']
     
-    job = Job.query.get_or_404(job_id)
+    job = _user_job(job_id)
     job.status = new_status
     
     if new_status == 'applied' and not job.date_applied:
@@ -83,7 +144,7 @@ def update_job_status():
 
 @app.route('/delete_job/<int:job_id>', methods=['POST'])
 def delete_job(job_id):
-    job = Job.query.get_or_404(job_id)
+    job = _user_job(job_id)
     db.session.delete(job)
     db.session.commit()
     
@@ -104,6 +165,44 @@ def scrape_job_url():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/scrape_job_urls', methods=['POST'])
+def scrape_job_urls():
+    """Auto-fill many job postings at once, streaming one JSON line per URL as it finishes"""
+    urls = (request.json or {}).get('urls', [])
+    if isinstance(urls, str):
+        urls = urls.split()
+    
+    # Drop blanks and repeats, keeping the pasted order
+    urls = list(dict.fromkeys(url.strip() for url in urls if isinstance(url, str) and url.strip()))
+    if not urls:
+        return jsonify({'success': False, 'error': 'No URLs provided'})
+    if len(urls) > app.config['MAX_BATCH_URLS']:
+        return jsonify({'success': False, 'error': f"At most {app.config['MAX_BATCH_URLS']} URLs per batch"})
+    invalid = [url for url in urls if not url.startswith(('http://', 'https://'))]
+    if invalid:
+        return jsonify({'success': False, 'error': f'Not a web URL: {invalid[0]}'})
+    
+    def generate():
+        for result in scrape_worker.extract_many(urls):
+            yield json.dumps(result) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/scraper/cache')
+def api_scraper_cache():
+    """Hit rate and size of the scraper's HTTP cache"""
+    return jsonify(job_scraper.cache.stats())
+
+@app.route('/api/fragments/cache')
+def api_fragment_cache():
+    """Hit rate and size of the rendered job card and job page fragment cache"""
+    return jsonify(fragment_cache.stats())
+
+@app.route('/api/scraper/extractors')
+def api_scraper_extractors():
+    """Selector hit rates per scraped domain (or just ?domain=example.com), best selector first"""
+    return jsonify(job_scraper.extractors.stats(request.args.get('domain') or None))
+
 @app.route('/cv_customizer')
 def cv_customizer():
     """CV customization interface"""
@@ -121,25 +220,37 @@ def upload_cv():
         flash('No file selected', 'error')
         return redirect(url_for('cv_customizer'))
     
-    result = cv_processor.save_uploaded_file(file)
-    if result is None:
+    document = cv_processor.store_uploaded_file(file, current_user_id())
+    if document is None:
         flash('Failed to upload CV. Please check file type and size.', 'error')
         return redirect(url_for('cv_customizer'))
     
-    filepath, extracted_text = result
+    # Extraction runs in the background; the page polls cv_document_status
+    ready = document.extraction_status == 'done'
+    if not ready:
+        extraction_pipeline.submit(document)
     
-    # For now, we'll just return the extracted text
-    # In a full app, you'd save this to the user's profile
     flash('CV uploaded successfully!', 'success')
     return render_template('cv_customizer.html', 
                          ai_available=ai_service.is_available(),
-                         cv_text=extracted_text,
-                         cv_path=filepath)
+                         cv_text=cv_processor.get_cached_text(document.filepath) if ready else None,
+                         cv_document=document)
+
+@app.route('/cv_documents/<int:document_id>/status', methods=['GET'])
+def cv_document_status(document_id):
+    """Get extraction progress (and the text once ready) for an uploaded CV"""
+    document = CVDocument.query.filter_by(id=document_id, user_id=current_user_id()).first_or_404()
+    response = {'success': True, 'id': document.id, 'status': document.extraction_status}
+    if document.extraction_status == 'done':
+        response['cv_text'] = cv_processor.get_cached_text(document.filepath)
+    elif document.extraction_status == 'failed':
+        response['error'] = document.extraction_error
+    return jsonify(response)
 
 @app.route('/customize_cv/<int:job_id>', methods=['POST'])
 def customize_cv(job_id):
     """Customize CV for a specific job"""
-    job = Job.query.get_or_404(job_id)
+    job = _user_job(job_id)
     cv_text = request.form.get('cv_text', '')
     
     if not cv_text:
@@ -160,7 +271,7 @@ def customize_cv(job_id):
         
         if customized_cv:
             # Save the customized CV
-            cv_path = cv_processor.save_customized_cv(customized_cv, job_id)
+            cv_path = cv_processor.save_customized_cv(customized_cv, job_id, current_user_id())
             flash('CV customized successfully!', 'success')
             
             return render_template('customized_cv.html', 
@@ -178,7 +289,7 @@ def customize_cv(job_id):
 @app.route('/generate_cover_letter/<int:job_id>', methods=['POST'])
 def generate_cover_letter(job_id):
     """Generate cover letter for a specific job"""
-    job = Job.query.get_or_404(job_id)
+    job = _user_job(job_id)
     cv_text = request.form.get('cv_text', '')
     user_name = request.form.get('user_name', '')
     
@@ -201,7 +312,7 @@ def generate_cover_letter(job_id):
         
         if cover_letter:
             # Save the cover letter
-            letter_path = cv_processor.save_cover_letter(cover_letter, job_id)
+            letter_path = cv_processor.save_cover_letter(cover_letter, job_id, current_user_id())
             flash('Cover letter generated successfully!', 'success')
             
             return render_template('cover_letter.html', 
@@ -219,7 +330,7 @@ def generate_cover_letter(job_id):
 @app.route('/research_company/<int:job_id>')
 def research_company(job_id):
     """Research company for a specific job"""
-    job = Job.query.get_or_404(job_id)
+    job = _user_job(job_id)
     
     if not job.company:
         flash('No company name available for research', 'error')
@@ -250,43 +361,60 @@ def research_company(job_id):
 @app.route('/job_search')
 def job_search():
     """Job search interface using JobSpy"""
-    return render_template('job_search.html')
+    return render_template('job_search.html', default_country=job_scraper.jobspy_country,
+                           default_hours_old=job_scraper.jobspy_hours_old)
+
+def _tracked_jobs(urls, user_id: int) -> dict:
+    """Map each URL the user already saved as a Job to its id, with one indexed IN query"""
+    urls = {url for url in urls if url}
+    if not urls:
+        return {}
+    tracked = db.session.query(Job.id, Job.url).filter(Job.user_id == user_id, Job.url.in_(urls))
+    return {url: job_id for job_id, url in tracked}
+
+def _search_params(form) -> dict:
+    """Search options from the job search form (or its JSON equivalent)"""
+    sites = form.getlist('sites') if hasattr(form, 'getlist') else form.get('sites', [])
+    sites = [site for site in (sites or [form.get('site', 'indeed')]) if site in JOBSPY_SITES]
+    hours_old = form.get('hours_old')
+    return {
+        'search_term': form.get('search_term', ''),
+        'location': form.get('location', ''),
+        'sites': list(dict.fromkeys(sites)) or ['indeed'],
+        'results_wanted': int(form.get('results_wanted', 10)),
+        'hours_old': int(hours_old) if str(hours_old or '').isdigit() else None,
+        'country': form.get('country') or None,
+    }
 
 @app.route('/search_jobs', methods=['POST'])
 def search_jobs():
-    """Search for jobs using JobSpy"""
-    search_term = request.form.get('search_term', '')
-    location = request.form.get('location', '')
-    site = request.form.get('site', 'indeed')
-    results_wanted = int(request.form.get('results_wanted', 10))
+    """Search for jobs using JobSpy; results stream into the page from search_jobs_stream"""
+    params = _search_params(request.form)
     
-    if not search_term:
+    if not params['search_term']:
         flash('Please enter a search term', 'error')
         return redirect(url_for('job_search'))
     
-    try:
-        jobs = job_scraper.scrape_with_jobspy(
-            site=site,
-            search_term=search_term,
-            location=location,
-            results_wanted=results_wanted
-        )
-        
-        if jobs is None:
-            flash('Job scraping service not available', 'error')
-            return redirect(url_for('job_search'))
-        elif len(jobs) == 0:
-            flash('No jobs found for your search criteria', 'warning')
-            return redirect(url_for('job_search'))
-        else:
-            return render_template('search_results.html', 
-                                 jobs=jobs, 
-                                 search_term=search_term,
-                                 location=location)
-            
-    except Exception as e:
-        flash(f'Job search failed: {str(e)}', 'error')
-        return redirect(url_for('job_search'))
+    return render_template('search_results.html', search=params,
+                           search_term=params['search_term'], location=params['location'])
+
+@app.route('/search_jobs/stream', methods=['POST'])
+def search_jobs_stream():
+    """Query the selected job boards concurrently, streaming one JSON line per board as it finishes"""
+    params = _search_params(request.json or {})
+    if not params['search_term']:
+        return jsonify({'success': False, 'error': 'Please enter a search term'})
+    
+    user_id = current_user_id()
+    
+    def generate():
+        for result in job_scraper.search_sites(**params):
+            tracked = _tracked_jobs((job['url'] for job in result['jobs']), user_id)
+            for job in result['jobs']:
+                job['saved_job_id'] = tracked.get(job['url'])
+            yield json.dumps(result, default=str) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 @app.route('/save_scraped_job', methods=['POST'])
 def save_scraped_job():
@@ -294,12 +422,14 @@ def save_scraped_job():
     job_data = request.json
     
     job = Job(
+        user_id=current_user_id(),
         url=job_data.get('url', ''),
         title=job_data.get('title', ''),
         company=job_data.get('company', ''),
         description=job_data.get('description', ''),
         location=job_data.get('location', ''),
         salary_range=job_data.get('salary', ''),
+        job_type=job_data.get('job_type', ''),
         status='saved',
         date_added=datetime.utcnow()
     )
@@ -307,23 +437,106 @@ def save_scraped_job():
     db.session.add(job)
     db.session.commit()
     
-    return jsonify({'success': True, 'job_id': job.id})
+    duplicate = job_deduplicator.duplicate_of(job.id)
+    return jsonify({'success': True, 'job_id': job.id,
+                    'duplicate_of': duplicate[0].id if duplicate else None})
+
+@app.route('/saved_searches')
+def saved_searches():
+    """Saved searches with their schedule and recent runs"""
+    searches = SavedSearch.query.filter_by(user_id=current_user_id()).order_by(SavedSearch.created_at.desc()).all()
+    return render_template('saved_searches.html', searches=searches, scheduler=search_scheduler)
+
+@app.route('/saved_searches', methods=['POST'])
+def create_saved_search():
+    """Save a search from the results page so the scheduler reruns it"""
+    params = _search_params(request.form)
+    if not params['search_term']:
+        flash('Please enter a search term', 'error')
+        return redirect(url_for('job_search'))
+    
+    search = SavedSearch(
+        user_id=current_user_id(),
+        name=request.form.get('name') or params['search_term'],
+        search_term=params['search_term'],
+        location=params['location'],
+        sites=','.join(params['sites']),
+        results_wanted=params['results_wanted'],
+        hours_old=params['hours_old'],
+        country=params['country'],
+        interval_minutes=max(15, request.form.get('interval_minutes', 1440, type=int)),
+        next_run_at=datetime.utcnow()  # first run on the scheduler's next poll
+    )
+    db.session.add(search)
+    db.session.commit()
+    
+    flash(f'Saved search "{search.name}"; new postings will be added to your saved jobs', 'success')
+    return redirect(url_for('saved_searches'))
+
+@app.route('/saved_searches/<int:search_id>/run', methods=['POST'])
+def run_saved_search(search_id):
+    """Run a saved search now, in the background"""
+    search = SavedSearch.query.filter_by(id=search_id, user_id=current_user_id()).first_or_404()
+    if search_scheduler.run_now(search.id) is None:
+        flash(f'"{search.name}" is already running', 'warning')
+    else:
+        flash(f'Running "{search.name}"; refresh to see the results', 'success')
+    return redirect(url_for('saved_searches'))
+
+@app.route('/saved_searches/<int:search_id>/toggle', methods=['POST'])
+def toggle_saved_search(search_id):
+    """Pause or resume a saved search"""
+    search = SavedSearch.query.filter_by(id=search_id, user_id=current_user_id()).first_or_404()
+    search.enabled = not search.enabled
+    if search.enabled and search.next_run_at < datetime.utcnow():
+        search.next_run_at = datetime.utcnow()
+    db.session.commit()
+    return redirect(url_for('saved_searches'))
+
+@app.route('/saved_searches/<int:search_id>/delete', methods=['POST'])
+def delete_saved_search(search_id):
+    search = SavedSearch.query.filter_by(id=search_id, user_id=current_user_id()).first_or_404()
+    # Claimed so that no run starts between this check and the delete
+    if not search_scheduler.claim(search.id):
+        flash(f'"{search.name}" is running; delete it once the run finishes', 'warning')
+        return redirect(url_for('saved_searches'))
+    db.session.delete(search)
+    db.session.commit()
+    
+    flash('Saved search deleted', 'success')
+    return redirect(url_for('saved_searches'))
 
 @app.route('/get_cv_list', methods=['GET'])
 def get_cv_list():
     """Get list of uploaded CVs for selection"""
-    cv_files = cv_processor.list_uploaded_cvs()
+    cv_files = cv_processor.list_uploaded_cvs(current_user_id())
     return jsonify({'success': True, 'cvs': cv_files})
 
 @app.route('/get_cv_text/<filename>', methods=['GET'])
 def get_cv_text(filename):
     """Get CV text content by filename"""
-    cv_text = cv_processor.get_cv_text_by_filename(filename)
+    cv_text = cv_processor.get_cv_text_by_filename(filename, current_user_id())
     if cv_text:
         return jsonify({'success': True, 'cv_text': cv_text})
     else:
         return jsonify({'success': False, 'error': 'Could not extract CV text'})
 
+@app.route('/api/fit/scores')
+def api_fit_scores():
+    """Rank jobs by how well the newest uploaded CV (or ?cv=<filename>) fits them"""
+    cv_filename = request.args.get('cv', '')
+    user_id = current_user_id()
+    cv_text = (cv_processor.get_cv_text_by_filename(cv_filename, user_id) if cv_filename
+               else cv_processor.latest_cv_text(user_id))
+    if not cv_text:
+        return jsonify({'success': False, 'error': 'Upload a CV to see fit scores'})
+    
+    job_ids = [int(job_id) for job_id in request.args.get('job_ids', '').split(',') if job_id.isdigit()]
+    limit = request.args.get('limit', type=int)
+    
+    scores = fit_scorer.score_jobs(cv_text, user_id, job_ids=job_ids or None, limit=limit)
+    return jsonify({'success': True, 'scores': scores, 'total': len(scores)})
+
 @app.route('/analytics')
 def analytics():
     """Analytics dashboard with job search insights"""
@@ -332,11 +545,14 @@ def analytics():
 @app.route('/api/analytics/overview')
 def analytics_overview():
     """Get overview analytics data"""
-    total_jobs = Job.query.count()
-    saved_count = Job.query.filter_by(status='saved').count()
-    applied_count = Job.query.filter_by(status='applied').count()
-    interview_count = Job.query.filter_by(status='interview').count()
-    offered_count = Job.query.filter_by(status='offered').count()
+    # One grouped count over the (user_id, status) index instead of a count per status
+    counts = dict(db.session.query(Job.status, func.count(Job.id))
+                  .filter(Job.user_id == current_user_id()).group_by(Job.status))
+    total_jobs = sum(counts.values())
+    saved_count = counts.get('saved', 0)
+    applied_count = counts.get('applied', 0)
+    interview_count = counts.get('interview', 0)
+    offered_count = counts.get('offered', 0)
     
     # Success rate (offered/applied)
     success_rate = (offered_count / applied_count * 100) if applied_count > 0 else 0
@@ -366,6 +582,7 @@ def analytics_timeline():
         func.date(Job.date_added).label('date'),
         func.count(Job.id).label('count')
     ).filter(
+        Job.user_id == current_user_id(),
         Job.date_added >= thirty_days_ago
     ).group_by(
         func.date(Job.date_added)
@@ -386,6 +603,7 @@ def analytics_companies():
         func.sum(func.case([(Job.status == 'interview', 1)], else_=0)).label('interview'),
         func.sum(func.case([(Job.status == 'offered', 1)], else_=0)).label('offered')
     ).filter(
+        Job.user_id == current_user_id(),
         Job.company.isnot(None),
         Job.company != ''
     ).group_by(
@@ -419,6 +637,7 @@ def analytics_locations():
         func.sum(func.case([(Job.status == 'applied', 1)], else_=0)).label('applied'),
         func.sum(func.case([(Job.status == 'offered', 1)], else_=0)).label('offered')
     ).filter(
+        Job.user_id == current_user_id(),
         Job.location.isnot(None),
         Job.location != ''
     ).group_by(
@@ -450,60 +669,46 @@ def api_search_jobs():
     location_filter = request.args.get('location', '')
     sort_by = request.args.get('sort', 'date_desc')
     
-    # Build query
-    query = Job.query
+    # Build query (a column projection; see services/read_models.py)
+    columns = JOB_SEARCH_RESULT.c
+    query = JOB_SEARCH_RESULT.select().where(columns.user_id == current_user_id())
     
     # Apply text search
     if search_text:
         search_term = f"%{search_text}%"
-        query = query.filter(
+        query = query.where(
             db.or_(
-                Job.title.ilike(search_term),
-                Job.company.ilike(search_term),
-                Job.description.ilike(search_term),
-                Job.location.ilike(search_term)
+                columns.title.ilike(search_term),
+                columns.company.ilike(search_term),
+                columns.description.ilike(search_term),
+                columns.location.ilike(search_term)
             )
         )
     
     # Apply status filter
     if status_filter:
-        query = query.filter(Job.status == status_filter)
+        query = query.where(columns.status == status_filter)
     
     # Apply location filter
     if location_filter:
-        query = query.filter(Job.location.ilike(f"%{location_filter}%"))
+        query = query.where(columns.location.ilike(f"%{location_filter}%"))
     
     # Apply sorting
     if sort_by == 'date_desc':
-        query = query.order_by(Job.date_added.desc())
+        query = query.order_by(columns.date_added.desc())
     elif sort_by == 'date_asc':
-        query = query.order_by(Job.date_added.asc())
+        query = query.order_by(columns.date_added.asc())
     elif sort_by == 'company_asc':
-        query = query.order_by(Job.company.asc())
+        query = query.order_by(columns.company.asc())
     elif sort_by == 'company_desc':
-        query = query.order_by(Job.company.desc())
+        query = query.order_by(columns.company.desc())
     elif sort_by == 'title_asc':
-        query = query.order_by(Job.title.asc())
+        query = query.order_by(columns.title.asc())
     elif sort_by == 'title_desc':
-        query = query.order_by(Job.title.desc())
-    
-    jobs = query.all()
+        query = query.order_by(columns.title.desc())
     
     # Convert to JSON
-    jobs_data = []
-    for job in jobs:
-        jobs_data.append({
-            'id': job.id,
-            'title': job.title or 'Untitled Job',
-            'company': job.company or 'Unknown Company',
-            'location': job.location or '',
-            'status': job.status,
-            'date_added': job.date_added.strftime('%m/%d/%Y'),
-            'date_applied': job.date_applied.strftime('%m/%d/%Y') if job.date_applied else None,
-            'url': job.url,
-            'salary_range': job.salary_range or '',
-            'description': job.description or ''
-        })
+    jobs_data = JOB_SEARCH_RESULT.serialize_all(JOB_SEARCH_RESULT.all(query))
     
     return jsonify({
         'success': True,
@@ -515,6 +720,7 @@ def api_search_jobs():
 def get_locations():
     """Get unique locations for filter dropdown"""
     locations = db.session.query(Job.location).filter(
+        Job.user_id == current_user_id(),
         Job.location.isnot(None),
         Job.location != ''
     ).distinct().all()
@@ -524,10 +730,133 @@ def get_locations():
     
     return jsonify({'locations': location_list})
 
-if __name__ == '__main__':
+def _profile_auth() -> dict:
+    """404 unless the request carries the profiler token; returns the query args that keep it on links"""
+    if not profiler.authorized(request):
+        abort(404)
+    return {PROFILE_PARAM: request.args[PROFILE_PARAM]} if PROFILE_PARAM in request.args else {}
+
+@app.route('/admin/profiles')
+@profiler.exempt
+def profile_reports():
+    """Stored request profiles, newest first"""
+    auth = _profile_auth()
+    return render_template('profiles.html', reports=profiler.reports(), keep=profiler.keep, auth=auth)
+
+@app.route('/admin/profiles/<profile_id>')
+@profiler.exempt
+def profile_report(profile_id):
+    """Flamegraph and hottest functions of one request profile"""
+    auth = _profile_auth()
+    report = profiler.report(profile_id)
+    if report is None:
+        abort(404)
+    return render_template('profile.html', report=report, tree=profiler.flamegraph(report),
+                           hottest=profiler.hottest(report), auth=auth)
+
+@app.route('/admin/profiles/<profile_id>/folded')
+@profiler.exempt
+def profile_folded(profile_id):
+    """Collapsed stacks of a request profile, for flamegraph.pl or speedscope"""
+    _profile_auth()
+    report = profiler.report(profile_id)
+    if report is None:
+        abort(404)
+    return Response(profiler.collapsed(report), mimetype='text/plain',
+                    headers={'Content-Disposition': f'attachment; filename={profile_id}.folded'})
+
+@app.cli.command('upgrade-db')
+def upgrade_db():
+    """Create missing tables, columns and indexes (what `python app.py` does on start)"""
+    upgrade_schema()
+    click.echo(f"tables={len(db.metadata.tables)}, default_user_id={DEFAULT_USER_ID}")
+
+@app.cli.command('sweep-artifacts')
+@click.option('--retention-days', type=int, default=None, help='Keep unreferenced artifacts younger than this')
+@click.option('--batch-size', type=int, default=500, help='Rows or files handled per batch')
+@click.option('--dry-run', is_flag=True, help='Report what would be removed without removing it')
+def sweep_artifacts(retention_days, batch_size, dry_run):
+    """Remove generated CVs and cover letters no application points at"""
+    stats = artifact_store.sweep(retention_days=retention_days, batch_size=batch_size, dry_run=dry_run)
+    click.echo(', '.join(f"{key}={value}" for key, value in stats.items()))
+
+@app.cli.command('dedupe-jobs')
+@click.option('--threshold', type=float, default=None, help='Similarity (0-1) needed to flag a duplicate')
+@click.option('--batch-size', type=int, default=500, help='Jobs indexed per transaction')
+@click.option('--merge', is_flag=True, help='Merge flagged duplicates into the original postings')
+def dedupe_jobs(threshold, batch_size, merge):
+    """Rebuild duplicate signatures for all jobs and flag (or merge) near-duplicates"""
+    stats = job_deduplicator.backfill(threshold=threshold, batch_size=batch_size, merge=merge)
+    click.echo(', '.join(f"{key}={value}" for key, value in stats.items()))
+
+@app.cli.command('run-searches')
+@click.option('--search-id', type=int, default=None, help='Run this saved search whether or not it is due')
+def run_searches(search_id):
+    """Run due saved searches once and wait for them (for cron instead of the in-process scheduler)"""
+    if search_id is not None:
+        future = search_scheduler.run_now(search_id)
+        if future is None:
+            click.echo(f"search_id={search_id}, status=already_running")
+        futures = [future] if future is not None else []
+    else:
+        futures = search_scheduler.run_due()
+    while futures:
+        for future in futures:
+            stats = future.result()
+            click.echo(', '.join(f"{key}={value}" for key, value in stats.items()))
+        # run_due claims at most one search per worker, so keep going until none are due
+        futures = search_scheduler.run_due() if search_id is None else []
+    search_scheduler.shutdown()
+
+@app.cli.command('trace-report')
+@click.option('--slowest', type=int, default=5, help='Number of traces to show, slowest first')
+@click.option('--trace-id', default=None, help='Show only this trace (the X-Trace-Id response header)')
+def trace_report(slowest, trace_id):
+    """Break the slowest traced requests in TRACE_FILE down stage by stage"""
+    traces = tracer.read(trace_id=trace_id, limit=slowest)
+    if not traces:
+        click.echo(f"No traces found in {tracer.path or 'TRACE_FILE (not set)'}")
+        return
+    for trace in traces:
+        click.echo(f"\n{trace['name']}  trace_id={trace['trace_id']}  duration_ms={trace['duration_ms']}")
+        for line in tracer.breakdown(trace):
+            click.echo(line)
+
+def migrate():
+    """
+    Upgrade the schema and index legacy uploads before serving
+
+    Runs once per start: in this process for `python app.py`, in gunicorn's
+    master before it forks workers (see gunicorn.conf.py).
+    """
     with app.app_context():
-        db.create_all()
-        
-        os.makedirs('static/uploads', exist_ok=True)
+        upgrade_schema()
+        os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+        cv_processor.backfill_documents()
+        # Forked workers must not inherit this process's pooled connections
+        db.engine.dispose()
+
+def warm_up():
+    """Open a pooled database connection and compile every template before the first request"""
+    with app.app_context():
+        db.session.execute(text('SELECT 1'))
+        db.session.remove()
+    for name in app.jinja_env.list_templates(extensions=['html']):
+        app.jinja_env.get_template(name)
+
+def shut_down():
+    """Stop taking background work, let running saved searches and extractions finish, and close connection pools"""
+    search_scheduler.shutdown()
+    extraction_pipeline.shutdown()
+    pdf_extractor.shutdown()
+    scrape_worker.shutdown()
+    with app.app_context():
+        db.engine.dispose()
+
+if __name__ == '__main__':
+    migrate()
     
+    # The reloader runs this module twice; only its child process serves requests
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        search_scheduler.start()
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""
+ASGI entry point.
+
+Serves the async AI endpoints natively on the event loop and hands every
+other request to the Flask app through asgiref's WSGI adapter:
+
+    uvicorn asgi:application --port 5000
+
+Async endpoints (JSON in, JSON out):
+    POST /api/ai/customize_cv/<job_id>           {"cv_text": "..."}
+    POST /api/ai/generate_cover_letter/<job_id>  {"cv_text": "...", "user_name": "..."}
+    GET  /api/ai/research_company/<job_id>
+"""
+import asyncio
+import io
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from asgiref.wsgi import WsgiToAsgi
+
+from app import app, current_user_id
+from models import Job
+from services.async_ai_service import async_ai_service
+from services.cv_processor import cv_processor
+from services.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+AI_ROUTE = re.compile(r'^/api/ai/(customize_cv|generate_cover_letter|research_company)/(\d+)/?$')
+
+flask_application = WsgiToAsgi(app)
+
+
+def _environ(scope) -> Dict[str, Any]:
+    """WSGI environ for an HTTP scope, without the body (the async endpoints read it themselves)"""
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(),
+    }
+    for name, value in scope['headers']:
+        key = name.decode('latin-1').upper().replace('-', '_')
+        key = key if key in ('CONTENT_TYPE', 'CONTENT_LENGTH') else f'HTTP_{key}'
+        value = value.decode('latin-1')
+        environ[key] = f'{environ[key]}, {value}' if key in environ else value
+    return environ
+
+
+def _session_user_id(scope) -> int:
+    """The caller's user, from the Flask session the app's session interface opens for this request"""
+    user_session = app.session_interface.open_session(app, app.request_class(_environ(scope)))
+    return current_user_id(user_session or {})
+
+
+def _load_job(job_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+    """Fetch the fields the AI calls need from the caller's own job (runs in a worker thread)"""
+    with app.app_context():
+        job = Job.query.filter_by(id=job_id, user_id=user_id).first()
+        if job is None:
+            return None
+        return {
+            'user_id': user_id,
+            'title': job.title or '',
+            'company': job.company or '',
+            'description': job.description or '',
+        }
+
+
+def _save_artifact(kind: str, text: str, job_id: int, user_id: int) -> Optional[str]:
+    with app.app_context():
+        if kind == 'customize_cv':
+            return cv_processor.save_customized_cv(text, job_id, user_id)
+        return cv_processor.save_cover_letter(text, job_id, user_id)
+
+
+async def _read_json(receive) -> Dict[str, Any]:
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    if not body:
+        return {}
+    return json.loads(body)
+
+
+async def _send_json(send, status: int, payload: Dict[str, Any],
+                     headers: Optional[List[Tuple[bytes, bytes]]] = None):
+    data = json.dumps(payload).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(data)).encode())]
+                   + (headers or []),
+    })
+    await send({'type': 'http.response.body', 'body': data})
+
+
+async def _handle_ai(action: str, job_id: int, method: str, receive, user_id: int) -> Tuple[int, Dict[str, Any]]:
+    expected_method = 'GET' if action == 'research_company' else 'POST'
+    if method != expected_method:
+        return 405, {'success': False, 'error': f'{action} requires {expected_method}'}
+
+    try:
+        data = await _read_json(receive) if method == 'POST' else {}
+    except json.JSONDecodeError:
+        return 400, {'success': False, 'error': 'Request body must be JSON'}
+
+    if not async_ai_service.is_available():
+        return 503, {'success': False, 'error': 'AI service not available. Please configure Anthropic API key.'}
+
+    job = await asyncio.to_thread(_load_job, job_id, user_id)
+    if job is None:
+        return 404, {'success': False, 'error': 'Job not found'}
+
+    if action == 'research_company':
+        if not job['company']:
+            return 400, {'success': False, 'error': 'No company name available for research'}
+        research = await async_ai_service.research_company(company_name=job['company'], job_title=job['title'])
+        if research is None:
+            return 502, {'success': False, 'error': 'Failed to research company. Please try again.'}
+        return 200, {'success': True, 'research': research}
+
+    cv_text = data.get('cv_text', '')
+    if not cv_text:
+        return 400, {'success': False, 'error': 'No CV content provided'}
+
+    if action == 'customize_cv':
+        text = await async_ai_service.customize_cv(
+            cv_text=cv_text,
+            job_description=job['description'],
+            job_title=job['title'],
+            company=job['company']
+        )
+        key = 'customized_cv'
+    else:
+        text = await async_ai_service.generate_cover_letter(
+            cv_text=cv_text,
+            job_description=job['description'],
+            job_title=job['title'],
+            company=job['company'],
+            user_name=data.get('user_name', '')
+        )
+        key = 'cover_letter'
+
+    if text is None:
+        return 502, {'success': False, 'error': 'AI generation failed. Please try again.'}
+
+    path = await asyncio.to_thread(_save_artifact, action, text, job_id, job['user_id'])
+    return 200, {'success': True, key: text, 'path': path}
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await async_ai_service.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+
+    if scope['type'] == 'http':
+        match = AI_ROUTE.match(scope['path'])
+        if match:
+            # Root span named like the Flask request spans, so the AI stages nest under it
+            with tracer.span(f"{scope['method']} /api/ai/{match.group(1)}/<int:job_id>", root=True,
+                             path=scope['path']) as span:
+                try:
+                    status, payload = await _handle_ai(match.group(1), int(match.group(2)), scope['method'],
+                                                       receive, _session_user_id(scope))
+                except Exception as e:
+                    logger.error(f"Async AI request failed: {e}")
+                    status, payload = 500, {'success': False, 'error': str(e)}
+                    if span is not None:
+                        span.error = f'{type(e).__name__}: {e}'
+                headers = []
+                if span is not None:
+                    span.set(status_code=status)
+                    headers.append((b'x-trace-id', span.trace_id.encode()))
+                await _send_json(send, status, payload, headers)
+            return
+
+    await flask_application(scope, receive, send)
@@ -0,0 +1,125 @@
+"""
+Sync vs async AI service concurrency benchmark.
+
+Runs the same batch of ``customize_cv`` calls against the local Anthropic stub
+with the thread-based ``AIService`` and the event-loop based
+``AsyncAIService`` at increasing concurrency levels. With a fixed upstream
+latency the ideal throughput is ``concurrency / latency``; the table shows how
+close each model gets and how many OS threads it needed to do it. The stub
+runs in its own process; on machines with only one or two cores it competes
+with the client for CPU, so compare thread counts rather than raw req/s there.
+
+    python -m benchmarks.ai_concurrency --levels 8,64,256 --latency fixed:0.5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from benchmarks.anthropic_stub import LatencyModel, add_stub_arguments, spawn_stub_process
+
+CV_TEXT = "Senior engineer with Python, Flask and AWS experience. " * 20
+JOB_DESCRIPTION = "Looking for a backend engineer who knows Flask, SQL and AWS. " * 10
+
+
+class ThreadSampler:
+    """Tracks the peak number of live threads while a block runs"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, threading.active_count())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_sync(service, calls: int, concurrency: int) -> Dict[str, float]:
+    def one(_):
+        return service.customize_cv(CV_TEXT, JOB_DESCRIPTION, 'Backend Engineer', 'Example Corp')
+
+    with ThreadSampler() as sampler:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(one, range(calls)))
+        elapsed = time.perf_counter() - started
+    return {'elapsed': elapsed, 'ok': sum(r is not None for r in results), 'threads': sampler.peak}
+
+
+def run_async(service_factory, calls: int, concurrency: int) -> Dict[str, float]:
+    async def main():
+        service = service_factory()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with semaphore:
+                return await service.customize_cv(CV_TEXT, JOB_DESCRIPTION, 'Backend Engineer', 'Example Corp')
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one() for _ in range(calls)))
+        elapsed = time.perf_counter() - started
+        await service.close()
+        return elapsed, results
+
+    with ThreadSampler() as sampler:
+        elapsed, results = asyncio.run(main())
+    return {'elapsed': elapsed, 'ok': sum(r is not None for r in results), 'threads': sampler.peak}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare sync and async AI service concurrency')
+    parser.add_argument('--levels', default='8,32,128,256', help='Comma-separated concurrency levels')
+    parser.add_argument('--calls-per-level', type=int, default=2,
+                        help='Calls issued per unit of concurrency at each level')
+    add_stub_arguments(parser)
+    parser.set_defaults(latency='fixed:0.5', output_tokens=200)
+    args = parser.parse_args()
+
+    stub, base_url = spawn_stub_process(args)
+    os.environ['ANTHROPIC_API_KEY'] = 'stub-key'
+    os.environ['ANTHROPIC_BASE_URL'] = base_url
+
+    from services.ai_service import AIService
+    from services.async_ai_service import AsyncAIService
+
+    sync_service = AIService()
+    latency_model = LatencyModel.from_spec(args.latency)
+    latency = latency_model.params[0] if latency_model.distribution == 'fixed' else None
+
+    rows: List[tuple] = []
+    for level in [int(level) for level in args.levels.split(',') if level]:
+        calls = level * args.calls_per_level
+        rows.append(('sync threads', level, calls, run_sync(sync_service, calls, level)))
+        rows.append(('async loop', level, calls, run_async(AsyncAIService, calls, level)))
+
+    stub.terminate()
+    stub.wait()
+
+    print(f"\nstub latency {args.latency}, {args.calls_per_level} calls per concurrency unit\n")
+    header = f"{'mode':<14}{'conc':>6}{'calls':>7}{'ok':>6}{'wall s':>9}{'req/s':>9}{'ideal':>9}{'threads':>9}"
+    print(header)
+    print('-' * len(header))
+    for mode, level, calls, result in rows:
+        ideal = f"{level / latency:>9.1f}" if latency else f"{'-':>9}"
+        print(f"{mode:<14}{level:>6}{calls:>7}{result['ok']:>6}{result['elapsed']:>9.2f}"
+              f"{calls / result['elapsed']:>9.1f}{ideal}{result['threads']:>9}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+Offline load test for the AI routes.
+
+Starts the local Anthropic stub, points the app at it through
+``ANTHROPIC_BASE_URL`` and a throwaway SQLite database, then drives
+``customize_cv``, ``generate_cover_letter`` and ``research_company`` through
+the Flask test client from a pool of worker threads. Reports throughput and
+tail latency per route plus the token usage the stub saw.
+
+    python -m benchmarks.ai_load_test --requests 300 --concurrency 16 --latency lognormal:0.5,0.4
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List
+
+from benchmarks.anthropic_stub import add_stub_arguments, config_from_args, start_stub_server
+
+ROUTES = ('customize_cv', 'generate_cover_letter', 'research_company')
+
+SAMPLE_CV = """Jane Doe
+Senior Software Engineer
+
+Experience
+- Built Flask and SQLAlchemy services handling 2M requests per day
+- Led migration of batch jobs to event-driven pipelines on AWS
+- Mentored four engineers and ran the team's hiring loop
+
+Skills: Python, Flask, PostgreSQL, Docker, Kubernetes, AWS
+"""
+
+SAMPLE_DESCRIPTION = """We are hiring a Senior Python Engineer to build APIs with Flask and
+PostgreSQL, own services end to end, and mentor other engineers. Experience
+with AWS, containers and CI/CD is expected."""
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    values = sorted(latencies)
+    return {
+        'p50': percentile(values, 50),
+        'p90': percentile(values, 90),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': values[-1] if values else 0.0,
+    }
+
+
+def prepare_app(stub_url: str, workdir: str):
+    """Import the app against the stub and a scratch database, returning (app, job_id)"""
+    os.environ['ANTHROPIC_API_KEY'] = 'stub-key'
+    os.environ['ANTHROPIC_BASE_URL'] = stub_url
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'loadtest.db')}"
+
+    from app import app
+    from models import db, Job, DEFAULT_USER_ID, upgrade_schema
+    from services.artifact_store import artifact_store
+    from services.cv_processor import cv_processor
+
+    # Keep uploads and generated CVs and letters out of the real uploads folder
+    uploads = os.path.join(workdir, 'uploads')
+    cv_processor.upload_folder = artifact_store.upload_folder = uploads
+    cv_processor.blob_folder = os.path.join(uploads, 'blobs')
+    artifact_store.artifact_folder = os.path.join(uploads, 'artifacts')
+    os.makedirs(uploads, exist_ok=True)
+
+    with app.app_context():
+        upgrade_schema()
+        job = Job(user_id=DEFAULT_USER_ID, url='https://example.com/jobs/1', title='Senior Python Engineer',
+                  company='Example Corp', description=SAMPLE_DESCRIPTION, location='Remote')
+        db.session.add(job)
+        db.session.commit()
+        job_id = job.id
+    return app, job_id
+
+
+def fire(app, route: str, job_id: int):
+    """Issue one request and return (route, seconds, ok)"""
+    client = app.test_client()
+    start = time.perf_counter()
+    if route == 'customize_cv':
+        response = client.post(f'/customize_cv/{job_id}', data={'cv_text': SAMPLE_CV})
+    elif route == 'generate_cover_letter':
+        response = client.post(f'/generate_cover_letter/{job_id}',
+                               data={'cv_text': SAMPLE_CV, 'user_name': 'Jane Doe'})
+    else:
+        response = client.get(f'/research_company/{job_id}')
+    elapsed = time.perf_counter() - start
+    # Failures redirect back to the job page with a flash message
+    return route, elapsed, response.status_code == 200
+
+
+def run(args: argparse.Namespace) -> int:
+    routes = [r for r in args.routes.split(',') if r]
+    unknown = set(routes) - set(ROUTES)
+    if unknown:
+        print(f"Unknown routes: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    stub = start_stub_server(config_from_args(args))
+    workdir = tempfile.mkdtemp(prefix='jobtracker-loadtest-')
+    app, job_id = prepare_app(stub.base_url, workdir)
+
+    latencies: Dict[str, List[float]] = {route: [] for route in routes}
+    failures: Dict[str, int] = {route: 0 for route in routes}
+    plan = [routes[i % len(routes)] for i in range(args.requests)]
+
+    # Warm up imports, template compilation and the client's connection pool
+    for route in routes:
+        fire(app, route, job_id)
+    urllib.request.urlopen(urllib.request.Request(f"{stub.base_url}/_stub/reset", method='POST')).read()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [pool.submit(fire, app, route, job_id) for route in plan]
+        for future in as_completed(futures):
+            route, elapsed, ok = future.result()
+            latencies[route].append(elapsed)
+            if not ok:
+                failures[route] += 1
+    wall = time.perf_counter() - started
+
+    stats = json.loads(urllib.request.urlopen(f"{stub.base_url}/_stub/stats").read())
+    stub.shutdown()
+
+    print(f"\n{args.requests} requests, concurrency {args.concurrency}, "
+          f"stub latency {args.latency}, error rate {args.error_rate:.1%}")
+    print(f"wall time {wall:.2f}s, throughput {args.requests / wall:.1f} req/s\n")
+    header = f"{'route':<24}{'count':>7}{'fail':>6}{'p50 ms':>10}{'p90 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    print(header)
+    print('-' * len(header))
+    for route in routes:
+        s = summarize(latencies[route])
+        print(f"{route:<24}{len(latencies[route]):>7}{failures[route]:>6}"
+              + ''.join(f"{s[k] * 1000:>10.1f}" for k in ('p50', 'p90', 'p95', 'p99', 'max')))
+    overall = summarize([v for values in latencies.values() for v in values])
+    print(f"{'all':<24}{args.requests:>7}{sum(failures.values()):>6}"
+          + ''.join(f"{overall[k] * 1000:>10.1f}" for k in ('p50', 'p90', 'p95', 'p99', 'max')))
+    print(f"\nstub: {stats['requests']} upstream calls (SDK retries included), "
+          f"errors {stats['errors'] or 'none'}, usage {stats['usage']}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline load test for the AI routes')
+    parser.add_argument('--requests', type=int, default=120, help='Total requests to send')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent client threads')
+    parser.add_argument('--routes', default=','.join(ROUTES), help='Comma-separated routes to exercise')
+    add_stub_arguments(parser)
+    sys.exit(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,429 @@
+"""
+Local stand-in for the Anthropic Messages API.
+
+Serves ``POST /v1/messages`` with the same request and response shapes as the
+real API (including server-sent-event streaming) so the AI routes can be
+exercised offline without spending money. Latency, output length and error
+injection are configurable; aggregate usage is available at ``GET /_stub/stats``.
+
+Run standalone:
+    python -m benchmarks.anthropic_stub --port 8765 --latency lognormal:0.8,0.4 --error-rate 0.02
+
+Then point the app at it:
+    ANTHROPIC_API_KEY=stub ANTHROPIC_BASE_URL=http://127.0.0.1:8765 python app.py
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ERROR_TYPES = {
+    400: 'invalid_request_error',
+    401: 'authentication_error',
+    429: 'rate_limit_error',
+    500: 'api_error',
+    529: 'overloaded_error',
+}
+
+FILLER_WORDS = (
+    'experienced delivery focused engineer python flask sql stakeholder '
+    'roadmap collaboration ownership results scalable reliable customer '
+    'analysis mentoring leadership communication design testing cloud'
+).split()
+
+
+class LatencyModel:
+    """Samples an artificial response latency (in seconds) from a distribution"""
+
+    DISTRIBUTIONS = ('fixed', 'uniform', 'normal', 'lognormal', 'exponential')
+
+    def __init__(self, distribution: str = 'fixed', params: Tuple[float, ...] = (0.0,),
+                 seed: Optional[int] = None):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.distribution = distribution
+        self.params = params
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_spec(cls, spec: str, seed: Optional[int] = None) -> 'LatencyModel':
+        """
+        Build a model from a ``name:param,param`` spec string
+
+        Examples: ``fixed:0.5``, ``uniform:0.2,1.5``, ``normal:0.8,0.2``,
+        ``lognormal:0.8,0.4`` (median, sigma), ``exponential:0.5`` (mean).
+        """
+        name, _, raw_params = spec.partition(':')
+        params = tuple(float(p) for p in raw_params.split(',') if p) or (0.0,)
+        return cls(name, params, seed=seed)
+
+    def sample(self) -> float:
+        with self._lock:
+            if self.distribution == 'fixed':
+                value = self.params[0]
+            elif self.distribution == 'uniform':
+                value = self._random.uniform(self.params[0], self.params[1])
+            elif self.distribution == 'normal':
+                value = self._random.gauss(self.params[0], self.params[1])
+            elif self.distribution == 'lognormal':
+                # Parameterised by median so specs read naturally in seconds
+                value = self._random.lognormvariate(math.log(max(self.params[0], 1e-6)), self.params[1])
+            else:
+                value = self._random.expovariate(1.0 / max(self.params[0], 1e-6))
+        return max(value, 0.0)
+
+    def __repr__(self):
+        return f"<LatencyModel {self.distribution}:{','.join(str(p) for p in self.params)}>"
+
+
+class StubConfig:
+    """Behaviour knobs for the stub server"""
+
+    def __init__(self, latency: Optional[LatencyModel] = None, error_rate: float = 0.0,
+                 error_statuses: Tuple[int, ...] = (529, 500, 429), output_tokens: int = 400,
+                 token_interval: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency or LatencyModel()
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.output_tokens = output_tokens
+        self.token_interval = token_interval
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def pick_error(self) -> Optional[int]:
+        """Return an HTTP status to fail with, or None to succeed"""
+        with self._lock:
+            if self.error_rate and self._random.random() < self.error_rate:
+                return self._random.choice(self.error_statuses)
+        return None
+
+
+class StubStats:
+    """Thread-safe aggregate usage counters reported at /_stub/stats"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.streamed = 0
+            self.errors: Dict[int, int] = {}
+            self.input_tokens = 0
+            self.output_tokens = 0
+            self.models: Dict[str, int] = {}
+
+    def record(self, model: str, input_tokens: int = 0, output_tokens: int = 0,
+               streamed: bool = False, error_status: Optional[int] = None):
+        with self._lock:
+            self.requests += 1
+            self.models[model] = self.models.get(model, 0) + 1
+            if error_status:
+                self.errors[error_status] = self.errors.get(error_status, 0) + 1
+                return
+            self.streamed += int(streamed)
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'streamed': self.streamed,
+                'errors': {str(status): count for status, count in self.errors.items()},
+                'usage': {'input_tokens': self.input_tokens, 'output_tokens': self.output_tokens},
+                'models': dict(self.models),
+            }
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token), good enough for load numbers"""
+    return max(1, len(text) // 4)
+
+
+def _prompt_text(payload: Dict[str, Any]) -> str:
+    parts: List[str] = []
+    system = payload.get('system') or ''
+    parts.append(system if isinstance(system, str) else json.dumps(system))
+    for message in payload.get('messages', []):
+        content = message.get('content', '')
+        if isinstance(content, str):
+            parts.append(content)
+        else:
+            parts.extend(block.get('text', '') for block in content if isinstance(block, dict))
+    return '\n'.join(parts)
+
+
+def _generate_reply(payload: Dict[str, Any], output_tokens: int) -> str:
+    """Produce a deterministic-looking reply shaped like what the app expects"""
+    words = [FILLER_WORDS[i % len(FILLER_WORDS)] for i in range(output_tokens)]
+    body = ' '.join(words)
+    system = payload.get('system') or ''
+    if isinstance(system, str) and 'JSON object' in system:
+        # research_company asks for a JSON object with fixed keys
+        chunk = max(1, len(words) // 6)
+        keys = ['overview', 'culture', 'recent_news', 'interview_tips',
+                'questions_to_ask', 'key_talking_points']
+        return json.dumps({key: ' '.join(words[i * chunk:(i + 1) * chunk]) for i, key in enumerate(keys)})
+    return body
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'AnthropicStub/1.0'
+    # Send each non-streamed response as one segment, without Nagle delays
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+    # -- helpers -------------------------------------------------------------
+
+    def _send_json(self, status: int, body: Dict[str, Any]):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('request-id', f"req_stub_{uuid.uuid4().hex[:16]}")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_event(self, event: str, data: Dict[str, Any]):
+        chunk = f"event: {event}\ndata: {json.dumps(data)}\n\n".encode('utf-8')
+        self.wfile.write(f"{len(chunk):X}\r\n".encode('ascii') + chunk + b"\r\n")
+        self.wfile.flush()
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b'{}'
+        return json.loads(raw or b'{}')
+
+    # -- routes --------------------------------------------------------------
+
+    def do_GET(self):
+        if self.path == '/_stub/stats':
+            self._send_json(200, self.server.stats.snapshot())
+        else:
+            self._send_json(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': self.path}})
+
+    def do_POST(self):
+        if self.path == '/_stub/reset':
+            self.server.stats.reset()
+            self._send_json(200, {'reset': True})
+            return
+        if self.path.split('?')[0] != '/v1/messages':
+            self._send_json(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': self.path}})
+            return
+
+        try:
+            payload = self._read_json()
+        except json.JSONDecodeError as e:
+            self._send_json(400, {'type': 'error', 'error': {'type': 'invalid_request_error', 'message': str(e)}})
+            return
+
+        config: StubConfig = self.server.config
+        model = payload.get('model', 'unknown')
+        delay = config.latency.sample()
+
+        error_status = config.pick_error()
+        if error_status:
+            time.sleep(delay)
+            self.server.stats.record(model, error_status=error_status)
+            self._send_json(error_status, {
+                'type': 'error',
+                'error': {'type': ERROR_TYPES.get(error_status, 'api_error'),
+                          'message': f'Injected {error_status} from stub'}
+            })
+            return
+
+        output_tokens = min(config.output_tokens, int(payload.get('max_tokens') or config.output_tokens))
+        reply = _generate_reply(payload, output_tokens)
+        usage = {'input_tokens': estimate_tokens(_prompt_text(payload)), 'output_tokens': output_tokens}
+        message_id = f"msg_stub_{uuid.uuid4().hex[:20]}"
+
+        if payload.get('stream'):
+            self._stream_reply(message_id, model, reply, usage, delay)
+        else:
+            time.sleep(delay)
+            self._send_json(200, {
+                'id': message_id,
+                'type': 'message',
+                'role': 'assistant',
+                'model': model,
+                'content': [{'type': 'text', 'text': reply}],
+                'stop_reason': 'end_turn',
+                'stop_sequence': None,
+                'usage': usage,
+            })
+        self.server.stats.record(model, usage['input_tokens'], usage['output_tokens'],
+                                 streamed=bool(payload.get('stream')))
+
+    def _stream_reply(self, message_id: str, model: str, reply: str, usage: Dict[str, int], delay: float):
+        """Emit the Messages API SSE sequence; the sampled latency is time-to-first-token"""
+        config: StubConfig = self.server.config
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        time.sleep(delay)
+        self._send_event('message_start', {'type': 'message_start', 'message': {
+            'id': message_id, 'type': 'message', 'role': 'assistant', 'model': model, 'content': [],
+            'stop_reason': None, 'stop_sequence': None,
+            'usage': {'input_tokens': usage['input_tokens'], 'output_tokens': 1}}})
+        self._send_event('content_block_start', {'type': 'content_block_start', 'index': 0,
+                                                 'content_block': {'type': 'text', 'text': ''}})
+        self._send_event('ping', {'type': 'ping'})
+
+        # Roughly one delta per ~8 tokens keeps the event count realistic
+        pieces = reply.split(' ')
+        step = 8
+        for i in range(0, len(pieces), step):
+            text = ' '.join(pieces[i:i + step]) + (' ' if i + step < len(pieces) else '')
+            self._send_event('content_block_delta', {'type': 'content_block_delta', 'index': 0,
+                                                     'delta': {'type': 'text_delta', 'text': text}})
+            if config.token_interval:
+                time.sleep(config.token_interval * step)
+
+        self._send_event('content_block_stop', {'type': 'content_block_stop', 'index': 0})
+        self._send_event('message_delta', {'type': 'message_delta',
+                                           'delta': {'stop_reason': 'end_turn', 'stop_sequence': None},
+                                           'usage': {'output_tokens': usage['output_tokens']}})
+        self._send_event('message_stop', {'type': 'message_stop'})
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address: Tuple[str, int], config: StubConfig):
+        super().__init__(address, StubRequestHandler)
+        self.config = config
+        self.stats = StubStats()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_stub_server(config: Optional[StubConfig] = None, host: str = '127.0.0.1',
+                      port: int = 0) -> StubServer:
+    """
+    Start the stub in a daemon thread
+
+    Args:
+        config: Stub behaviour; defaults to zero latency and no errors
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+
+    Returns:
+        The running server; use ``server.base_url`` and ``server.shutdown()``
+    """
+    server = StubServer((host, port), config or StubConfig())
+    thread = threading.Thread(target=server.serve_forever, name='anthropic-stub', daemon=True)
+    thread.start()
+    logger.info(f"Anthropic stub listening on {server.base_url}")
+    return server
+
+
+def spawn_stub_process(args: argparse.Namespace, host: str = '127.0.0.1',
+                       startup_timeout: float = 10.0) -> Tuple[subprocess.Popen, str]:
+    """
+    Run the stub in a separate interpreter so its threads don't share the
+    benchmark's GIL or skew its thread counts
+
+    Args:
+        args: Parsed namespace carrying the flags from add_stub_arguments
+        host: Interface to bind
+        startup_timeout: Seconds to wait for the port to accept connections
+
+    Returns:
+        Tuple of (process, base_url); terminate the process when done
+    """
+    with socket.socket() as probe:
+        probe.bind((host, 0))
+        port = probe.getsockname()[1]
+
+    command = [sys.executable, '-m', 'benchmarks.anthropic_stub', '--host', host, '--port', str(port),
+               '--latency', args.latency, '--error-rate', str(args.error_rate),
+               '--error-statuses', args.error_statuses, '--output-tokens', str(args.output_tokens),
+               '--token-interval', str(args.token_interval)]
+    if args.seed is not None:
+        command += ['--seed', str(args.seed)]
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(command, cwd=repo_root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=0.2).close()
+            return process, f"http://{host}:{port}"
+        except OSError:
+            time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError(f"Anthropic stub did not start on {host}:{port}")
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser):
+    """Register the stub's behaviour flags on an argument parser"""
+    parser.add_argument('--latency', default='fixed:0.0',
+                        help="Latency distribution spec, e.g. 'lognormal:0.8,0.4' (default: fixed:0.0)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests that fail')
+    parser.add_argument('--error-statuses', default='529,500,429',
+                        help='Comma-separated HTTP statuses used for injected errors')
+    parser.add_argument('--output-tokens', type=int, default=400, help='Tokens generated per reply')
+    parser.add_argument('--token-interval', type=float, default=0.0,
+                        help='Seconds per output token when streaming')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible runs')
+
+
+def config_from_args(args: argparse.Namespace) -> StubConfig:
+    return StubConfig(
+        latency=LatencyModel.from_spec(args.latency, seed=args.seed),
+        error_rate=args.error_rate,
+        error_statuses=tuple(int(s) for s in args.error_statuses.split(',') if s),
+        output_tokens=args.output_tokens,
+        token_interval=args.token_interval,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Anthropic Messages API stub')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    server = StubServer((args.host, args.port), config_from_args(args))
+    logger.info(f"Anthropic stub listening on {server.base_url} ({server.config.latency})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
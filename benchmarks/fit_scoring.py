@@ -0,0 +1,125 @@
+"""
+CV-to-job fit scoring benchmark.
+
+Builds a synthetic corpus of job descriptions and measures the sparse TF-IDF
+FitScorer against a straightforward pure-Python scorer (dict vectors, one
+cosine per job) that recomputes document frequencies on every query:
+
+* ``load``        - tokenizing every job into the cache
+* ``first rank``  - IDF weighting + matrix build + ranking
+* ``rank``        - ranking against a warm matrix (top 50 with keywords)
+* ``add + rank``  - one new job arrives, then a ranking (matrix rebuild)
+
+    python -m benchmarks.fit_scoring --jobs 1000,10000,25000
+"""
+import argparse
+import math
+import random
+import sys
+import time
+from collections import Counter
+from typing import Dict, List
+
+from services.fit_scorer import FitScorer, tokenize
+
+SKILLS = """
+python java javascript typescript go rust c++ c# ruby php scala kotlin swift sql nosql postgresql mysql
+mongodb redis kafka rabbitmq spark hadoop airflow dbt snowflake bigquery aws azure gcp docker kubernetes
+terraform ansible jenkins gitlab github linux bash flask django fastapi spring node.js react angular vue
+graphql rest grpc microservices serverless lambda s3 ec2 pandas numpy pytorch tensorflow scikit-learn nlp
+llm mlops etl observability prometheus grafana datadog elasticsearch security oauth sso ci/cd agile scrum
+""".split()
+
+
+def synthetic_vocabulary(size: int, rng: random.Random) -> List[str]:
+    syllables = ['ka', 'lo', 'mi', 'tre', 'sun', 'va', 'pe', 'dor', 'ix', 'ul', 'qua', 'ber', 'zen', 'tal']
+    return [''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(size)]
+
+
+def synthetic_job(rng: random.Random, vocabulary: List[str]) -> str:
+    skills = rng.sample(SKILLS, rng.randint(5, 15))
+    words = [rng.choice(vocabulary) for _ in range(rng.randint(150, 400))]
+    words += skills * rng.randint(1, 3)
+    rng.shuffle(words)
+    return f"{rng.choice(['Senior', 'Staff', 'Junior'])} {skills[0]} engineer " + ' '.join(words)
+
+
+def naive_rank(cv_text: str, jobs: Dict[int, str], limit: int) -> List[int]:
+    """The obvious per-job loop: rebuild DF, weight, cosine, sort"""
+    job_counts = {job_id: Counter(tokenize(text)) for job_id, text in jobs.items()}
+    df = Counter(term for counts in job_counts.values() for term in counts)
+    n = len(jobs)
+
+    def weigh(counts):
+        vector = {term: (1 + math.log(count)) * (math.log((1 + n) / (1 + df[term])) + 1)
+                  for term, count in counts.items() if term in df}
+        norm = math.sqrt(sum(value * value for value in vector.values())) or 1.0
+        return {term: value / norm for term, value in vector.items()}
+
+    query = weigh(Counter(tokenize(cv_text)))
+    scores = []
+    for job_id, counts in job_counts.items():
+        vector = weigh(counts)
+        scores.append((sum(value * vector.get(term, 0.0) for term, value in query.items()), job_id))
+    scores.sort(reverse=True)
+    return [job_id for _, job_id in scores[:limit]]
+
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark TF-IDF CV fit scoring')
+    parser.add_argument('--jobs', default='1000,10000', help='Comma-separated corpus sizes')
+    parser.add_argument('--vocabulary', type=int, default=20000, help='Distinct filler words in the corpus')
+    parser.add_argument('--limit', type=int, default=50, help='Jobs returned per ranking')
+    parser.add_argument('--repeat', type=int, default=20, help='Warm rankings to average')
+    parser.add_argument('--naive-max', type=int, default=10000,
+                        help='Skip the pure-Python baseline above this corpus size')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = synthetic_vocabulary(args.vocabulary, rng)
+    cv_text = ' '.join(rng.sample(SKILLS, 20) + rng.sample(vocabulary, 300))
+
+    header = (f"{'jobs':>7}{'terms':>9}{'load s':>9}{'first rank ms':>15}{'rank ms':>10}"
+              f"{'add+rank ms':>13}{'naive ms':>11}{'speedup':>9}")
+    print(f"\nvocabulary {args.vocabulary}, top {args.limit}, warm rank averaged over {args.repeat}\n")
+    print(header)
+    print('-' * len(header))
+
+    for size in [int(size) for size in args.jobs.split(',') if size]:
+        jobs = {job_id: synthetic_job(rng, vocabulary) for job_id in range(1, size + 1)}
+        scorer = FitScorer()
+
+        load_time, _ = timed(lambda: [scorer.add_job(job_id, text) for job_id, text in jobs.items()])
+        first_time, ranked = timed(scorer.rank, cv_text, limit=args.limit)
+
+        warm = [timed(scorer.rank, cv_text, limit=args.limit)[0] for _ in range(args.repeat)]
+        rank_time = sum(warm) / len(warm)
+
+        def add_and_rank():
+            scorer.add_job(size + 1, synthetic_job(rng, vocabulary))
+            return scorer.rank(cv_text, limit=args.limit)
+        add_time, _ = timed(add_and_rank)
+
+        if size <= args.naive_max:
+            naive_time, naive = timed(naive_rank, cv_text, jobs, args.limit)
+            if naive[:10] != [fit['job_id'] for fit in ranked[:10]]:
+                print(f"ranking mismatch at {size} jobs", file=sys.stderr)
+                return 1
+            naive_cell, speedup = f"{naive_time * 1000:>11.0f}", f"{naive_time / rank_time:>8.0f}x"
+        else:
+            naive_cell, speedup = f"{'-':>11}", f"{'-':>9}"
+
+        print(f"{size:>7}{len(scorer.terms):>9}{load_time:>9.2f}{first_time * 1000:>15.1f}"
+              f"{rank_time * 1000:>10.2f}{add_time * 1000:>13.1f}{naive_cell}{speedup}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+Generate saved job posting pages for HTML parsing benchmarks.
+
+Pages imitate the markup the scraper's selectors target on LinkedIn, Indeed
+and generic career sites, wrapped in the navigation, inline scripts and
+footer boilerplate that make up most of a real page's weight. Roughly half
+of them carry a schema.org ``JobPosting`` JSON-LD block, as many boards do.
+
+``write_corpus`` also records each page's URL and the field values a correct
+parser should extract, for the scraper benchmark's replay server.
+"""
+import json
+import os
+import random
+from typing import Any, Dict, List, Tuple
+
+WORDS = (
+    'python flask sqlalchemy engineer delivery platform roadmap stakeholder '
+    'mentoring kubernetes analytics pipeline latency throughput customer '
+    'ownership design review testing migration reliability budget hiring'
+).split()
+
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Hooli', 'Stark Industries']
+CITIES = [('San Francisco', 'CA'), ('Austin', 'TX'), ('New York', 'NY'), ('Seattle', 'WA')]
+SITES = ('linkedin', 'indeed', 'generic')
+
+
+def _sentence(rng: random.Random, words: int = 14) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _boilerplate(rng: random.Random, links: int, script_kb: int) -> Tuple[str, str]:
+    nav = ''.join(f'<li class="nav-item"><a href="/p/{i}" class="nav-link">{rng.choice(WORDS)}</a></li>'
+                  for i in range(links))
+    script = 'var t=' + json.dumps([_sentence(rng) for _ in range(script_kb * 10)]) + ';'
+    head = f'<script>{script}</script><style>.x{{color:red}}</style>'
+    body = f'<header><nav><ul class="nav">{nav}</ul></nav></header>'
+    return head, body
+
+
+def job_page(site: str, rng: random.Random, json_ld: bool, paragraphs: int = 12,
+             links: int = 300, script_kb: int = 60) -> str:
+    """One posting page in the style of ``site``"""
+    return job_posting(site, rng, json_ld, paragraphs, links, script_kb)[0]
+
+
+def job_posting(site: str, rng: random.Random, json_ld: bool, paragraphs: int = 12,
+                links: int = 300, script_kb: int = 60) -> Tuple[str, Dict[str, str]]:
+    """(page, expected fields) for one posting in the style of ``site``"""
+    title = f"{rng.choice(['Senior', 'Staff', 'Junior'])} {rng.choice(WORDS).capitalize()} Engineer"
+    company = rng.choice(COMPANIES)
+    city, region = rng.choice(CITIES)
+    paragraphs_html = ''.join(f'<p>{_sentence(rng, 40)}</p>' for _ in range(paragraphs))
+    bullets = [_sentence(rng) for _ in range(6)]
+    description = f'<ul>{"".join(f"<li>{bullet}</li>" for bullet in bullets)}</ul>{paragraphs_html}'
+
+    if site == 'linkedin':
+        main = (f'<section class="top-card-layout"><h1 class="top-card-layout__title">{title}</h1>'
+                f'<a class="topcard__org-name-link" href="#">{company}</a>'
+                f'<span class="topcard__flavor">{city}, {region}</span></section>'
+                f'<div class="description__text">{description}</div>')
+    elif site == 'indeed':
+        main = (f'<div class="jobsearch-ViewJobLayout"><h1 data-testid="jobsearch-JobInfoHeader-title">{title}</h1>'
+                f'<div data-testid="inlineHeader-companyName"><a href="#">{company}</a></div>'
+                f'<div data-testid="job-location">{city}, {region}</div>'
+                f'<div id="jobDescriptionText">{description}</div></div>')
+    else:
+        main = (f'<main><h1 class="posting-title">{title}</h1><div class="company-info">{company}</div>'
+                f'<span class="job-location">{city}, {region}</span>'
+                f'<div class="job-details">{description}</div></main>')
+
+    head, header = _boilerplate(rng, links, script_kb)
+    if json_ld:
+        posting = {
+            '@context': 'https://schema.org', '@type': 'JobPosting', 'title': title,
+            'description': description, 'employmentType': 'FULL_TIME',
+            'hiringOrganization': {'@type': 'Organization', 'name': company},
+            'jobLocation': {'@type': 'Place', 'address': {'@type': 'PostalAddress', 'addressLocality': city,
+                                                          'addressRegion': region, 'addressCountry': 'US'}},
+            'baseSalary': {'@type': 'MonetaryAmount', 'currency': 'USD',
+                           'value': {'@type': 'QuantitativeValue', 'minValue': 120000, 'maxValue': 160000,
+                                     'unitText': 'YEAR'}},
+        }
+        head += f'<script type="application/ld+json">{json.dumps(posting)}</script>'
+    footer = ''.join(f'<div class="footer-col"><a href="/f/{i}">{_sentence(rng, 4)}</a></div>' for i in range(80))
+    page = (f'<!DOCTYPE html><html><head><title>{title} - {company}</title>{head}</head>'
+            f'<body>{header}{main}<footer>{footer}</footer></body></html>')
+    # JSON-LD addresses carry the country; the description is checked by its first bullet
+    expected = {'title': title, 'company': company,
+                'location': f'{city}, {region}, US' if json_ld else f'{city}, {region}',
+                'description': bullets[0]}
+    return page, expected
+
+
+def write_fixtures(directory: str, count: int, seed: int = 0) -> List[str]:
+    """
+    Write ``count`` pages named ``<site>-<n>.html``, cycling through the sites
+
+    Args:
+        directory: Output directory (created if missing)
+        count: Number of pages
+        seed: Random seed so fixtures are reproducible
+
+    Returns:
+        The paths written
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for index in range(count):
+        site = SITES[index % len(SITES)]
+        path = os.path.join(directory, f'{site}-{index}.html')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(job_page(site, rng, json_ld=(index // len(SITES)) % 2 == 0))
+        paths.append(path)
+    return paths
+
+
+def posting_url(site: str, index: int, company: str) -> str:
+    """Plain-HTTP URL for a fixture page, on the domain its extractor expects"""
+    if site == 'linkedin':
+        return f'http://www.linkedin.com/jobs/view/{3900000000 + index}/'
+    if site == 'indeed':
+        return f'http://www.indeed.com/viewjob?jk={index:016x}'
+    slug = ''.join(ch for ch in company.lower() if ch.isalnum())
+    return f'http://careers.{slug}.example/jobs/{index}'
+
+
+def write_corpus(directory: str, count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Write ``count`` pages plus a ``manifest.json`` listing each page's URL,
+    file, site and expected fields
+
+    Args:
+        directory: Output directory (created if missing)
+        count: Number of pages
+        seed: Random seed so corpora are reproducible
+
+    Returns:
+        The manifest entries
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    manifest = []
+    for index in range(count):
+        site = SITES[index % len(SITES)]
+        page, expected = job_posting(site, rng, json_ld=(index // len(SITES)) % 2 == 0)
+        filename = f'{site}-{index}.html'
+        with open(os.path.join(directory, filename), 'w', encoding='utf-8') as file:
+            file.write(page)
+        manifest.append({'url': posting_url(site, index, expected['company']), 'file': filename,
+                         'site': site, 'expected': expected})
+    with open(os.path.join(directory, 'manifest.json'), 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=1)
+    return manifest
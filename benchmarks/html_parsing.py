@@ -0,0 +1,149 @@
+"""
+Job page parsing benchmark.
+
+Runs a corpus of saved posting pages through three parsers:
+
+* ``legacy``  - the original full ``html.parser`` tree plus per-field selectors
+* ``lxml``    - the same selectors over a full lxml-built tree
+* ``engine``  - JobPageParser: JSON-LD fast path, then a strained lxml parse
+
+Pages come from ``--fixtures`` (``<site>-*.html`` files, or a scraper HTTP
+cache directory) or are generated with benchmarks.html_fixtures.
+
+    python -m benchmarks.html_parsing --pages 60
+    python -m benchmarks.html_parsing --fixtures instance/http_cache
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from bs4 import BeautifulSoup
+
+from benchmarks.html_fixtures import write_fixtures
+from services.extractors import (GENERIC_DESCRIPTION_CLASSES, GENERIC_SELECTORS, INDEED_SELECTORS,
+                                 LINKEDIN_SELECTORS)
+from services.page_parser import JOB_FIELDS, JobPageParser
+
+SITE_SELECTORS = {'linkedin': LINKEDIN_SELECTORS, 'indeed': INDEED_SELECTORS, 'generic': GENERIC_SELECTORS}
+
+
+def legacy_parse(content: bytes, site: str, features: str = 'html.parser') -> Dict[str, str]:
+    """The pre-engine scraper logic, kept here as the baseline"""
+    soup = BeautifulSoup(content, features)
+    result = {}
+    for field, selectors in SITE_SELECTORS[site].items():
+        result[field] = ''
+        for selector in selectors:
+            element = soup.select_one(selector)
+            if element and element.get_text(strip=True):
+                result[field] = element.get_text(strip=True)
+                break
+    if site == 'generic':
+        element = soup.find(['div', 'section'], class_=re.compile(GENERIC_DESCRIPTION_CLASSES))
+        result['description'] = element.get_text(strip=True) if element else ''
+    return result
+
+
+def engine_parse(parser: JobPageParser, content: bytes, site: str) -> Dict[str, str]:
+    return parser.parse(content, SITE_SELECTORS[site],
+                        description_classes=GENERIC_DESCRIPTION_CLASSES if site == 'generic' else None)
+
+
+def site_of(url_or_name: str) -> str:
+    for site in ('linkedin', 'indeed'):
+        if site in url_or_name:
+            return site
+    return 'generic'
+
+
+def load_pages(directory: str) -> List[Tuple[str, bytes]]:
+    """(site, content) pairs from saved .html files or HTTP cache entries"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.html'))):
+        with open(path, 'rb') as file:
+            pages.append((site_of(os.path.basename(path)), file.read()))
+    for meta_path in sorted(glob.glob(os.path.join(directory, '**', '*.json'), recursive=True)):
+        body_path = meta_path[:-len('.json')] + '.body'
+        if os.path.exists(body_path):
+            with open(meta_path, encoding='utf-8') as file:
+                url = json.load(file).get('url', '')
+            with open(body_path, 'rb') as file:
+                pages.append((site_of(url), file.read()))
+    return pages
+
+
+def best_of(fn, pages: List[Tuple[str, bytes]], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for site, content in pages:
+            fn(content, site)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark job page parsing')
+    parser.add_argument('--fixtures', help='Directory of saved pages (default: generate them)')
+    parser.add_argument('--pages', type=int, default=60, help='Pages to generate when --fixtures is not given')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per parser (best is reported)')
+    args = parser.parse_args()
+
+    if args.fixtures:
+        pages = load_pages(args.fixtures)
+    else:
+        directory = tempfile.mkdtemp(prefix='html-fixtures-')
+        write_fixtures(directory, args.pages)
+        pages = load_pages(directory)
+    if not pages:
+        print('no pages found', file=sys.stderr)
+        return 1
+
+    engine = JobPageParser()
+    structured = sum(1 for _, content in pages if engine.find_job_posting(content))
+    size = sum(len(content) for _, content in pages)
+    print(f"\n{len(pages)} pages, {size / len(pages) / 1024:.0f} KiB average, {structured} with JSON-LD\n")
+
+    # Selector results must not change; JSON-LD locations and descriptions are formatted differently on purpose
+    mismatches = 0
+    for site, content in pages:
+        expected, actual = legacy_parse(content, site), engine_parse(engine, content, site)
+        fields = ('title', 'company') if actual.get('structured') else JOB_FIELDS
+        mismatches += any(expected[field] != actual[field] for field in fields)
+    if mismatches:
+        print(f"{mismatches} pages parsed differently from the baseline", file=sys.stderr)
+
+    parsers = [
+        ('legacy', legacy_parse),
+        ('lxml', lambda content, site: legacy_parse(content, site, 'lxml')),
+        ('engine', lambda content, site: engine_parse(engine, content, site)),
+    ]
+    subsets = [
+        ('all', pages),
+        ('json-ld', [page for page in pages if engine.find_job_posting(page[1])]),
+        ('html only', [page for page in pages if not engine.find_job_posting(page[1])]),
+    ]
+    subsets = [(label, subset) for label, subset in subsets if subset]
+
+    header = f"{'parser':<10}" + ''.join(f"{label + ' ms/page':>22}" for label, _ in subsets)
+    print(header)
+    print('-' * len(header))
+    baseline = {}
+    for name, fn in parsers:
+        cells = []
+        for label, subset in subsets:
+            per_page = best_of(fn, subset, args.repeat) * 1000 / len(subset)
+            baseline.setdefault(label, per_page)
+            cells.append(f"{per_page:>13.1f} ({baseline[label] / per_page:>4.1f}x)")
+        print(f"{name:<10}" + ''.join(cells))
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,325 @@
+"""
+Local replay server for recorded job posting pages.
+
+Serves a corpus of LinkedIn, Indeed and generic career-site pages so the
+scraper can be measured offline. It works as a plain HTTP forward proxy:
+point ``HTTP_PROXY`` at it and the scraper's requests for
+``http://www.linkedin.com/jobs/view/...`` arrive here with their absolute
+URL, which is looked up in the corpus. Pages keep their real domains, so
+the scraper picks the same extractor it would in production.
+
+A corpus is a directory with a ``manifest.json`` (see
+benchmarks.html_fixtures.write_corpus) or a scraper HTTP cache directory,
+whose recorded pages are replayed under their original URLs (scheme aside).
+Latency and injected failures are configurable; counters are at
+``GET /_stub/stats`` on the server's own address.
+
+    python -m benchmarks.job_board_stub --corpus instance/http_cache --port 8770 --latency lognormal:0.3,0.5
+    HTTP_PROXY=http://127.0.0.1:8770 python -c "from services.job_scraper import job_scraper; ..."
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from benchmarks.anthropic_stub import LatencyModel
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def replay_key(url: str) -> str:
+    """Corpus key for a URL: host, path and query, ignoring scheme, port and a leading 'www.'"""
+    parts = urlsplit(url)
+    host = (parts.hostname or '').lower()
+    host = host[4:] if host.startswith('www.') else host
+    return host + (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+
+
+def load_corpus(directory: str) -> List[Dict[str, Any]]:
+    """
+    Entries of a corpus directory
+
+    Returns:
+        [{'url', 'site', 'path', 'content_type', 'expected'}], ``expected`` being
+        None for recorded pages that have no known-correct fields
+    """
+    manifest_path = os.path.join(directory, 'manifest.json')
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as file:
+            manifest = json.load(file)
+        return [{'url': entry['url'], 'site': entry.get('site', ''), 'path': os.path.join(directory, entry['file']),
+                 'content_type': entry.get('content_type', 'text/html; charset=utf-8'),
+                 'expected': entry.get('expected')} for entry in manifest]
+
+    entries = []
+    for meta_path in sorted(glob.glob(os.path.join(directory, '**', '*.json'), recursive=True)):
+        body_path = meta_path[:-len('.json')] + '.body'
+        if not os.path.exists(body_path):
+            continue
+        with open(meta_path, encoding='utf-8') as file:
+            meta = json.load(file)
+        if meta.get('status', 200) != 200 or not meta.get('url'):
+            continue
+        entries.append({'url': 'http://' + replay_key(meta['url']), 'site': '', 'path': body_path,
+                        'content_type': meta.get('headers', {}).get('Content-Type', 'text/html'),
+                        'expected': None})
+    return entries
+
+
+class ReplayConfig:
+    """Behaviour knobs for the replay server"""
+
+    def __init__(self, latency: Optional[LatencyModel] = None, error_rate: float = 0.0,
+                 error_statuses: Tuple[int, ...] = (503, 500, 429), retry_after: Optional[float] = None,
+                 seed: Optional[int] = None):
+        self.latency = latency or LatencyModel()
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def pick_error(self) -> Optional[int]:
+        """Return an HTTP status to fail with, or None to succeed"""
+        with self._lock:
+            if self.error_rate and self._random.random() < self.error_rate:
+                return self._random.choice(self.error_statuses)
+        return None
+
+
+class ReplayStats:
+    """Thread-safe counters reported at /_stub/stats"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.served = 0
+            self.missing = 0
+            self.bytes = 0
+            self.errors: Dict[int, int] = {}
+
+    def record(self, size: int = 0, error_status: Optional[int] = None, missing: bool = False):
+        with self._lock:
+            self.requests += 1
+            if error_status:
+                self.errors[error_status] = self.errors.get(error_status, 0) + 1
+            elif missing:
+                self.missing += 1
+            else:
+                self.served += 1
+                self.bytes += size
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'served': self.served,
+                'missing': self.missing,
+                'bytes': self.bytes,
+                'errors': {str(status): count for status, count in self.errors.items()},
+            }
+
+
+class ReplayRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'JobBoardStub/1.0'
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _send_json(self, status: int, body: Dict[str, Any]):
+        self._send(status, json.dumps(body).encode('utf-8'), 'application/json')
+
+    def _control_path(self) -> str:
+        # Control requests may arrive proxied too when the client has HTTP_PROXY set
+        return urlsplit(self.path).path if '://' in self.path else self.path
+
+    def do_POST(self):
+        if self._control_path() == '/_stub/reset':
+            self.server.stats.reset()
+            self._send_json(200, {'reset': True})
+        else:
+            self._send_json(405, {'error': 'method not allowed'})
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        if self._control_path() == '/_stub/stats':
+            self._send_json(200, self.server.stats.snapshot())
+            return
+
+        # Proxied requests carry the absolute URL; direct ones only a path
+        url = self.path if '://' in self.path else f"http://{self.headers.get('Host', '')}{self.path}"
+        config: ReplayConfig = self.server.config
+        delay = config.latency.sample()
+
+        error_status = config.pick_error()
+        if error_status:
+            time.sleep(delay)
+            self.server.stats.record(error_status=error_status)
+            headers = {'Retry-After': f'{config.retry_after:g}'} if config.retry_after is not None else None
+            self._send(error_status, f'Injected {error_status}'.encode('utf-8'), 'text/plain', headers)
+            return
+
+        page = self.server.pages.get(replay_key(url))
+        time.sleep(delay)
+        if page is None:
+            self.server.stats.record(missing=True)
+            self._send(404, b'Not in corpus', 'text/plain')
+            return
+        body, content_type = page
+        self.server.stats.record(size=len(body))
+        self._send(200, body, content_type)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address: Tuple[str, int], entries: List[Dict[str, Any]], config: ReplayConfig):
+        super().__init__(address, ReplayRequestHandler)
+        self.config = config
+        self.stats = ReplayStats()
+        self.pages: Dict[str, Tuple[bytes, str]] = {}
+        for entry in entries:
+            with open(entry['path'], 'rb') as file:
+                self.pages[replay_key(entry['url'])] = (file.read(), entry['content_type'])
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_replay_server(entries: List[Dict[str, Any]], config: Optional[ReplayConfig] = None,
+                        host: str = '127.0.0.1', port: int = 0) -> ReplayServer:
+    """
+    Start the replay server in a daemon thread
+
+    Args:
+        entries: Corpus entries from load_corpus
+        config: Server behaviour; defaults to zero latency and no errors
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+
+    Returns:
+        The running server; use ``server.base_url`` and ``server.shutdown()``
+    """
+    server = ReplayServer((host, port), entries, config or ReplayConfig())
+    thread = threading.Thread(target=server.serve_forever, name='job-board-stub', daemon=True)
+    thread.start()
+    logger.info(f"Job board stub replaying {len(server.pages)} pages on {server.base_url}")
+    return server
+
+
+def spawn_replay_process(corpus: str, args: argparse.Namespace, host: str = '127.0.0.1',
+                         startup_timeout: float = 10.0) -> Tuple[subprocess.Popen, str]:
+    """
+    Run the replay server in a separate interpreter so serving pages doesn't
+    compete with the scraper for the benchmark's GIL
+
+    Args:
+        corpus: Corpus directory
+        args: Parsed namespace carrying the flags from add_replay_arguments
+        host: Interface to bind
+        startup_timeout: Seconds to wait for the port to accept connections
+
+    Returns:
+        Tuple of (process, base_url); terminate the process when done
+    """
+    with socket.socket() as probe:
+        probe.bind((host, 0))
+        port = probe.getsockname()[1]
+
+    command = [sys.executable, '-m', 'benchmarks.job_board_stub', '--corpus', corpus, '--host', host,
+               '--port', str(port), '--latency', args.latency, '--error-rate', str(args.error_rate),
+               '--error-statuses', args.error_statuses]
+    if args.retry_after is not None:
+        command += ['--retry-after', str(args.retry_after)]
+    if args.seed is not None:
+        command += ['--seed', str(args.seed)]
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(command, cwd=repo_root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=0.2).close()
+            return process, f"http://{host}:{port}"
+        except OSError:
+            time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError(f"Job board stub did not start on {host}:{port}")
+
+
+def add_replay_arguments(parser: argparse.ArgumentParser):
+    """Register the replay server's behaviour flags on an argument parser"""
+    parser.add_argument('--latency', default='fixed:0.0',
+                        help="Per-request latency spec, e.g. 'lognormal:0.3,0.5' (default: fixed:0.0)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests that fail')
+    parser.add_argument('--error-statuses', default='503,500,429',
+                        help='Comma-separated HTTP statuses used for injected errors')
+    parser.add_argument('--retry-after', type=float, default=None,
+                        help='Retry-After seconds sent with injected errors')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible runs')
+
+
+def config_from_args(args: argparse.Namespace) -> ReplayConfig:
+    return ReplayConfig(
+        latency=LatencyModel.from_spec(args.latency, seed=args.seed),
+        error_rate=args.error_rate,
+        error_statuses=tuple(int(s) for s in args.error_statuses.split(',') if s),
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded job posting pages over HTTP')
+    parser.add_argument('--corpus', required=True, help='Corpus directory (manifest.json or HTTP cache)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8770)
+    add_replay_arguments(parser)
+    args = parser.parse_args()
+
+    server = ReplayServer((args.host, args.port), load_corpus(args.corpus), config_from_args(args))
+    logger.info(f"Job board stub replaying {len(server.pages)} pages on {server.base_url} "
+                f"({server.config.latency})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
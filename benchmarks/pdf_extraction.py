@@ -0,0 +1,87 @@
+"""
+PDF text extraction benchmark.
+
+Generates multi-hundred-page fixture PDFs and compares three strategies:
+
+* ``legacy``   - the original serial loop building the result with ``text +=``
+* ``serial``   - PDFExtractor forced in-process (list of pages, one join)
+* ``parallel`` - PDFExtractor fanning page ranges out across its process pool (started
+                 before timing, as it is kept for the life of the app)
+
+    python -m benchmarks.pdf_extraction --pages 50,200,500 --workers 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, List
+
+import PyPDF2
+
+from benchmarks.pdf_fixtures import write_text_pdf
+from services.pdf_extractor import PDFExtractor
+
+
+def legacy_extract(filepath: str) -> str:
+    """The pre-engine implementation, kept here as the baseline"""
+    with open(filepath, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        text = ""
+        for page_num in range(len(pdf_reader.pages)):
+            page = pdf_reader.pages[page_num]
+            text += page.extract_text() + "\n"
+        return text.strip()
+
+
+def best_of(fn: Callable[[str], str], filepath: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(filepath)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark PDF text extraction strategies')
+    parser.add_argument('--pages', default='50,200,500', help='Comma-separated fixture page counts')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Process pool size')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+    parser.add_argument('--fixtures', default=None, help='Directory for fixture PDFs (default: temp dir)')
+    args = parser.parse_args()
+
+    fixture_dir = args.fixtures or tempfile.mkdtemp(prefix='jobtracker-pdf-')
+    serial = PDFExtractor(parallel_threshold=10 ** 9, max_pages=10 ** 9, timeout=3600)
+    parallel = PDFExtractor(parallel_threshold=1, max_pages=10 ** 9, timeout=3600, max_workers=args.workers)
+
+    print(f"\nfixtures in {fixture_dir}, {args.workers} workers, {os.cpu_count()} CPUs, best of {args.repeat}\n")
+    header = f"{'pages':>6}{'size KB':>10}{'legacy s':>11}{'serial s':>11}{'parallel s':>12}{'pages/s (best)':>16}"
+    print(header)
+    print('-' * len(header))
+
+    for pages in [int(p) for p in args.pages.split(',') if p]:
+        path = os.path.join(fixture_dir, f'fixture_{pages}.pdf')
+        if not os.path.exists(path):
+            write_text_pdf(path, pages)
+
+        expected = legacy_extract(path)
+        for extractor in (serial, parallel):
+            if extractor.extract(path) != expected:
+                print(f"output mismatch for {pages} pages", file=sys.stderr)
+                return 1
+
+        results: List[float] = [
+            best_of(legacy_extract, path, args.repeat),
+            best_of(serial.extract, path, args.repeat),
+            best_of(parallel.extract, path, args.repeat),
+        ]
+        size_kb = os.path.getsize(path) / 1024
+        print(f"{pages:>6}{size_kb:>10.0f}{results[0]:>11.2f}{results[1]:>11.2f}{results[2]:>12.2f}"
+              f"{pages / min(results):>16.0f}")
+    parallel.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Generate multi-page text PDFs for extraction benchmarks.
+
+PyPDF2 cannot lay out text, so this writes the handful of objects a text PDF
+needs (catalog, page tree, a Helvetica font and one content stream per page)
+directly, with a correct cross-reference table.
+"""
+import os
+import random
+from typing import List
+
+WORDS = (
+    'python flask sqlalchemy engineer delivery platform roadmap stakeholder '
+    'mentoring kubernetes analytics pipeline latency throughput customer '
+    'ownership design review testing migration reliability budget hiring'
+).split()
+
+
+def _escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def _page_stream(rng: random.Random, lines_per_page: int) -> bytes:
+    lines = [' '.join(rng.choice(WORDS) for _ in range(12)) for _ in range(lines_per_page)]
+    body = ['BT', '/F1 10 Tf', '12 TL', '50 760 Td']
+    for line in lines:
+        body.append(f'({_escape(line)}) Tj T*')
+    body.append('ET')
+    return '\n'.join(body).encode('latin-1')
+
+
+def write_text_pdf(path: str, pages: int, lines_per_page: int = 55, seed: int = 0) -> str:
+    """
+    Write a PDF of ``pages`` pages of wordy text
+
+    Args:
+        path: Output file path
+        pages: Number of pages
+        lines_per_page: Text lines on each page
+        seed: Random seed so fixtures are reproducible
+
+    Returns:
+        The path written
+    """
+    rng = random.Random(seed)
+    objects: List[bytes] = []
+    # 1: catalog, 2: page tree, 3: font; then (page, content) pairs
+    page_ids = [4 + 2 * i for i in range(pages)]
+    objects.append(b'<< /Type /Catalog /Pages 2 0 R >>')
+    kids = ' '.join(f'{pid} 0 R' for pid in page_ids)
+    objects.append(f'<< /Type /Pages /Kids [{kids}] /Count {pages} >>'.encode())
+    objects.append(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')
+    for pid in page_ids:
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                       f'/Resources << /Font << /F1 3 0 R >> >> /Contents {pid + 1} 0 R >>'.encode())
+        stream = _page_stream(rng, lines_per_page)
+        objects.append(b'<< /Length ' + str(len(stream)).encode() + b' >>\nstream\n' + stream + b'\nendstream')
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f'{number} 0 obj\n'.encode() + body + b'\nendobj\n'
+    xref_offset = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    for offset in offsets:
+        out += f'{offset:010d} 00000 n \n'.encode()
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n'.encode()
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'wb') as file:
+        file.write(out)
+    return path
@@ -0,0 +1,156 @@
+"""
+Read model benchmark.
+
+Fills a throwaway SQLite database with synthetic jobs and compares the ORM
+path the list endpoints used to take with the column-projected read models
+in services/read_models.py:
+
+* ``search``  - /api/search/jobs: every job loaded and turned into dicts
+* ``kanban``  - the dashboard: jobs loaded per board column for the template
+
+For each it reports the median wall time and the peak Python memory
+(tracemalloc) of producing the result, scaled to 10k rows.
+
+    python -m benchmarks.read_models --rows 10000,50000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from flask import Flask
+
+from models import db, Job, DEFAULT_USER_ID
+from services.read_models import JOB_CARD, JOB_SEARCH_RESULT
+
+STATUSES = ['saved', 'applied', 'interview', 'offered']
+
+
+def make_app(path: str) -> Flask:
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def fill(rows: int, seed: int = 0):
+    rng = random.Random(seed)
+    words = ['python', 'backend', 'platform', 'data', 'cloud', 'senior', 'remote', 'team', 'api', 'scale']
+    started = datetime(2024, 1, 1)
+    batch = []
+    for index in range(rows):
+        added = started + timedelta(minutes=index)
+        status = rng.choice(STATUSES)
+        batch.append({
+            'user_id': DEFAULT_USER_ID,
+            'url': f'https://example.com/jobs/{index}',
+            'title': f'{rng.choice(words).title()} Engineer {index}',
+            'company': f'Company {rng.randint(1, 500)}',
+            'description': ' '.join(rng.choice(words) for _ in range(rng.randint(80, 300))),
+            'location': rng.choice(['Remote', 'London', 'Berlin', 'New York', None]),
+            'status': status,
+            'date_added': added,
+            'date_applied': added + timedelta(days=2) if status != 'saved' else None,
+            'salary_range': rng.choice(['$100k-$140k', '', None]),
+            'job_type': 'full-time',
+        })
+        if len(batch) == 5000:
+            db.session.execute(Job.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(Job.__table__.insert(), batch)
+    db.session.commit()
+
+
+def orm_search():
+    """api_search_jobs before read models"""
+    return [{
+        'id': job.id,
+        'title': job.title or 'Untitled Job',
+        'company': job.company or 'Unknown Company',
+        'location': job.location or '',
+        'status': job.status,
+        'date_added': job.date_added.strftime('%m/%d/%Y'),
+        'date_applied': job.date_applied.strftime('%m/%d/%Y') if job.date_applied else None,
+        'url': job.url,
+        'salary_range': job.salary_range or '',
+        'description': job.description or ''
+    } for job in Job.query.filter_by(user_id=DEFAULT_USER_ID).order_by(Job.date_added.desc()).all()]
+
+
+def read_model_search():
+    columns = JOB_SEARCH_RESULT.c
+    statement = JOB_SEARCH_RESULT.select().where(columns.user_id == DEFAULT_USER_ID).order_by(columns.date_added.desc())
+    return JOB_SEARCH_RESULT.serialize_all(JOB_SEARCH_RESULT.all(statement))
+
+
+def orm_kanban():
+    """index() before read models (its unused Job.query.all() included)"""
+    everything = Job.query.filter_by(user_id=DEFAULT_USER_ID).all()
+    return everything, [Job.query.filter_by(user_id=DEFAULT_USER_ID, status=status).all() for status in STATUSES]
+
+
+def read_model_kanban():
+    columns = {status: [] for status in STATUSES}
+    board = JOB_CARD.select().where(JOB_CARD.c.user_id == DEFAULT_USER_ID, JOB_CARD.c.status.in_(columns))
+    for job in JOB_CARD.all(board.order_by(JOB_CARD.c.id)):
+        columns[job.status].append(job)
+    return columns
+
+
+def measure(fn, repeat: int):
+    """Median seconds over ``repeat`` runs, then the peak traced memory of one more"""
+    times = []
+    for _ in range(repeat):
+        db.session.remove()
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    db.session.remove()
+    tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    db.session.remove()
+    return statistics.median(times), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ORM loading against column-projected read models')
+    parser.add_argument('--rows', default='10000', help='Comma-separated job counts')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per measurement (median reported)')
+    args = parser.parse_args()
+
+    cases = [('search', orm_search, read_model_search), ('kanban', orm_kanban, read_model_kanban)]
+    print(f"\n{'rows':>7}  {'case':<8}{'path':<12}{'ms':>9}{'ms/10k':>9}{'peak MB':>9}{'MB/10k':>9}{'speedup':>9}")
+    for rows in [int(value) for value in args.rows.split(',') if value]:
+        directory = tempfile.mkdtemp(prefix='read-models-')
+        path = os.path.join(directory, 'jobs.db')
+        app = make_app(path)
+        with app.app_context():
+            db.create_all()
+            fill(rows)
+            scale = 10000 / rows
+            for name, orm_fn, read_fn in cases:
+                baseline = None
+                for label, fn in (('orm', orm_fn), ('read model', read_fn)):
+                    seconds, peak = measure(fn, args.repeat)
+                    baseline = baseline or seconds
+                    print(f"{rows:>7}  {name:<8}{label:<12}{seconds * 1000:>9.1f}{seconds * 1000 * scale:>9.1f}"
+                          f"{peak / 2 ** 20:>9.1f}{peak / 2 ** 20 * scale:>9.1f}{baseline / seconds:>8.1f}x")
+            db.session.remove()
+            db.engine.dispose()
+        os.remove(path)
+        os.rmdir(directory)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
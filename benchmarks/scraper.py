@@ -0,0 +1,187 @@
+"""
+Offline scraper benchmark.
+
+Replays a corpus of job pages through benchmarks.job_board_stub (run as an
+HTTP proxy in its own process) and drives the real scraping paths against
+it:
+
+* ``serial``  - ``JobScraper.extract_job_info`` one URL at a time
+* ``threads`` - ``JobScraper.extract_many`` (thread pool, per-host throttle)
+* ``async``   - ``ScrapeWorker.extract_many`` (httpx on one event loop, retries)
+
+For each it reports pages/sec, parse time per page, how often a selector
+lookup matched on its first probe and, for corpora with known-correct
+fields (generated ones, or any manifest with ``expected`` values), the
+share of pages whose title, company, location and description came out
+right. The HTTP cache is disabled and every mode starts with empty
+selector statistics, so runs are comparable.
+
+    python -m benchmarks.scraper --pages 90 --latency lognormal:0.2,0.5 --error-rate 0.05
+    python -m benchmarks.scraper --corpus instance/http_cache --modes threads,async
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from typing import Any, Dict, List
+
+from benchmarks.html_fixtures import write_corpus
+from benchmarks.job_board_stub import add_replay_arguments, load_corpus, spawn_replay_process
+
+MODES = ('serial', 'threads', 'async')
+FIELDS = ('title', 'company', 'location', 'description')
+
+
+def _normalise(text: Any) -> str:
+    return ' '.join(str(text or '').split())
+
+
+def field_correct(field: str, expected: str, actual: Any) -> bool:
+    """Exact match for short fields; the description only has to contain its first bullet"""
+    if field == 'description':
+        return _normalise(expected) in _normalise(actual)
+    return _normalise(expected) == _normalise(actual)
+
+
+def make_scraper(args: argparse.Namespace):
+    """A JobScraper with its own selector statistics, no HTTP cache, and parse timing"""
+    from services.extractors import ExtractorRegistry, SelectorStats, extractor_registry
+    from services.http_cache import HTTPCache
+    from services.job_scraper import JobScraper
+
+    class TimedScraper(JobScraper):
+        def __init__(self, *a, **kw):
+            super().__init__(*a, **kw)
+            self.parse_seconds = 0.0
+            self.parsed = 0
+            self._timing_lock = threading.Lock()
+
+        def job_info_from_response(self, url, response):
+            started = time.perf_counter()
+            try:
+                return super().job_info_from_response(url, response)
+            finally:
+                with self._timing_lock:
+                    self.parse_seconds += time.perf_counter() - started
+                    self.parsed += 1
+
+    scraper = TimedScraper(max_workers=args.workers, max_per_host=args.max_per_host, host_delay=args.host_delay)
+    scraper.cache = HTTPCache(max_bytes=0)
+    stats = SelectorStats(min_pages=10 ** 9) if args.static_order else SelectorStats()
+    scraper.extractors = ExtractorRegistry(extractor_registry.default, stats=stats)
+    scraper.extractors.extractors = list(extractor_registry.extractors)
+    return scraper
+
+
+def run_mode(mode: str, urls: List[str], args: argparse.Namespace):
+    """Scrape every URL in one mode, returning (results by URL, wall seconds, scraper)"""
+    scraper = make_scraper(args)
+    results: Dict[str, Dict[str, Any]] = {}
+    started = time.perf_counter()
+    if mode == 'serial':
+        for url in urls:
+            results[url] = scraper.extract_job_info(url)
+    elif mode == 'threads':
+        for item in scraper.extract_many(urls):
+            results[item['url']] = item['job_info']
+    else:
+        from services.async_job_scraper import AsyncJobScraper, ScrapeWorker
+        worker = ScrapeWorker(lambda: AsyncJobScraper(scraper, max_per_host=args.max_per_host,
+                                                      host_delay=args.host_delay))
+        try:
+            for item in worker.extract_many(urls):
+                results[item['url']] = item['job_info']
+        finally:
+            worker.shutdown()
+    return results, time.perf_counter() - started, scraper
+
+
+def accuracy(entries: List[Dict[str, Any]], results: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Share of pages with each field correct, overall and per site"""
+    checked = [entry for entry in entries if entry['expected']]
+    groups = {'all': checked}
+    for entry in checked:
+        groups.setdefault(entry['site'] or 'recorded', []).append(entry)
+    return {name: {field: sum(field_correct(field, entry['expected'][field], results[entry['url']].get(field))
+                              for entry in group) / len(group)
+                   for field in FIELDS}
+            for name, group in groups.items() if group}
+
+
+def first_probe_rate(scraper) -> float:
+    """Share of selector lookups, across all domains, answered by the first selector tried"""
+    domains = scraper.extractors.stats().values()
+    lookups = sum(domain['lookups'] for domain in domains)
+    return sum(domain['first_probe_rate'] * domain['lookups'] for domain in domains) / lookups if lookups else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the job scraper against a local replay server')
+    parser.add_argument('--corpus', help='Corpus directory (manifest.json or HTTP cache; default: generate one)')
+    parser.add_argument('--pages', type=int, default=60, help='Pages to generate when --corpus is not given')
+    parser.add_argument('--modes', default=','.join(MODES), help='Comma-separated modes to run')
+    parser.add_argument('--workers', type=int, default=8, help='Thread pool size for the threads mode')
+    parser.add_argument('--max-per-host', type=int, default=4, help='Concurrent requests per job board')
+    parser.add_argument('--host-delay', type=float, default=0.0, help='Seconds between request starts per board')
+    parser.add_argument('--static-order', action='store_true', help='Disable adaptive selector ordering')
+    add_replay_arguments(parser)
+    args = parser.parse_args()
+
+    modes = [mode for mode in args.modes.split(',') if mode]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        print(f"Unknown modes: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    corpus = args.corpus
+    if not corpus:
+        corpus = tempfile.mkdtemp(prefix='scraper-corpus-')
+        write_corpus(corpus, args.pages, seed=args.seed or 0)
+    entries = load_corpus(corpus)
+    if not entries:
+        print('no pages found', file=sys.stderr)
+        return 1
+    urls = [entry['url'] for entry in entries]
+
+    process, base_url = spawn_replay_process(corpus, args)
+    # Route the scraper's plain-HTTP requests (requests and httpx both honour these) through the stub
+    for name in ('NO_PROXY', 'no_proxy'):
+        os.environ.pop(name, None)
+    os.environ['HTTP_PROXY'] = os.environ['http_proxy'] = base_url
+
+    try:
+        print(f"\n{len(entries)} pages from {corpus}, latency {args.latency}, error rate {args.error_rate:.1%}, "
+              f"{'static' if args.static_order else 'adaptive'} selector order\n")
+        header = (f"{'mode':<9}{'pages/s':>9}{'wall s':>8}{'parse ms':>10}{'1st probe':>11}"
+                  + ''.join(f"{field:>13}" for field in FIELDS) + f"{'requests':>10}")
+        print(header)
+        print('-' * len(header))
+        by_site = None
+        for mode in modes:
+            urllib.request.urlopen(urllib.request.Request(f"{base_url}/_stub/reset", method='POST')).read()
+            results, wall, scraper = run_mode(mode, urls, args)
+            stats = json.loads(urllib.request.urlopen(f"{base_url}/_stub/stats").read())
+            scores = accuracy(entries, results)
+            by_site = scores
+            parse_ms = scraper.parse_seconds * 1000 / scraper.parsed if scraper.parsed else 0.0
+            cells = ''.join(f"{scores['all'][field]:>13.1%}" if scores else f"{'-':>13}" for field in FIELDS)
+            print(f"{mode:<9}{len(urls) / wall:>9.1f}{wall:>8.2f}{parse_ms:>10.2f}{first_probe_rate(scraper):>11.1%}"
+                  f"{cells}{stats['requests']:>10}")
+
+        if by_site and len(by_site) > 2:
+            print(f"\nfield accuracy by site ({modes[-1]})")
+            for site, fields in by_site.items():
+                if site != 'all':
+                    print(f"{site:<9}" + ''.join(f"{fields[field]:>13.1%}" for field in FIELDS))
+    finally:
+        process.terminate()
+        process.wait()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+Serving throughput benchmark.
+
+Fills a throwaway SQLite database with synthetic jobs, starts the app under
+each server configuration in its own process group and drives a mix of
+read endpoints over keep-alive HTTP connections from client threads:
+
+* ``werkzeug``   - ``app.run()``, the development server (one process, a thread per request)
+* ``gunicorn:WxT`` - gunicorn.conf.py with W preforked workers of T threads each
+
+The mix is the dashboard, a job page, /api/search/jobs and the analytics
+overview, in equal shares. For each configuration it reports requests/sec
+and p50/p95/p99 latency; errors (non-200 responses or dropped connections)
+are counted separately.
+
+    python -m benchmarks.serving --servers werkzeug,gunicorn:1x8,gunicorn:2x8,gunicorn:4x4 --rows 2000
+"""
+import argparse
+import http.client
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from benchmarks.ai_load_test import summarize
+from benchmarks.read_models import fill, make_app
+from models import db, upgrade_schema
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def prepare_database(path: str, rows: int):
+    app = make_app(path)
+    with app.app_context():
+        upgrade_schema()
+        fill(rows)
+        db.session.remove()
+        db.engine.dispose()
+
+
+def free_port(host: str = '127.0.0.1') -> int:
+    with socket.socket() as probe:
+        probe.bind((host, 0))
+        return probe.getsockname()[1]
+
+
+def start_server(server: str, database: str, port: int, startup_timeout: float = 60.0) -> subprocess.Popen:
+    """Launch one server configuration and wait until it answers"""
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{database}', SEARCH_SCHEDULER_ENABLED='false',
+               GUNICORN_ACCESS_LOG='', FLASK_DEBUG='0')
+    if server == 'werkzeug':
+        command = [sys.executable, '-c', f"from app import app; app.run(port={port})"]
+    elif server.startswith('gunicorn:'):
+        workers, threads = server.split(':', 1)[1].split('x')
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:application',
+                   '--bind', f'127.0.0.1:{port}', '--workers', workers, '--threads', threads]
+    else:
+        raise ValueError(f"Unknown server {server!r}; use werkzeug or gunicorn:WxT")
+    process = subprocess.Popen(command, cwd=REPO_ROOT, env=env, start_new_session=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', '/api/analytics/overview')
+            if connection.getresponse().status == 200:
+                connection.close()
+                return process
+        except OSError:
+            time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError(f"{server} did not start on port {port}")
+
+
+def stop_server(process: subprocess.Popen):
+    """SIGTERM the server's process group (gunicorn shuts its workers down gracefully)"""
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(30)
+    except ProcessLookupError:
+        pass
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def client(port: int, paths: List[str], stop_at: float, seed: int,
+           latencies: List[float], errors: List[int]):
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    while time.monotonic() < stop_at:
+        path = rng.choice(paths)
+        started = time.perf_counter()
+        try:
+            connection.request('GET', path)
+            response = connection.getresponse()
+            response.read()
+            ok = response.status == 200
+            if response.getheader('Connection', '').lower() == 'close':
+                connection.close()
+        except (OSError, http.client.HTTPException):
+            ok = False
+            connection.close()
+        if ok:
+            latencies.append(time.perf_counter() - started)
+        else:
+            errors.append(1)
+    connection.close()
+
+
+def measure(port: int, paths: List[str], concurrency: int, seconds: float) -> Tuple[int, int, Dict[str, float]]:
+    latencies: List[float] = []
+    errors: List[int] = []
+    stop_at = time.monotonic() + seconds
+    threads = [threading.Thread(target=client, args=(port, paths, stop_at, seed, latencies, errors))
+               for seed in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(latencies), len(errors), summarize(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare request throughput of the development server and gunicorn')
+    parser.add_argument('--servers', default='werkzeug,gunicorn:1x8,gunicorn:2x8,gunicorn:4x4',
+                        help='Comma-separated configurations: werkzeug or gunicorn:<workers>x<threads>')
+    parser.add_argument('--rows', type=int, default=2000, help='Synthetic jobs in the database')
+    parser.add_argument('--concurrency', type=int, default=16, help='Client threads')
+    parser.add_argument('--seconds', type=float, default=20, help='Measured load per configuration')
+    parser.add_argument('--warmup', type=float, default=3, help='Unmeasured load before each measurement')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='serving-')
+    database = os.path.join(directory, 'jobs.db')
+    prepare_database(database, args.rows)
+    rng = random.Random(0)
+    paths = ['/', '/api/search/jobs?q=platform&sort=date_desc', '/api/analytics/overview'] + \
+        [f'/job/{rng.randint(1, args.rows)}' for _ in range(3)]
+    paths = paths[:3] * 3 + paths[3:]  # a quarter each: board, search, overview, job pages
+
+    print(f"\n{args.rows} jobs, {args.concurrency} client threads, {args.seconds:g}s per server, "
+          f"{os.cpu_count()} CPUs\n")
+    header = f"{'server':<16}{'requests':>10}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    print(header)
+    print('-' * len(header))
+    for server in [name for name in args.servers.split(',') if name]:
+        port = free_port()
+        process = start_server(server, database, port)
+        try:
+            measure(port, paths, args.concurrency, args.warmup)
+            count, errors, latency = measure(port, paths, args.concurrency, args.seconds)
+        finally:
+            stop_server(process)
+        print(f"{server:<16}{count:>10}{errors:>8}{count / args.seconds:>9.1f}"
+              + ''.join(f"{latency[key] * 1000:>9.1f}" for key in ('p50', 'p95', 'p99')))
+
+    os.remove(database)
+    os.rmdir(directory)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Gunicorn configuration for production.
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+Preforked workers, each serving requests on a pool of threads (``gthread``):
+processes give CPU-bound work (template rendering, fit scoring, parsing)
+real parallelism, and threads keep a worker busy while requests wait on
+Anthropic, job boards or the database.
+
+The app is imported once in the master (``preload_app``), which runs the
+schema upgrade before any worker exists; workers then fork with the code
+already loaded and shared copy-on-write. Everything that holds sockets or
+threads (the database pool, scraper connections, background pools) is
+either created lazily in the worker or reset right after the fork.
+
+Every setting can be overridden on the command line or through the
+environment variables below.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+preload_app = True
+
+# AI generations take tens of seconds; a worker silent for longer than this is restarted
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+# Time given to in-flight requests and background work after SIGTERM before workers are killed
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 60))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+# Recycle workers after this many requests to cap memory growth (0 disables)
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-') or None  # empty disables
+errorlog = '-'
+
+
+def on_starting(server):
+    """Master, once, before forking: bring the database up to date"""
+    from app import migrate
+
+    migrate()
+
+
+def post_fork(server, worker):
+    """Worker, first thing after the fork: drop connections inherited from the master"""
+    from app import app
+    from models import db
+
+    # close=False leaves the master's sockets alone; the worker opens its own
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """Worker, before it accepts requests: warm up, and let one worker run the saved search scheduler"""
+    from app import app, warm_up
+    from services.search_scheduler import search_scheduler
+
+    warm_up()
+    search_scheduler.start(lock_path=os.path.join(app.instance_path, 'search-scheduler.lock'))
+
+
+def worker_exit(server, worker):
+    """Worker, after it stopped accepting requests: finish background work and release pools"""
+    from app import shut_down
+
+    shut_down()
@@ -1,10 +1,15 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from sqlalchemy import inspect, text
 
 db = SQLAlchemy()
 
+# Owner of rows created before jobs had owners, and of requests without a signed-in user
+DEFAULT_USER_ID = 1
+
 class Job(db.Model):
     id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     url = db.Column(db.Text, nullable=False)
     title = db.Column(db.String(200))
     company = db.Column(db.String(100))
@@ -15,10 +20,22 @@ class Job(db.Model):
     date_applied = db.Column(db.DateTime)
     salary_range = db.Column(db.String(50))
     job_type = db.Column(db.String(50))  # full-time, part-time, contract, etc.
+    version = db.Column(db.Integer, nullable=False, default=1)  # bumped on writes to the job or its children; keys cached fragments
     
     # Relationships
     applications = db.relationship('Application', backref='job', lazy=True)
     
+    # Every job query is scoped to its owner, so each hot path gets an index led by user_id:
+    # the board and status counts, newest-first search and timeline, tracked-URL lookups,
+    # and the company/location breakdowns
+    __table_args__ = (
+        db.Index('ix_job_user_status_added', 'user_id', 'status', 'date_added'),
+        db.Index('ix_job_user_added', 'user_id', 'date_added'),
+        db.Index('ix_job_user_url', 'user_id', 'url'),
+        db.Index('ix_job_user_company', 'user_id', 'company'),
+        db.Index('ix_job_user_location', 'user_id', 'location'),
+    )
+    
     def __repr__(self):
         return f'<Job {self.title} at {self.company}>'
 
@@ -44,6 +61,8 @@ class Application(db.Model):
     application_date = db.Column(db.DateTime, default=datetime.utcnow)
     status_notes = db.Column(db.Text)
     
+    __table_args__ = (db.Index('ix_application_user_job', 'user_id', 'job_id'),)
+    
     def __repr__(self):
         return f'<Application for Job {self.job_id}>'
 
@@ -62,6 +81,7 @@ class Company(db.Model):
 class JobNote(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     job_id = db.Column(db.Integer, db.ForeignKey('job.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)  # same owner as the job
     note_type = db.Column(db.String(50), default='general')  # general, interview, follow-up, contact
     title = db.Column(db.String(200))
     content = db.Column(db.Text, nullable=False)
@@ -77,6 +97,7 @@ class JobNote(db.Model):
 class FollowUp(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     job_id = db.Column(db.Integer, db.ForeignKey('job.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)  # same owner as the job
     reminder_date = db.Column(db.DateTime, nullable=False)
     reminder_type = db.Column(db.String(50), default='follow-up')  # follow-up, interview, deadline
     title = db.Column(db.String(200), nullable=False)
@@ -94,6 +115,7 @@ class FollowUp(db.Model):
 class Contact(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     job_id = db.Column(db.Integer, db.ForeignKey('job.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)  # same owner as the job
     name = db.Column(db.String(100), nullable=False)
     role = db.Column(db.String(100))  # recruiter, hiring_manager, hr, etc.
     email = db.Column(db.String(120))
@@ -107,4 +129,177 @@ class Contact(db.Model):
     job = db.relationship('Job', backref=db.backref('contacts', lazy=True, cascade='all, delete-orphan'))
     
     def __repr__(self):
-        return f'<Contact {self.name} for Job {self.job_id}>'
\ No newline at end of file
+        return f'<Contact {self.name} for Job {self.job_id}>'
+
+class ExtractedText(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    filepath = db.Column(db.String(300), nullable=False, unique=True, index=True)
+    sha256 = db.Column(db.String(64), nullable=False, index=True)  # content hash, shared across identical files
+    file_mtime = db.Column(db.Float, nullable=False)
+    file_size = db.Column(db.Integer, nullable=False)
+    text = db.Column(db.Text, nullable=False)
+    extracted_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ExtractedText {self.filepath}>'
+
+class CVDocument(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    filename = db.Column(db.String(200), nullable=False, unique=True)  # per-upload name, shown to the UI
+    filepath = db.Column(db.String(300), nullable=False, index=True)  # stored blob, shared by identical uploads
+    sha256 = db.Column(db.String(64), nullable=False)
+    file_size = db.Column(db.Integer, nullable=False)
+    extension = db.Column(db.String(10), nullable=False)
+    page_count = db.Column(db.Integer)  # PDFs only
+    uploaded_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    extraction_status = db.Column(db.String(20), default='pending', nullable=False)  # pending, processing, done, failed
+    extraction_error = db.Column(db.Text)
+    
+    # Serves the per-user "newest first" CV listing without a table scan
+    __table_args__ = (db.Index('ix_cv_document_user_uploaded', 'user_id', 'uploaded_at'),)
+    
+    def __repr__(self):
+        return f'<CVDocument {self.filename}>'
+
+class StoredBlob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)  # blobs live in per-user folders
+    sha256 = db.Column(db.String(64), nullable=False)
+    extension = db.Column(db.String(10), nullable=False)
+    filepath = db.Column(db.String(300), nullable=False, unique=True)
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=1)  # documents pointing at this blob
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Extraction depends on the extension, so identical bytes under a different type get their own blob
+    __table_args__ = (db.UniqueConstraint('user_id', 'sha256', 'extension', name='uq_stored_blob_owner_content'),)
+    
+    def __repr__(self):
+        return f'<StoredBlob {self.sha256[:12]} refs={self.ref_count}>'
+
+class GeneratedArtifact(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)  # artifacts live in per-user folders
+    sha256 = db.Column(db.String(64), nullable=False)  # hash of the uncompressed text
+    kind = db.Column(db.String(20), nullable=False)  # custom_cv, cover_letter
+    filepath = db.Column(db.String(200), nullable=False, unique=True)
+    size = db.Column(db.Integer, nullable=False)
+    compressed_size = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # drives retention sweeps
+    
+    # The same text is stored once per owner and kind, so a row never reports another user's or kind's artifact
+    __table_args__ = (db.UniqueConstraint('user_id', 'sha256', 'kind', name='uq_generated_artifact_owner_content'),)
+    
+    def __repr__(self):
+        return f'<GeneratedArtifact {self.kind} {self.sha256[:12]}>'
+
+class JobSignature(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('job.id'), nullable=False, unique=True)
+    minhash = db.Column(db.LargeBinary, nullable=False)  # uint32 MinHash signature
+    duplicate_of_id = db.Column(db.Integer, db.ForeignKey('job.id'), index=True)  # older near-duplicate, if any
+    similarity = db.Column(db.Float)  # estimated Jaccard similarity to duplicate_of
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<JobSignature for Job {self.job_id}>'
+
+class JobLSHBucket(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('job.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)  # duplicates are only matched per owner
+    band = db.Column(db.Integer, nullable=False)
+    bucket = db.Column(db.BigInteger, nullable=False)  # hash of the signature rows in this band
+    
+    __table_args__ = (db.Index('ix_job_lsh_bucket_user_band_bucket', 'user_id', 'band', 'bucket'),)
+    
+    def __repr__(self):
+        return f'<JobLSHBucket band {self.band} for Job {self.job_id}>'
+
+class SavedSearch(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    name = db.Column(db.String(200), nullable=False)
+    search_term = db.Column(db.String(200), nullable=False)
+    location = db.Column(db.String(100), default='')
+    sites = db.Column(db.String(200), nullable=False, default='indeed')  # comma-separated JobSpy site names
+    results_wanted = db.Column(db.Integer, nullable=False, default=10)  # per site
+    hours_old = db.Column(db.Integer)  # None uses JOBSPY_HOURS_OLD
+    country = db.Column(db.String(50))
+    interval_minutes = db.Column(db.Integer, nullable=False, default=1440)
+    enabled = db.Column(db.Boolean, nullable=False, default=True)
+    watermark = db.Column(db.DateTime)  # start of the last successful run; older postings are skipped
+    next_run_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # polled by the scheduler
+    running_since = db.Column(db.DateTime)  # claimed by a process running it; runs are exclusive across processes
+    last_run_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    runs = db.relationship('SearchRun', backref='search', lazy='dynamic', cascade='all, delete-orphan',
+                           order_by='SearchRun.started_at.desc()')
+    
+    __table_args__ = (db.Index('ix_saved_search_user_created', 'user_id', 'created_at'),)
+    
+    @property
+    def site_list(self):
+        return [site for site in (self.sites or '').split(',') if site]
+    
+    def __repr__(self):
+        return f'<SavedSearch {self.name}>'
+
+class SearchRun(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    saved_search_id = db.Column(db.Integer, db.ForeignKey('saved_search.id'), nullable=False)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    duration = db.Column(db.Float)  # seconds
+    status = db.Column(db.String(20), nullable=False, default='running')  # running, success, partial, failed
+    fetched = db.Column(db.Integer, nullable=False, default=0)  # postings returned by all sites
+    new = db.Column(db.Integer, nullable=False, default=0)  # inserted as Jobs
+    duplicates = db.Column(db.Integer, nullable=False, default=0)  # cross-posted or already tracked
+    stale = db.Column(db.Integer, nullable=False, default=0)  # posted before the watermark
+    error = db.Column(db.Text)
+    
+    __table_args__ = (db.Index('ix_search_run_search_started', 'saved_search_id', 'started_at'),)
+    
+    def __repr__(self):
+        return f'<SearchRun {self.status} for SavedSearch {self.saved_search_id}>'
+
+# Columns added to tables that predate them, with the value existing rows get (None: nullable, left empty)
+ADDED_COLUMNS = [
+    (Job, 'user_id', DEFAULT_USER_ID),
+    (JobNote, 'user_id', DEFAULT_USER_ID),
+    (FollowUp, 'user_id', DEFAULT_USER_ID),
+    (Contact, 'user_id', DEFAULT_USER_ID),
+    (StoredBlob, 'user_id', DEFAULT_USER_ID),
+    (JobLSHBucket, 'user_id', DEFAULT_USER_ID),
+    (GeneratedArtifact, 'user_id', DEFAULT_USER_ID),
+    (Job, 'version', 1),
+    (SavedSearch, 'running_since', None),
+]
+
+def upgrade_schema():
+    """
+    Bring the database up to the current models (call inside an app context)
+
+    db.create_all() only creates missing tables, so columns in ADDED_COLUMNS
+    are added to existing ones and every model index is created if missing.
+    Only ever adds, so it is safe to run on each start.
+    """
+    db.create_all()
+    inspector = inspect(db.engine)
+    with db.engine.begin() as connection:
+        for model, name, default in ADDED_COLUMNS:
+            table = model.__table__
+            if name in {column['name'] for column in inspector.get_columns(table.name)}:
+                continue
+            column_type = table.c[name].type.compile(dialect=db.engine.dialect)
+            constraint = '' if default is None else f' NOT NULL DEFAULT {default}'
+            connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {name} {column_type}{constraint}'))
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
+    if db.session.get(User, DEFAULT_USER_ID) is None:
+        db.session.add(User(id=DEFAULT_USER_ID, name='Default User', email='default@localhost'))
+        db.session.commit()
@@ -1,11 +1,110 @@
 import anthropic
+import json
 import os
 from typing import Optional, Dict, Any
 import logging
 
+from services.tracing import tracer, traced
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CLAUDE_MODEL = "claude-3-haiku-20240307"
+
+CV_SYSTEM_PROMPT = """You are an expert CV/resume customization specialist. Your task is to optimize a CV for a specific job application while maintaining truthfulness and professionalism.
+
+Guidelines:
+1. Tailor the CV to highlight relevant experience and skills mentioned in the job description
+2. Reorder sections and bullet points to emphasize the most relevant qualifications first
+3. Use keywords from the job description naturally throughout the CV
+4. Optimize the professional summary/objective to align with the role
+5. Maintain all factual information - never invent experience or skills
+6. Keep the same format and structure as much as possible
+7. Ensure the CV remains professional and ATS-friendly
+8. Do not exceed the original CV length significantly
+
+Return only the customized CV text."""
+
+COVER_LETTER_SYSTEM_PROMPT = """You are an expert cover letter writer. Create compelling, personalized cover letters that highlight the candidate's most relevant qualifications for the specific role.
+
+Guidelines:
+1. Write in a professional yet engaging tone
+2. Create a strong opening that grabs attention
+3. Highlight 2-3 key qualifications that directly match the job requirements
+4. Show genuine interest in the company and role
+5. Include a clear call to action
+6. Keep it concise (3-4 paragraphs max)
+7. Use specific examples from the CV when possible
+8. Avoid generic phrases and clichés
+9. Format as a proper business letter
+
+Return only the cover letter text."""
+
+RESEARCH_SYSTEM_PROMPT = """You are a professional researcher specializing in company analysis for job seekers. Provide structured insights about companies to help candidates prepare for applications and interviews.
+
+Guidelines:
+1. Provide factual, well-researched information
+2. Include company culture insights
+3. Mention recent news, developments, or achievements
+4. Identify key talking points for interviews
+5. Suggest questions the candidate might ask
+6. Be honest about limitations of available information
+7. Structure the response clearly
+
+Format your response as a JSON object with these keys:
+- "overview": Brief company description
+- "culture": Company culture insights
+- "recent_news": Recent developments or news
+- "interview_tips": Preparation suggestions
+- "questions_to_ask": Suggested questions for interviews
+- "key_talking_points": Important points to mention in applications/interviews"""
+
+
+def build_cv_prompt(cv_text: str, job_description: str, job_title: str = "", company: str = "") -> str:
+    """Build the user prompt for CV customization"""
+    job_context = f"Job Title: {job_title}\nCompany: {company}\n" if job_title or company else ""
+    
+    return f"""{job_context}Job Description:
+{job_description}
+
+Original CV:
+{cv_text}
+
+Please customize this CV for the job described above."""
+
+
+def build_cover_letter_prompt(cv_text: str, job_description: str, job_title: str = "",
+                              company: str = "", user_name: str = "") -> str:
+    """Build the user prompt for cover letter generation"""
+    return f"""Please write a cover letter for the following position:
+
+Job Title: {job_title}
+Company: {company}
+Candidate Name: {user_name or "[Your Name]"}
+
+Job Description:
+{job_description}
+
+Candidate's CV:
+{cv_text}
+
+Create a compelling cover letter that demonstrates why this candidate is perfect for this role."""
+
+
+def build_research_prompt(company_name: str, job_title: str = "") -> str:
+    """Build the user prompt for company research"""
+    context = f" for a {job_title} position" if job_title else ""
+    return f"Please research {company_name}{context} and provide insights that would help a job candidate."
+
+
+def parse_research(research_text: str) -> Dict[str, Any]:
+    """Parse the research response as JSON, falling back to a plain overview"""
+    try:
+        return json.loads(research_text)
+    except json.JSONDecodeError:
+        return {"overview": research_text}
+
+
 class AIService:
     def __init__(self):
         self.client = None
@@ -29,6 +128,16 @@ class AIService:
         """Check if AI service is available"""
         return self.client is not None
     
+    def _create_message(self, **kwargs):
+        """Call the Messages API, timed as an 'anthropic.messages' span carrying token usage"""
+        with tracer.span('anthropic.messages', model=kwargs.get('model'), max_tokens=kwargs.get('max_tokens')) as span:
+            response = self.client.messages.create(**kwargs)
+            usage = getattr(response, 'usage', None)
+            if span is not None and usage is not None:
+                span.set(input_tokens=usage.input_tokens, output_tokens=usage.output_tokens)
+            return response
+    
+    @traced('ai.customize_cv')
     def customize_cv(self, cv_text: str, job_description: str, job_title: str = "", company: str = "") -> Optional[str]:
         """
         Customize a CV based on job description using AI
@@ -46,35 +155,13 @@ class AIService:
             return None
             
         try:
-            system_prompt = """You are an expert CV/resume customization specialist. Your task is to optimize a CV for a specific job application while maintaining truthfulness and professionalism.
-
-Guidelines:
-1. Tailor the CV to highlight relevant experience and skills mentioned in the job description
-2. Reorder sections and bullet points to emphasize the most relevant qualifications first
-3. Use keywords from the job description naturally throughout the CV
-4. Optimize the professional summary/objective to align with the role
-5. Maintain all factual information - never invent experience or skills
-6. Keep the same format and structure as much as possible
-7. Ensure the CV remains professional and ATS-friendly
-8. Do not exceed the original CV length significantly
-
-Return only the customized CV text."""
-
-            job_context = f"Job Title: {job_title}\nCompany: {company}\n" if job_title or company else ""
+            user_prompt = build_cv_prompt(cv_text, job_description, job_title, company)
             
-            user_prompt = f"""{job_context}Job Description:
-{job_description}
-
-Original CV:
-{cv_text}
-
-Please customize this CV for the job described above."""
-
-            response = self.client.messages.create(
-                model="claude-3-haiku-20240307",
+            response = self._create_message(
+                model=CLAUDE_MODEL,
                 max_tokens=4000,
                 temperature=0.3,
-                system=system_prompt,
+                system=CV_SYSTEM_PROMPT,
                 messages=[
                     {"role": "user", "content": user_prompt}
                 ]
@@ -88,6 +175,7 @@ Please customize this CV for the job described above."""
             logger.error(f"Failed to customize CV: {e}")
             return None
     
+    @traced('ai.generate_cover_letter')
     def generate_cover_letter(self, cv_text: str, job_description: str, job_title: str = "", 
                             company: str = "", user_name: str = "") -> Optional[str]:
         """
@@ -107,40 +195,13 @@ Please customize this CV for the job described above."""
             return None
             
         try:
-            system_prompt = """You are an expert cover letter writer. Create compelling, personalized cover letters that highlight the candidate's most relevant qualifications for the specific role.
-
-Guidelines:
-1. Write in a professional yet engaging tone
-2. Create a strong opening that grabs attention
-3. Highlight 2-3 key qualifications that directly match the job requirements
-4. Show genuine interest in the company and role
-5. Include a clear call to action
-6. Keep it concise (3-4 paragraphs max)
-7. Use specific examples from the CV when possible
-8. Avoid generic phrases and clichés
-9. Format as a proper business letter
-
-Return only the cover letter text."""
-
-            user_prompt = f"""Please write a cover letter for the following position:
-
-Job Title: {job_title}
-Company: {company}
-Candidate Name: {user_name or "[Your Name]"}
-
-Job Description:
-{job_description}
-
-Candidate's CV:
-{cv_text}
-
-Create a compelling cover letter that demonstrates why this candidate is perfect for this role."""
-
-            response = self.client.messages.create(
-                model="claude-3-haiku-20240307",
+            user_prompt = build_cover_letter_prompt(cv_text, job_description, job_title, company, user_name)
+            
+            response = self._create_message(
+                model=CLAUDE_MODEL,
                 max_tokens=2000,
                 temperature=0.4,
-                system=system_prompt,
+                system=COVER_LETTER_SYSTEM_PROMPT,
                 messages=[
                     {"role": "user", "content": user_prompt}
                 ]
@@ -154,6 +215,7 @@ Create a compelling cover letter that demonstrates why this candidate is perfect
             logger.error(f"Failed to generate cover letter: {e}")
             return None
     
+    @traced('ai.research_company')
     def research_company(self, company_name: str, job_title: str = "") -> Optional[Dict[str, Any]]:
         """
         Generate company research insights using AI
@@ -169,33 +231,13 @@ Create a compelling cover letter that demonstrates why this candidate is perfect
             return None
             
         try:
-            system_prompt = """You are a professional researcher specializing in company analysis for job seekers. Provide structured insights about companies to help candidates prepare for applications and interviews.
-
-Guidelines:
-1. Provide factual, well-researched information
-2. Include company culture insights
-3. Mention recent news, developments, or achievements
-4. Identify key talking points for interviews
-5. Suggest questions the candidate might ask
-6. Be honest about limitations of available information
-7. Structure the response clearly
-
-Format your response as a JSON object with these keys:
-- "overview": Brief company description
-- "culture": Company culture insights
-- "recent_news": Recent developments or news
-- "interview_tips": Preparation suggestions
-- "questions_to_ask": Suggested questions for interviews
-- "key_talking_points": Important points to mention in applications/interviews"""
-
-            context = f" for a {job_title} position" if job_title else ""
-            user_prompt = f"Please research {company_name}{context} and provide insights that would help a job candidate."
-
-            response = self.client.messages.create(
-                model="claude-3-haiku-20240307",
+            user_prompt = build_research_prompt(company_name, job_title)
+            
+            response = self._create_message(
+                model=CLAUDE_MODEL,
                 max_tokens=3000,
                 temperature=0.3,
-                system=system_prompt,
+                system=RESEARCH_SYSTEM_PROMPT,
                 messages=[
                     {"role": "user", "content": user_prompt}
                 ]
@@ -205,12 +247,7 @@ Format your response as a JSON object with these keys:
             logger.info(f"Successfully researched company: {company_name}")
             
             # Try to parse as JSON, fall back to text if needed
-            try:
-                import json
-                research_data = json.loads(research_text)
-                return research_data
-            except json.JSONDecodeError:
-                return {"overview": research_text}
+            return parse_research(research_text)
             
         except Exception as e:
             logger.error(f"Failed to research company {company_name}: {e}")
@@ -0,0 +1,239 @@
+import os
+import gzip
+import hashlib
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from models import db, Application, GeneratedArtifact
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Application column that points at the latest artifact of each kind
+KIND_COLUMNS = {'custom_cv': 'custom_cv_path', 'cover_letter': 'cover_letter_path'}
+
+# Plain-text artifacts written before the store existed
+LEGACY_PREFIXES = ('custom_cv_', 'cover_letter_')
+
+class ArtifactStore:
+    """
+    Storage for AI-generated CVs and cover letters.
+
+    Artifacts are gzip-compressed and stored once per user, kind and
+    distinct text under ``artifacts/<user_id>/<aa>/<sha256>-<kind>.txt.gz``;
+    the owning ``Application`` row points at the latest one of each kind. Anything no application points at (an
+    artifact superseded by a newer generation, a file with no database row,
+    a pre-store ``.txt``) is removed by ``sweep`` once it is older than the
+    retention period.
+    """
+
+    def __init__(self, upload_folder: str = 'static/uploads', retention_days: Optional[int] = None,
+                 compress_level: int = 6):
+        self.upload_folder = upload_folder
+        self.artifact_folder = os.path.join(upload_folder, 'artifacts')
+        self.retention_days = int(os.getenv('ARTIFACT_RETENTION_DAYS', 30)) if retention_days is None else retention_days
+        self.compress_level = compress_level
+
+    def artifact_path(self, sha256: str, kind: str, user_id: int = 1) -> str:
+        return os.path.join(self.artifact_folder, str(user_id), sha256[:2], f"{sha256}-{kind}.txt.gz")
+
+    def save(self, text: str, kind: str, job_id: int, user_id: int = 1) -> Optional[str]:
+        """
+        Store a generated artifact and link it to the job's application
+
+        Args:
+            text: Generated content
+            kind: 'custom_cv' or 'cover_letter'
+            job_id: Job the artifact was generated for
+            user_id: User ID
+
+        Returns:
+            Filepath of the stored artifact or None if failed
+        """
+        try:
+            data = text.encode('utf-8')
+            sha256 = hashlib.sha256(data).hexdigest()
+
+            artifact = GeneratedArtifact.query.filter_by(user_id=user_id, sha256=sha256, kind=kind).first()
+            if artifact is None or not os.path.exists(artifact.filepath):
+                filepath = self.artifact_path(sha256, kind, user_id)
+                compressed_size = self._write(filepath, data)
+                if artifact is None:
+                    artifact = self._insert(GeneratedArtifact(
+                        user_id=user_id, sha256=sha256, kind=kind, filepath=filepath,
+                        size=len(data), compressed_size=compressed_size))
+                else:
+                    # Row survived but its file went missing; point it at the rewritten copy
+                    artifact.filepath = filepath
+                    artifact.compressed_size = compressed_size
+            else:
+                logger.info(f"Identical {kind} already stored: {artifact.filepath}")
+
+            artifact.last_used_at = datetime.utcnow()
+
+            application = Application.query.filter_by(job_id=job_id, user_id=user_id)\
+                .order_by(Application.application_date.desc()).first()
+            if application is None:
+                application = Application(job_id=job_id, user_id=user_id)
+                db.session.add(application)
+            setattr(application, KIND_COLUMNS[kind], artifact.filepath)
+
+            db.session.commit()
+            logger.info(f"{kind} saved: {artifact.filepath}")
+            return artifact.filepath
+
+        except Exception as e:
+            logger.error(f"Failed to save {kind}: {e}")
+            if isinstance(e, SQLAlchemyError):
+                db.session.rollback()
+            return None
+
+    def _write(self, filepath: str, data: bytes) -> int:
+        """Compress to a temp file and move it into place, returning the compressed size"""
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        temp_path = f"{filepath}.{uuid.uuid4().hex}.tmp"
+        try:
+            with gzip.open(temp_path, 'wb', compresslevel=self.compress_level) as file:
+                file.write(data)
+            os.replace(temp_path, filepath)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return os.path.getsize(filepath)
+
+    def _insert(self, artifact: GeneratedArtifact) -> GeneratedArtifact:
+        db.session.add(artifact)
+        try:
+            db.session.commit()
+            return artifact
+        except IntegrityError:
+            # A concurrent generation of the same text by this user stored it first
+            db.session.rollback()
+            return GeneratedArtifact.query.filter_by(user_id=artifact.user_id, sha256=artifact.sha256,
+                                                     kind=artifact.kind).one()
+
+    def sweep(self, retention_days: Optional[int] = None, batch_size: int = 500,
+              dry_run: bool = False) -> Dict[str, int]:
+        """
+        Garbage-collect artifacts that no application points at
+
+        Works in batches of ``batch_size`` rows/files, committing after each
+        batch, so a large backlog never holds one long transaction.
+
+        A ``save`` running concurrently can re-link an artifact after it was
+        selected, so each row is deleted only if it is still stale and
+        unreferenced at delete time, and its file is removed before the
+        batch commits. A save that read the row before the delete then fails
+        its update instead of linking a removed file; one that reads after
+        the commit finds no row and writes a fresh copy.
+
+        Args:
+            retention_days: Keep unreferenced artifacts younger than this
+            batch_size: Rows or files handled per batch
+            dry_run: Count what would be removed without removing it
+
+        Returns:
+            Counts of removed unreferenced artifacts, orphan files, legacy
+            files, and bytes freed
+        """
+        retention_days = self.retention_days if retention_days is None else retention_days
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        stats = {'unreferenced': 0, 'orphan_files': 0, 'legacy_files': 0, 'bytes_freed': 0}
+
+        for batch in self._unreferenced_batches(cutoff, batch_size):
+            for artifact in batch:
+                if not dry_run and not GeneratedArtifact.query.filter(
+                        GeneratedArtifact.id == artifact.id, *self._unreferenced(cutoff))\
+                        .delete(synchronize_session=False):
+                    continue  # re-linked by a save since the batch was read
+                stats['unreferenced'] += 1
+                stats['bytes_freed'] += self._remove(artifact.filepath, dry_run)
+            if not dry_run:
+                db.session.commit()
+
+        for batch in self._batched(self._old_files(self.artifact_folder, cutoff), batch_size):
+            known = {path for (path,) in db.session.query(GeneratedArtifact.filepath)
+                     .filter(GeneratedArtifact.filepath.in_(batch))}
+            for filepath in batch:
+                if filepath not in known:
+                    stats['orphan_files'] += 1
+                    stats['bytes_freed'] += self._remove(filepath, dry_run)
+
+        legacy = (path for path in self._old_files(self.upload_folder, cutoff, recursive=False)
+                  if os.path.basename(path).startswith(LEGACY_PREFIXES) and path.endswith('.txt'))
+        for batch in self._batched(legacy, batch_size):
+            referenced = self._referenced_paths(batch)
+            for filepath in batch:
+                if filepath not in referenced:
+                    stats['legacy_files'] += 1
+                    stats['bytes_freed'] += self._remove(filepath, dry_run)
+
+        logger.info(f"Artifact sweep{' (dry run)' if dry_run else ''}: {stats}")
+        return stats
+
+    def _unreferenced(self, cutoff: datetime) -> tuple:
+        """Conditions matching artifacts unused since cutoff that no application points at"""
+        referenced = db.session.query(Application.id).filter(or_(
+            Application.custom_cv_path == GeneratedArtifact.filepath,
+            Application.cover_letter_path == GeneratedArtifact.filepath)).exists()
+        return GeneratedArtifact.last_used_at < cutoff, ~referenced
+
+    def _unreferenced_batches(self, cutoff: datetime, batch_size: int) -> Iterator[List[GeneratedArtifact]]:
+        last_id = 0
+        while True:
+            batch = GeneratedArtifact.query\
+                .filter(GeneratedArtifact.id > last_id, *self._unreferenced(cutoff))\
+                .order_by(GeneratedArtifact.id).limit(batch_size).all()
+            if not batch:
+                return
+            last_id = batch[-1].id
+            yield batch
+
+    def _referenced_paths(self, paths: List[str]) -> set:
+        rows = db.session.query(Application.custom_cv_path, Application.cover_letter_path)\
+            .filter(or_(Application.custom_cv_path.in_(paths), Application.cover_letter_path.in_(paths)))
+        return {path for row in rows for path in row if path}
+
+    def _old_files(self, folder: str, cutoff: datetime, recursive: bool = True) -> Iterator[str]:
+        """Yield files under folder last modified before cutoff (temp files included)"""
+        if not os.path.isdir(folder):
+            return
+        cutoff_ts = cutoff.replace(tzinfo=timezone.utc).timestamp()
+        for root, dirs, files in os.walk(folder):
+            if not recursive:
+                dirs[:] = []
+            for filename in files:
+                filepath = os.path.join(root, filename)
+                try:
+                    if os.path.getmtime(filepath) < cutoff_ts:
+                        yield filepath
+                except OSError:
+                    continue
+
+    def _batched(self, items: Iterator[str], batch_size: int) -> Iterator[List[str]]:
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _remove(self, filepath: str, dry_run: bool) -> int:
+        """Delete a file, returning its size (0 if it was already gone)"""
+        try:
+            size = os.path.getsize(filepath)
+            if not dry_run:
+                os.remove(filepath)
+            return size
+        except OSError:
+            return 0
+
+# Global artifact store instance
+artifact_store = ArtifactStore()
@@ -0,0 +1,178 @@
+import anthropic
+import os
+from typing import Optional, Dict, Any
+import logging
+
+from services.ai_service import (
+    CLAUDE_MODEL,
+    CV_SYSTEM_PROMPT,
+    COVER_LETTER_SYSTEM_PROMPT,
+    RESEARCH_SYSTEM_PROMPT,
+    build_cv_prompt,
+    build_cover_letter_prompt,
+    build_research_prompt,
+    parse_research,
+)
+from services.tracing import tracer, traced
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class AsyncAIService:
+    """
+    Asyncio counterpart of AIService built on AsyncAnthropic.
+
+    Methods mirror AIService one-for-one (same arguments, same return values)
+    but are coroutines, so many in-flight generations share one event loop
+    instead of each holding an OS thread. The client's connection pool is
+    bound to the loop that first uses it, so keep one instance per loop.
+    """
+
+    def __init__(self):
+        self.client = None
+        self._initialize_claude()
+
+    def _initialize_claude(self):
+        """Initialize async Anthropic Claude client with API key"""
+        api_key = os.getenv('ANTHROPIC_API_KEY')
+        if not api_key or api_key == 'your_anthropic_api_key_here':
+            logger.warning("Anthropic API key not configured. Async AI features will be disabled.")
+            return
+
+        try:
+            self.client = anthropic.AsyncAnthropic(api_key=api_key)
+            logger.info("Async Anthropic Claude client initialized successfully")
+        except Exception as e:
+            logger.error(f"Failed to initialize async Anthropic client: {e}")
+            self.client = None
+
+    def is_available(self) -> bool:
+        """Check if AI service is available"""
+        return self.client is not None
+
+    async def close(self):
+        """Release pooled connections (call on event loop shutdown)"""
+        if self.client is not None:
+            await self.client.close()
+
+    async def _create_message(self, **kwargs):
+        """Call the Messages API, timed as an 'anthropic.messages' span carrying token usage"""
+        with tracer.span('anthropic.messages', model=kwargs.get('model'), max_tokens=kwargs.get('max_tokens')) as span:
+            response = await self.client.messages.create(**kwargs)
+            usage = getattr(response, 'usage', None)
+            if span is not None and usage is not None:
+                span.set(input_tokens=usage.input_tokens, output_tokens=usage.output_tokens)
+            return response
+
+    @traced('ai.customize_cv')
+    async def customize_cv(self, cv_text: str, job_description: str, job_title: str = "", company: str = "") -> Optional[str]:
+        """
+        Customize a CV based on job description using AI
+
+        Args:
+            cv_text: Original CV content
+            job_description: Job description to tailor CV for
+            job_title: Optional job title
+            company: Optional company name
+
+        Returns:
+            Customized CV text or None if service unavailable
+        """
+        if not self.is_available():
+            return None
+
+        try:
+            response = await self._create_message(
+                model=CLAUDE_MODEL,
+                max_tokens=4000,
+                temperature=0.3,
+                system=CV_SYSTEM_PROMPT,
+                messages=[
+                    {"role": "user", "content": build_cv_prompt(cv_text, job_description, job_title, company)}
+                ]
+            )
+
+            customized_cv = response.content[0].text.strip()
+            logger.info(f"Successfully customized CV for {job_title} at {company}")
+            return customized_cv
+
+        except Exception as e:
+            logger.error(f"Failed to customize CV: {e}")
+            return None
+
+    @traced('ai.generate_cover_letter')
+    async def generate_cover_letter(self, cv_text: str, job_description: str, job_title: str = "",
+                                    company: str = "", user_name: str = "") -> Optional[str]:
+        """
+        Generate a cover letter based on CV and job description
+
+        Args:
+            cv_text: User's CV content
+            job_description: Job description
+            job_title: Job title
+            company: Company name
+            user_name: User's name for personalization
+
+        Returns:
+            Generated cover letter or None if service unavailable
+        """
+        if not self.is_available():
+            return None
+
+        try:
+            user_prompt = build_cover_letter_prompt(cv_text, job_description, job_title, company, user_name)
+
+            response = await self._create_message(
+                model=CLAUDE_MODEL,
+                max_tokens=2000,
+                temperature=0.4,
+                system=COVER_LETTER_SYSTEM_PROMPT,
+                messages=[
+                    {"role": "user", "content": user_prompt}
+                ]
+            )
+
+            cover_letter = response.content[0].text.strip()
+            logger.info(f"Successfully generated cover letter for {job_title} at {company}")
+            return cover_letter
+
+        except Exception as e:
+            logger.error(f"Failed to generate cover letter: {e}")
+            return None
+
+    @traced('ai.research_company')
+    async def research_company(self, company_name: str, job_title: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Generate company research insights using AI
+
+        Args:
+            company_name: Name of the company
+            job_title: Optional job title for context
+
+        Returns:
+            Dictionary with research insights or None
+        """
+        if not self.is_available():
+            return None
+
+        try:
+            response = await self._create_message(
+                model=CLAUDE_MODEL,
+                max_tokens=3000,
+                temperature=0.3,
+                system=RESEARCH_SYSTEM_PROMPT,
+                messages=[
+                    {"role": "user", "content": build_research_prompt(company_name, job_title)}
+                ]
+            )
+
+            research_text = response.content[0].text.strip()
+            logger.info(f"Successfully researched company: {company_name}")
+            return parse_research(research_text)
+
+        except Exception as e:
+            logger.error(f"Failed to research company {company_name}: {e}")
+            return None
+
+# Global async AI service instance (used by the ASGI entry point)
+async_ai_service = AsyncAIService()
@@ -0,0 +1,263 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+import concurrent.futures
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from services.job_scraper import JobScraper, job_scraper
+from services.tracing import tracer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Responses worth another attempt; anything else is final
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class AsyncHostThrottle:
+    """
+    Asyncio counterpart of HostThrottle: at most ``max_per_host`` requests in
+    flight to one host, with request starts spaced ``delay`` seconds apart.
+    """
+
+    def __init__(self, max_per_host: int = 2, delay: float = 0.5):
+        self.max_per_host = max_per_host
+        self.delay = delay
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    async def __call__(self, host: str, request):
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.max_per_host))
+        async with semaphore:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + self.delay
+            if start > now:
+                await asyncio.sleep(start - now)
+            return await request()
+
+class AsyncJobScraper:
+    """
+    Asyncio job page fetcher built on httpx.AsyncClient.
+
+    Results have exactly the shape of ``JobScraper.extract_job_info`` (the
+    sync scraper's parsing and HTTP cache are reused), but fetches are
+    coroutines: hundreds of postings share one event loop and one
+    keep-alive connection pool, which httpx keys per host, instead of
+    each holding a thread and a socket of its own.
+
+    Each request gets ``SCRAPER_RETRIES`` retries on connection errors,
+    timeouts and 429/5xx responses, backing off exponentially (with
+    jitter, or as told by ``Retry-After``). A posting's whole extraction,
+    retries included, must finish within ``SCRAPER_DEADLINE`` seconds.
+
+    The client and throttle are bound to the loop that first uses them, so
+    keep one instance per loop; ``ScrapeWorker`` runs one on a background
+    thread for synchronous callers.
+    """
+
+    def __init__(self, scraper: Optional[JobScraper] = None, max_connections: Optional[int] = None,
+                 max_per_host: Optional[int] = None, host_delay: Optional[float] = None,
+                 retries: Optional[int] = None, backoff: Optional[float] = None,
+                 deadline: Optional[float] = None, timeout: float = 10.0):
+        self.scraper = scraper or job_scraper
+        self.max_connections = max_connections or int(os.getenv('SCRAPER_MAX_CONNECTIONS', 20))
+        self.throttle = AsyncHostThrottle(
+            max_per_host=max_per_host or int(os.getenv('SCRAPER_MAX_PER_HOST', 2)),
+            delay=float(os.getenv('SCRAPER_HOST_DELAY', 0.5)) if host_delay is None else host_delay
+        )
+        self.retries = int(os.getenv('SCRAPER_RETRIES', 2)) if retries is None else retries
+        self.backoff = float(os.getenv('SCRAPER_BACKOFF', 0.5)) if backoff is None else backoff
+        self.deadline = deadline or float(os.getenv('SCRAPER_DEADLINE', 30))
+        self.timeout = timeout
+        self.client: Optional[httpx.AsyncClient] = None
+
+    def _client(self) -> httpx.AsyncClient:
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                headers=self.scraper.headers,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections, keepalive_expiry=30),
+                timeout=httpx.Timeout(self.timeout),
+                follow_redirects=True,
+            )
+        return self.client
+
+    async def close(self):
+        """Release pooled connections (call on event loop shutdown)"""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def extract_job_info(self, url: str) -> Dict[str, Any]:
+        """
+        Extract job information from a job posting URL
+
+        Args:
+            url: Job posting URL
+
+        Returns:
+            Dictionary with extracted job information (see JobScraper.extract_job_info)
+        """
+        with tracer.span('scraper.extract_job_info', url=url):
+            try:
+                response = await self._fetch(url)
+            except Exception as e:
+                return self.scraper.failed_job_info(url, e)
+            # Parsing is CPU-bound; keep it off the event loop
+            return await asyncio.to_thread(self.scraper.job_info_from_response, url, response)
+
+    async def _fetch(self, url: str):
+        """GET a URL through the HTTP cache, with retries"""
+        cache = self.scraper.cache
+        cached, headers, entry = await asyncio.to_thread(cache.lookup, url)
+        if cached is not None:
+            return cached
+        with tracer.span('scraper.fetch', url=url) as span:
+            response = await self._send(url, headers)
+            if span is not None:
+                span.set(status_code=response.status_code, bytes=len(response.content))
+        return await asyncio.to_thread(cache.complete, url, response, entry)
+
+    async def _send(self, url: str, headers: Dict[str, str]) -> httpx.Response:
+        host = urlparse(url).netloc.lower()
+        client = self._client()
+        # The deadline starts with the first attempt, not while queued behind the host's other requests
+        deadline = None
+
+        async def request() -> httpx.Response:
+            nonlocal deadline
+            if deadline is None:
+                deadline = time.monotonic() + self.deadline
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+            return await asyncio.wait_for(client.get(url, headers=headers or None), timeout=remaining)
+
+        attempt = 0
+        while True:
+            try:
+                response = await self.throttle(host, request)
+                if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return response
+                delay = self._retry_after(response) or self._backoff(attempt)
+                reason = f'HTTP {response.status_code}'
+            except asyncio.TimeoutError:
+                raise TimeoutError(f'No response within {self.deadline:g}s') from None
+            except httpx.TransportError as e:
+                if attempt >= self.retries:
+                    raise
+                delay, reason = self._backoff(attempt), type(e).__name__
+
+            if time.monotonic() + delay >= deadline:
+                raise TimeoutError(f'{reason}; retrying would pass the {self.deadline:g}s deadline')
+            attempt += 1
+            logger.info(f"Retrying {url} in {delay:.1f}s ({reason}, attempt {attempt} of {self.retries})")
+            await asyncio.sleep(delay)
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff, jittered so retries from many tasks don't line up"""
+        return random.uniform(0.5, 1.0) * self.backoff * (2 ** attempt)
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> Optional[float]:
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    async def extract_many(self, urls: List[str]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Extract job information from many URLs on this event loop
+
+        Args:
+            urls: Job posting URLs
+
+        Yields:
+            {'index', 'url', 'job_info'} for each URL, in completion order
+        """
+        async def extract(index: int, url: str):
+            return index, url, await self.extract_job_info(url)
+
+        # The per-host throttle queues each site separately, so submission order doesn't matter
+        tasks = [asyncio.ensure_future(extract(index, url)) for index, url in enumerate(urls)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, url, job_info = await next_done
+                yield {'index': index, 'url': url, 'job_info': job_info}
+        finally:
+            for task in tasks:
+                task.cancel()
+
+class ScrapeWorker:
+    """
+    Background thread running an event loop and an AsyncJobScraper, so
+    synchronous code (Flask views) can hand it many extractions at once.
+    """
+
+    def __init__(self, scraper_factory=AsyncJobScraper):
+        self.scraper_factory = scraper_factory
+        self.scraper: Optional[AsyncJobScraper] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self.scraper = self.scraper_factory()
+                self._thread = threading.Thread(target=self._loop.run_forever, name='scrape-loop', daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def submit(self, url: str) -> concurrent.futures.Future:
+        """Queue one extraction; the future resolves to extract_job_info's result"""
+        loop = self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(tracer.bind(self.scraper.extract_job_info(url)), loop)
+
+    def extract_many(self, urls: List[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Extract many URLs on the worker's loop, blocking the caller between results
+
+        Yields:
+            {'index', 'url', 'job_info'} for each URL, in completion order
+        """
+        futures = {self.submit(url): (index, url) for index, url in enumerate(urls)}
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                index, url = futures[future]
+                yield {'index': index, 'url': url, 'job_info': future.result()}
+        finally:
+            # Stop outstanding fetches if the consumer goes away (e.g. client disconnect)
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self, timeout: float = 5.0):
+        """Close the connection pool and stop the loop"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self.scraper.close(), loop).result(timeout)
+        except Exception as e:
+            logger.error(f"Failed to close scraper connections: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(timeout)
+
+# Global scrape worker instance
+scrape_worker = ScrapeWorker()
@@ -1,17 +1,29 @@
-import PyPDF2
 import os
+import hashlib
 from werkzeug.utils import secure_filename
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from typing import Optional, Tuple
 import logging
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
+
+from models import db, ExtractedText, CVDocument, StoredBlob
+from services.pdf_extractor import pdf_extractor
+from services.artifact_store import artifact_store
+from services.tracing import traced
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+HASH_CHUNK_SIZE = 64 * 1024
+
+class ExtractionError(Exception):
+    """Raised when text cannot be extracted from a document"""
+
 class CVProcessor:
     def __init__(self, upload_folder: str = 'static/uploads'):
         self.upload_folder = upload_folder
+        self.blob_folder = os.path.join(upload_folder, 'blobs')
         self.allowed_extensions = {'pdf', 'txt', 'doc', 'docx'}
         
         # Ensure upload directory exists
@@ -26,6 +38,9 @@ class CVProcessor:
         """
         Save uploaded CV file and return filepath and extracted text
         
+        Extracts in the calling thread; the upload route hands extraction to
+        the background pipeline via store_uploaded_file instead.
+        
         Args:
             file: Uploaded file object
             user_id: User ID for organizing files
@@ -33,6 +48,33 @@ class CVProcessor:
         Returns:
             Tuple of (filepath, extracted_text) or None if failed
         """
+        document = self.store_uploaded_file(file, user_id)
+        if document is None:
+            return None
+        
+        try:
+            extracted_text = self.load_text(document.filepath)
+            self.mark_extraction(document.id, 'done')
+        except ExtractionError as e:
+            extracted_text = str(e)
+            self.mark_extraction(document.id, 'failed', extracted_text)
+        return document.filepath, extracted_text
+    
+    @traced('cv.store_uploaded_file')
+    def store_uploaded_file(self, file, user_id: int = 1) -> Optional[CVDocument]:
+        """
+        Save an uploaded CV and index it, without extracting its text
+        
+        The document starts out 'pending' unless identical content has already
+        been extracted, in which case it is 'done' straight away.
+        
+        Args:
+            file: Uploaded file object
+            user_id: User ID for organizing files
+            
+        Returns:
+            The new CVDocument, or None if failed
+        """
         if not file or file.filename == '':
             return None
             
@@ -41,24 +83,135 @@ class CVProcessor:
             return None
         
         try:
-            # Generate unique filename
+            # Per-upload name for the UI; the bytes live in a content-addressed blob
             file_extension = file.filename.rsplit('.', 1)[1].lower()
             unique_filename = f"cv_{user_id}_{uuid.uuid4().hex[:8]}.{file_extension}"
-            filepath = os.path.join(self.upload_folder, unique_filename)
-            
-            # Save file
-            file.save(filepath)
-            logger.info(f"CV file saved: {filepath}")
             
-            # Extract text based on file type
-            extracted_text = self.extract_text_from_file(filepath)
+            blob = self._store_blob(file, file_extension, user_id)
+            logger.info(f"CV file saved: {unique_filename} -> {blob.filepath}")
             
-            return filepath, extracted_text
+            # Index the document so listings never need to scan the folder
+            status = 'done' if self.has_cached_text(blob.filepath) else 'pending'
+            return self._register_document(blob.filepath, user_id, filename=unique_filename,
+                                           sha256=blob.sha256, extraction_status=status)
             
         except Exception as e:
             logger.error(f"Failed to save uploaded file: {e}")
             return None
     
+    def mark_extraction(self, document_id: int, status: str, error: Optional[str] = None):
+        """
+        Record the extraction state of a CV document
+        
+        Args:
+            document_id: CVDocument ID
+            status: 'pending', 'processing', 'done' or 'failed'
+            error: Failure message, for 'failed'
+        """
+        try:
+            CVDocument.query.filter_by(id=document_id).update(
+                {CVDocument.extraction_status: status, CVDocument.extraction_error: error})
+            db.session.commit()
+        except SQLAlchemyError as e:
+            logger.error(f"Failed to update extraction status of document {document_id}: {e}")
+            db.session.rollback()
+    
+    def blob_path(self, sha256: str, file_extension: str, user_id: int = 1) -> str:
+        """Sharded location of a user's blob, e.g. blobs/1/ab/cd/abcd....pdf"""
+        return os.path.join(self.blob_folder, str(user_id), sha256[:2], sha256[2:4], f"{sha256}.{file_extension}")
+    
+    def _store_blob(self, file, file_extension: str, user_id: int = 1) -> StoredBlob:
+        """
+        Stream an upload to disk, hashing it on the way, and store it by content
+        
+        Blobs are deduplicated within each user's folder: if the user already
+        has identical bytes the new copy is discarded and the existing blob's
+        reference count is bumped instead.
+        
+        Args:
+            file: Uploaded file object
+            file_extension: Lower-case extension of the upload
+            user_id: Owner of the upload
+            
+        Returns:
+            The StoredBlob holding the upload's bytes
+        """
+        os.makedirs(self.blob_folder, exist_ok=True)
+        temp_path = os.path.join(self.blob_folder, f".incoming-{uuid.uuid4().hex}")
+        digest = hashlib.sha256()
+        size = 0
+        
+        try:
+            with open(temp_path, 'wb') as out:
+                for chunk in iter(lambda: file.stream.read(HASH_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+            sha256 = digest.hexdigest()
+            
+            blob = StoredBlob.query.filter_by(user_id=user_id, sha256=sha256, extension=file_extension).first()
+            if blob is not None and os.path.exists(blob.filepath):
+                logger.info(f"Duplicate upload, reusing blob {blob.filepath}")
+                return self._add_reference(blob)
+            
+            filepath = self.blob_path(sha256, file_extension, user_id)
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            os.replace(temp_path, filepath)
+            
+            if blob is not None:
+                # Row survived but the file went missing; the rewrite restores it
+                return self._add_reference(blob)
+            
+            blob = StoredBlob(user_id=user_id, sha256=sha256, extension=file_extension, filepath=filepath,
+                              size=size, ref_count=1)
+            db.session.add(blob)
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # A concurrent upload of the same bytes won the insert; databases created before
+                # blobs had owners keep the global (sha256, extension) constraint, so that blob
+                # may belong to another user
+                db.session.rollback()
+                existing = StoredBlob.query.filter_by(sha256=sha256, extension=file_extension)
+                blob = existing.filter_by(user_id=user_id).first() or existing.first()
+                if blob.filepath != filepath and os.path.exists(filepath):
+                    os.remove(filepath)
+                return self._add_reference(blob)
+            return blob
+            
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    def _add_reference(self, blob: StoredBlob) -> StoredBlob:
+        StoredBlob.query.filter_by(id=blob.id).update({StoredBlob.ref_count: StoredBlob.ref_count + 1})
+        db.session.commit()
+        return blob
+    
+    def _release_blob(self, filepath: str) -> bool:
+        """
+        Drop one reference to a blob, deleting it once nothing points to it
+        
+        Returns:
+            True if the path is a stored blob, False otherwise
+        """
+        blob = StoredBlob.query.filter_by(filepath=filepath).first()
+        if blob is None:
+            return False
+        
+        StoredBlob.query.filter_by(id=blob.id).update({StoredBlob.ref_count: StoredBlob.ref_count - 1})
+        db.session.commit()
+        db.session.refresh(blob)
+        
+        if blob.ref_count <= 0:
+            db.session.delete(blob)
+            ExtractedText.query.filter_by(filepath=filepath).delete()
+            db.session.commit()
+            if os.path.exists(filepath):
+                os.remove(filepath)
+            logger.info(f"Blob deleted: {filepath}")
+        return True
+    
     def extract_text_from_file(self, filepath: str) -> str:
         """
         Extract text content from various file types
@@ -69,6 +222,14 @@ class CVProcessor:
         Returns:
             Extracted text content
         """
+        try:
+            return self._extract_text(filepath)
+        except ExtractionError as e:
+            return str(e)
+    
+    @traced('cv.extract_text')
+    def _extract_text(self, filepath: str) -> str:
+        """Extract text, raising ExtractionError instead of returning an error message"""
         file_extension = filepath.rsplit('.', 1)[1].lower()
         
         try:
@@ -80,28 +241,21 @@ class CVProcessor:
                 return self._extract_from_docx(filepath)
             else:
                 logger.error(f"Unsupported file type: {file_extension}")
-                return "Unsupported file type"
+                raise ExtractionError("Unsupported file type")
                 
+        except ExtractionError:
+            raise
         except Exception as e:
             logger.error(f"Text extraction failed for {filepath}: {e}")
-            return f"Text extraction failed: {str(e)}"
+            raise ExtractionError(f"Text extraction failed: {str(e)}") from e
     
     def _extract_from_pdf(self, filepath: str) -> str:
         """Extract text from PDF file"""
         try:
-            with open(filepath, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    text += page.extract_text() + "\n"
-                
-                return text.strip()
-                
+            return pdf_extractor.extract(filepath)
         except Exception as e:
             logger.error(f"PDF extraction failed: {e}")
-            return f"PDF extraction failed: {str(e)}"
+            raise ExtractionError(f"PDF extraction failed: {str(e)}") from e
     
     def _extract_from_txt(self, filepath: str) -> str:
         """Extract text from plain text file"""
@@ -115,10 +269,10 @@ class CVProcessor:
                     return file.read()
             except Exception as e:
                 logger.error(f"Text file extraction failed: {e}")
-                return f"Text file extraction failed: {str(e)}"
+                raise ExtractionError(f"Text file extraction failed: {str(e)}") from e
         except Exception as e:
             logger.error(f"Text file extraction failed: {e}")
-            return f"Text file extraction failed: {str(e)}"
+            raise ExtractionError(f"Text file extraction failed: {str(e)}") from e
     
     def _extract_from_docx(self, filepath: str) -> str:
         """Extract text from DOCX file (requires python-docx)"""
@@ -126,23 +280,99 @@ class CVProcessor:
             from docx import Document
             
             doc = Document(filepath)
-            text = ""
-            
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            
-            return text.strip()
+            return "\n".join(paragraph.text for paragraph in doc.paragraphs).strip()
             
         except ImportError:
             logger.error("python-docx not installed. Install with: pip install python-docx")
-            return "DOCX support requires python-docx library. Please install with: pip install python-docx"
+            raise ExtractionError("DOCX support requires python-docx library. Please install with: pip install python-docx")
         except Exception as e:
             logger.error(f"DOCX extraction failed: {e}")
-            return f"DOCX extraction failed: {str(e)}"
+            raise ExtractionError(f"DOCX extraction failed: {str(e)}") from e
+    
+    @traced('cv.file_sha256')
+    def file_sha256(self, filepath: str) -> str:
+        """Hash a file's contents in fixed-size chunks"""
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as file:
+            for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def get_cached_text(self, filepath: str) -> str:
+        """
+        Get extracted text for a file, parsing it only when its contents change
+        
+        An unchanged file (same mtime and size) is served from a single indexed
+        lookup on its path. Otherwise the file is re-hashed: identical content
+        anywhere in the cache is reused, and only genuinely new content is parsed.
+        Failed extractions are returned but never cached.
+        
+        Args:
+            filepath: Path to the file
+            
+        Returns:
+            Extracted text content (or an error message, as extract_text_from_file)
+        """
+        try:
+            return self.load_text(filepath)
+        except ExtractionError as e:
+            return str(e)
     
+    @traced('cv.load_text')
+    def load_text(self, filepath: str) -> str:
+        """Same as get_cached_text, but raises ExtractionError on failure"""
+        try:
+            stat = os.stat(filepath)
+            entry = ExtractedText.query.filter_by(filepath=filepath).first()
+            if entry and entry.file_mtime == stat.st_mtime and entry.file_size == stat.st_size:
+                return entry.text
+            
+            digest = self.file_sha256(filepath)
+            if entry and entry.sha256 == digest:
+                text = entry.text
+            else:
+                same_content = ExtractedText.query.filter_by(sha256=digest).first()
+                if same_content:
+                    text = same_content.text
+                else:
+                    text = self._extract_text(filepath)
+            
+            if entry is None:
+                entry = ExtractedText(filepath=filepath)
+                db.session.add(entry)
+            entry.sha256 = digest
+            entry.file_mtime = stat.st_mtime
+            entry.file_size = stat.st_size
+            entry.text = text
+            entry.extracted_at = datetime.utcnow()
+            
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Another request cached the same path first; its text is equivalent
+                db.session.rollback()
+            return text
+            
+        except (SQLAlchemyError, RuntimeError) as e:
+            # No app context or database trouble: fall back to parsing directly
+            logger.error(f"Extracted text cache unavailable for {filepath}: {e}")
+            if isinstance(e, SQLAlchemyError):
+                db.session.rollback()
+            return self._extract_text(filepath)
+    
+    def has_cached_text(self, filepath: str) -> bool:
+        """True if the text cache already holds an up-to-date entry for the file"""
+        try:
+            stat = os.stat(filepath)
+            entry = ExtractedText.query.filter_by(filepath=filepath).first()
+            return entry is not None and entry.file_mtime == stat.st_mtime and entry.file_size == stat.st_size
+        except (OSError, SQLAlchemyError, RuntimeError):
+            return False
+    
+    @traced('cv.save_customized_cv')
     def save_customized_cv(self, cv_text: str, job_id: int, user_id: int = 1) -> Optional[str]:
         """
-        Save customized CV text to a file
+        Save customized CV text to the artifact store
         
         Args:
             cv_text: Customized CV content
@@ -152,23 +382,12 @@ class CVProcessor:
         Returns:
             Filepath of saved customized CV or None if failed
         """
-        try:
-            filename = f"custom_cv_{user_id}_{job_id}_{uuid.uuid4().hex[:8]}.txt"
-            filepath = os.path.join(self.upload_folder, filename)
-            
-            with open(filepath, 'w', encoding='utf-8') as file:
-                file.write(cv_text)
-            
-            logger.info(f"Customized CV saved: {filepath}")
-            return filepath
-            
-        except Exception as e:
-            logger.error(f"Failed to save customized CV: {e}")
-            return None
+        return artifact_store.save(cv_text, 'custom_cv', job_id, user_id)
     
+    @traced('cv.save_cover_letter')
     def save_cover_letter(self, cover_letter: str, job_id: int, user_id: int = 1) -> Optional[str]:
         """
-        Save cover letter to a file
+        Save cover letter to the artifact store
         
         Args:
             cover_letter: Cover letter content
@@ -178,40 +397,155 @@ class CVProcessor:
         Returns:
             Filepath of saved cover letter or None if failed
         """
-        try:
-            filename = f"cover_letter_{user_id}_{job_id}_{uuid.uuid4().hex[:8]}.txt"
-            filepath = os.path.join(self.upload_folder, filename)
-            
-            with open(filepath, 'w', encoding='utf-8') as file:
-                file.write(cover_letter)
-            
-            logger.info(f"Cover letter saved: {filepath}")
-            return filepath
-            
-        except Exception as e:
-            logger.error(f"Failed to save cover letter: {e}")
-            return None
+        return artifact_store.save(cover_letter, 'cover_letter', job_id, user_id)
     
-    def delete_file(self, filepath: str) -> bool:
+    def delete_file(self, filepath: str, user_id: int = 1) -> bool:
         """
         Delete a file safely
         
+        Stored blobs are shared between identical uploads, so deleting one
+        removes a single document and only unlinks the blob when its last
+        reference goes. A blob reference is only dropped together with the
+        document row that held it, so repeated deletes or deletes by another
+        user leave the blob alone.
+        
         Args:
             filepath: Path to file to delete
-            
+            user_id: Owner of the document being deleted
+        
         Returns:
             True if successful, False otherwise
         """
         try:
-            if os.path.exists(filepath) and filepath.startswith(self.upload_folder):
+            if not filepath.startswith(self.upload_folder):
+                return False
+            
+            if filepath.startswith(self.blob_folder):
+                document = CVDocument.query.filter_by(filepath=filepath, user_id=user_id)\
+                    .order_by(CVDocument.uploaded_at.desc()).first()
+                if document is None:
+                    return False
+                # Delete by id and check the row count so two concurrent deletes
+                # of the same document cannot both release the blob
+                if not CVDocument.query.filter_by(id=document.id).delete(synchronize_session=False):
+                    db.session.rollback()
+                    return False
+                return self._release_blob(filepath)
+            
+            if os.path.exists(filepath):
                 os.remove(filepath)
                 logger.info(f"File deleted: {filepath}")
+                self._unregister_document(filepath)
                 return True
             return False
         except Exception as e:
             logger.error(f"Failed to delete file {filepath}: {e}")
+            if isinstance(e, SQLAlchemyError):
+                db.session.rollback()
             return False
     
+    def _page_count(self, filepath: str, file_extension: str) -> Optional[int]:
+        """Page count for PDFs, None for formats without fixed pages"""
+        if file_extension != 'pdf':
+            return None
+        try:
+            return pdf_extractor.page_count(filepath)
+        except Exception as e:
+            logger.error(f"Could not count pages in {filepath}: {e}")
+            return None
+    
+    def _register_document(self, filepath: str, user_id: int = 1, uploaded_at: Optional[datetime] = None,
+                           filename: Optional[str] = None, sha256: Optional[str] = None,
+                           extraction_status: str = 'done') -> Optional[CVDocument]:
+        """
+        Record an uploaded CV in the CVDocument index
+        
+        Args:
+            filepath: Path of the saved file
+            user_id: Owner of the document
+            uploaded_at: Upload time (defaults to now)
+            filename: Per-upload name (defaults to the file's basename)
+            sha256: Content hash, if the caller already has it
+            extraction_status: Initial extraction state
+            
+        Returns:
+            The new CVDocument, or None if it could not be recorded
+        """
+        try:
+            stat = os.stat(filepath)
+            file_extension = filepath.rsplit('.', 1)[1].lower()
+            if sha256 is None:
+                # get_cached_text has normally just hashed the file; reuse that
+                cached = ExtractedText.query.filter_by(filepath=filepath).first()
+                sha256 = cached.sha256 if cached else self.file_sha256(filepath)
+            
+            # Repeat uploads of a blob copy its metadata rather than reopening it
+            sibling = CVDocument.query.filter_by(filepath=filepath).first()
+            page_count = sibling.page_count if sibling else self._page_count(filepath, file_extension)
+            
+            document = CVDocument(
+                user_id=user_id,
+                filename=filename or os.path.basename(filepath),
+                filepath=filepath,
+                sha256=sha256,
+                file_size=stat.st_size,
+                extension=file_extension,
+                page_count=page_count,
+                uploaded_at=uploaded_at or datetime.utcnow(),
+                extraction_status=extraction_status
+            )
+            db.session.add(document)
+            db.session.commit()
+            return document
+            
+        except (SQLAlchemyError, RuntimeError, OSError) as e:
+            logger.error(f"Failed to index CV document {filepath}: {e}")
+            if isinstance(e, SQLAlchemyError):
+                db.session.rollback()
+            return None
+    
+    def _unregister_document(self, filepath: str):
+        """Drop index and cache rows for a deleted file"""
+        try:
+            CVDocument.query.filter_by(filepath=filepath).delete()
+            ExtractedText.query.filter_by(filepath=filepath).delete()
+            db.session.commit()
+        except (SQLAlchemyError, RuntimeError) as e:
+            logger.error(f"Failed to unindex {filepath}: {e}")
+            if isinstance(e, SQLAlchemyError):
+                db.session.rollback()
+    
+    def backfill_documents(self, user_id: int = 1) -> int:
+        """
+        Index CVs uploaded before the CVDocument table existed
+        
+        Scans the top of the upload folder once (per-user blob folders are
+        already indexed); run at startup, not per request.
+        
+        Args:
+            user_id: User whose legacy ``cv_<user_id>_*`` files to index
+            
+        Returns:
+            Number of documents added
+        """
+        if not os.path.exists(self.upload_folder):
+            return 0
+        
+        known = {path for (path,) in db.session.query(CVDocument.filepath).filter_by(user_id=user_id)}
+        added = 0
+        prefix = f'cv_{user_id}_'
+        for entry in os.scandir(self.upload_folder):
+            filepath = os.path.join(self.upload_folder, entry.name)
+            if (entry.name.startswith(prefix) and filepath not in known
+                    and self.allowed_file(entry.name) and entry.is_file()):
+                uploaded_at = datetime.utcfromtimestamp(entry.stat().st_mtime)
+                if self._register_document(filepath, user_id, uploaded_at=uploaded_at):
+                    added += 1
+        
+        if added:
+            logger.info(f"Indexed {added} previously uploaded CVs")
+        return added
+    
     def list_uploaded_cvs(self, user_id: int = 1) -> list:
         """
         List all uploaded CV files for a user
@@ -220,53 +554,73 @@ class CVProcessor:
             user_id: User ID to filter CVs
             
         Returns:
-            List of dictionaries with CV file information
+            List of dictionaries with CV file information, newest first
         """
         try:
+            documents = CVDocument.query.filter_by(user_id=user_id).order_by(CVDocument.uploaded_at.desc()).all()
+            
             cv_files = []
-            if not os.path.exists(self.upload_folder):
-                return cv_files
-            
-            for filename in os.listdir(self.upload_folder):
-                if filename.startswith(f'cv_{user_id}_') and not filename.startswith('custom_cv_'):
-                    filepath = os.path.join(self.upload_folder, filename)
-                    if os.path.isfile(filepath):
-                        # Get file modification time
-                        mod_time = os.path.getmtime(filepath)
-                        
-                        # Extract original extension
-                        file_extension = filename.split('.')[-1]
-                        
-                        cv_files.append({
-                            'filename': filename,
-                            'filepath': filepath,
-                            'display_name': f"CV ({file_extension.upper()}) - {datetime.fromtimestamp(mod_time).strftime('%m/%d/%Y %H:%M')}",
-                            'modified_time': mod_time,
-                            'extension': file_extension
-                        })
-            
-            # Sort by modification time (newest first)
-            cv_files.sort(key=lambda x: x['modified_time'], reverse=True)
+            for document in documents:
+                # uploaded_at is stored in UTC; show it in local time as before
+                mod_time = document.uploaded_at.replace(tzinfo=timezone.utc).timestamp()
+                cv_files.append({
+                    'id': document.id,
+                    'filename': document.filename,
+                    'filepath': document.filepath,
+                    'display_name': f"CV ({document.extension.upper()}) - {datetime.fromtimestamp(mod_time).strftime('%m/%d/%Y %H:%M')}",
+                    'modified_time': mod_time,
+                    'extension': document.extension,
+                    'size': document.file_size,
+                    'page_count': document.page_count
+                })
             return cv_files
             
         except Exception as e:
             logger.error(f"Failed to list CV files: {e}")
             return []
     
-    def get_cv_text_by_filename(self, filename: str) -> Optional[str]:
+    @traced('cv.latest_cv_text')
+    def latest_cv_text(self, user_id: int = 1) -> Optional[str]:
         """
-        Get the text content of a CV file by filename
+        Get the text of the user's newest successfully extracted CV
+        
+        Args:
+            user_id: User ID to filter CVs
+            
+        Returns:
+            Extracted text content or None if there is none
+        """
+        try:
+            document = CVDocument.query.filter_by(user_id=user_id, extraction_status='done')\
+                .order_by(CVDocument.uploaded_at.desc()).first()
+            return self.load_text(document.filepath) if document else None
+        except (ExtractionError, SQLAlchemyError, OSError) as e:
+            logger.error(f"Failed to load latest CV text: {e}")
+            return None
+    
+    @traced('cv.get_cv_text_by_filename')
+    def get_cv_text_by_filename(self, filename: str, user_id: int = 1) -> Optional[str]:
+        """
+        Get the text content of one of a user's CV files by filename
         
         Args:
             filename: Name of the CV file
+            user_id: Owner of the CV; other users' files are not found
             
         Returns:
             Extracted text content or None if failed
         """
         try:
-            filepath = os.path.join(self.upload_folder, filename)
+            document = CVDocument.query.filter_by(filename=filename, user_id=user_id).first()
+            if document:
+                filepath = document.filepath
+            elif filename.startswith(f'cv_{user_id}_'):
+                filepath = os.path.join(self.upload_folder, filename)  # legacy upload not yet indexed
+            else:
+                logger.error(f"CV file not found: {filename}")
+                return None
             if os.path.exists(filepath):
-                return self.extract_text_from_file(filepath)
+                return self.get_cached_text(filepath)
             else:
                 logger.error(f"CV file not found: {filepath}")
                 return None
@@ -0,0 +1,95 @@
+import os
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+
+from models import CVDocument
+from services.cv_processor import cv_processor, ExtractionError
+from services.tracing import tracer
+from services.profiler import profiler
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Formats that share a worker pool
+FORMAT_POOLS = {'pdf': 'pdf', 'doc': 'docx', 'docx': 'docx', 'txt': 'txt'}
+
+class ExtractionPipeline:
+    """
+    Background text extraction for uploaded CVs.
+
+    Each format family gets its own thread pool so a burst of large PDFs
+    cannot starve quick TXT/DOCX uploads, and a global semaphore caps how
+    many extractions run at once across all pools. Progress is recorded on
+    ``CVDocument.extraction_status`` for the upload page to poll.
+
+    Pool sizes come from ``EXTRACTION_WORKERS_PDF``, ``EXTRACTION_WORKERS_DOCX``
+    and ``EXTRACTION_WORKERS_TXT``; the global cap from ``EXTRACTION_MAX_CONCURRENT``.
+    """
+
+    def __init__(self, pool_sizes: Optional[Dict[str, int]] = None, max_concurrent: Optional[int] = None):
+        self.pool_sizes = {
+            'pdf': int(os.getenv('EXTRACTION_WORKERS_PDF', 2)),
+            'docx': int(os.getenv('EXTRACTION_WORKERS_DOCX', 2)),
+            'txt': int(os.getenv('EXTRACTION_WORKERS_TXT', 4)),
+        }
+        self.pool_sizes.update(pool_sizes or {})
+        self.max_concurrent = max_concurrent or int(os.getenv('EXTRACTION_MAX_CONCURRENT', 4))
+        self.app = None
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Bind the pipeline to a Flask app so workers can use its database session"""
+        self.app = app
+        app.extensions['extraction_pipeline'] = self
+
+    def _pool(self, extension: str) -> ThreadPoolExecutor:
+        name = FORMAT_POOLS.get(extension, 'txt')
+        with self._lock:
+            if name not in self._pools:
+                self._pools[name] = ThreadPoolExecutor(max_workers=max(1, self.pool_sizes[name]),
+                                                       thread_name_prefix=f'extract-{name}')
+            return self._pools[name]
+
+    def submit(self, document: CVDocument) -> Future:
+        """
+        Queue a document for extraction
+
+        Args:
+            document: A freshly stored CVDocument
+
+        Returns:
+            Future resolving to the document's final extraction status
+        """
+        if self.app is None:
+            raise RuntimeError("ExtractionPipeline.init_app() has not been called")
+        run = tracer.wrap(profiler.follow(self._run))
+        return self._pool(document.extension).submit(run, document.id, document.filepath)
+
+    def _run(self, document_id: int, filepath: str) -> str:
+        with self._slots, self.app.app_context(), \
+                tracer.span('cv.extract_document', root=True, document_id=document_id):
+            cv_processor.mark_extraction(document_id, 'processing')
+            try:
+                cv_processor.load_text(filepath)
+                status, error = 'done', None
+            except ExtractionError as e:
+                status, error = 'failed', str(e)
+            except Exception as e:
+                logger.error(f"Extraction of document {document_id} crashed: {e}")
+                status, error = 'failed', f"Text extraction failed: {str(e)}"
+            cv_processor.mark_extraction(document_id, status, error)
+            return status
+
+    def shutdown(self, wait: bool = True):
+        """Stop all worker pools"""
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.shutdown(wait=wait)
+
+# Global extraction pipeline instance
+extraction_pipeline = ExtractionPipeline()
@@ -0,0 +1,287 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from services.page_parser import JobPageParser, job_page_parser
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# CSS selectors per field, most specific first; JSON-LD JobPosting data takes precedence
+LINKEDIN_SELECTORS = {
+    'title': ['h1.top-card-layout__title', '.job-title', 'h1'],
+    'company': ['.topcard__org-name-link', '.job-details-jobs-unified-top-card__company-name', '.company-name'],
+    'location': ['.topcard__flavor', '.job-details-jobs-unified-top-card__bullet', '.location'],
+    'description': ['.description__text', '.job-description', '.jobs-description__content'],
+}
+
+INDEED_SELECTORS = {
+    'title': ['[data-testid="jobsearch-JobInfoHeader-title"]', '.jobsearch-JobInfoHeader-title',
+              'h1.icl-u-xs-mb--xs'],
+    'company': ['[data-testid="inlineHeader-companyName"]', '.icl-u-lg-mr--sm', '.companyName'],
+    'location': ['[data-testid="job-location"]', '.icl-u-colorForeground--secondary', '.locationsContainer'],
+    'description': ['#jobDescriptionText', '.jobsearch-jobDescriptionText', '.jobDescription'],
+}
+
+# Generic selectors that might work on various sites
+GENERIC_SELECTORS = {
+    'title': ['h1', '.job-title', '.position-title', '[class*="title"]'],
+    'company': ['.company', '.employer', '[class*="company"]', '[class*="employer"]'],
+    'location': ['.location', '.job-location', '[class*="location"]'],
+}
+GENERIC_DESCRIPTION_CLASSES = r'description|content|details'
+
+def domain_of(url: str) -> str:
+    """Host of a URL without port or leading 'www.', the key extractors and selector stats use"""
+    domain = (urlparse(url).hostname or '').lower()
+    return domain[4:] if domain.startswith('www.') else domain
+
+class Extractor:
+    """
+    Selectors and result shaping for one family of job sites.
+
+    Subclass and register an instance with ``extractor_registry`` to support
+    a new board; ``domains`` match the host and any of its subdomains.
+    """
+
+    def __init__(self, name: str, selectors: Dict[str, List[str]], domains: tuple = (),
+                 description_classes: Optional[str] = None, label: Optional[str] = None,
+                 parser: Optional[JobPageParser] = None):
+        self.name = name
+        self.label = label  # board name for messages; generic extractors have none
+        self.selectors = selectors
+        self.domains = tuple(domains)
+        self.description_classes = description_classes
+        self.parser = parser or job_page_parser
+        # Translate every selector up front so a typo fails at startup, not on each page
+        for field_selectors in selectors.values():
+            for selector in field_selectors:
+                self.parser.translate(selector)
+
+    def matches(self, domain: str) -> bool:
+        return any(domain == suffix or domain.endswith('.' + suffix) for suffix in self.domains)
+
+    def extract(self, url: str, response, selectors: Dict[str, List[str]],
+                matches: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Build the job dictionary for a fetched page
+
+        Args:
+            url: Job posting URL
+            response: requests or httpx response for the URL
+            selectors: This extractor's selectors, in the order to probe them
+            matches: Filled with field -> matching selector (see JobPageParser.parse)
+
+        Returns:
+            Dictionary with extracted job information
+        """
+        response.raise_for_status()
+        job_info = self.parse(response, selectors, matches)
+        job_info['source'] = self.name
+        return job_info
+
+    def parse(self, response, selectors: Dict[str, List[str]], matches: Dict[str, str]) -> Dict[str, Any]:
+        """Extract job fields from a fetched page (JSON-LD first, then CSS selectors)"""
+        # requests guesses ISO-8859-1 when the header names no charset; let the page's meta tag decide instead
+        charset_declared = 'charset' in response.headers.get('Content-Type', '').lower()
+        return self.parser.parse(response.content, selectors, description_classes=self.description_classes,
+                                 encoding=response.encoding if charset_declared else None, matches=matches)
+
+    def failure(self, url: str, error: Exception) -> Dict[str, Any]:
+        """Result for a posting that couldn't be fetched or parsed"""
+        if self.label:
+            logger.error(f"{self.label} scraping failed: {error}")
+            description = f'{self.label} scraping failed: {str(error)}'
+        else:
+            logger.error(f"Generic scraping failed for {url}: {error}")
+            description = f'Scraping failed: {str(error)}'
+        return {
+            'title': '',
+            'company': '',
+            'location': '',
+            'description': description,
+            'source': self.name
+        }
+
+class LinkedInExtractor(Extractor):
+    """LinkedIn blocks most scraping, so failures keep the job id from the URL and explain themselves"""
+
+    def extract(self, url: str, response, selectors: Dict[str, List[str]],
+                matches: Dict[str, str]) -> Dict[str, Any]:
+        job_id = self.job_id(url)
+
+        if response.status_code != 200:
+            return {
+                'title': '',
+                'company': '',
+                'location': '',
+                'description': 'Unable to access LinkedIn job posting. LinkedIn has anti-scraping measures.',
+                'job_id': job_id
+            }
+
+        job_info = self.parse(response, selectors, matches)
+        # Description is often loaded dynamically, so we may not get it
+        job_info['description'] = job_info['description'] or \
+            'Description not available - please copy manually from LinkedIn'
+        job_info.update({'job_id': job_id, 'source': self.name})
+        return job_info
+
+    def failure(self, url: str, error: Exception) -> Dict[str, Any]:
+        job_info = super().failure(url, error)
+        job_info['description'] += '. Please enter details manually.'
+        return job_info
+
+    @staticmethod
+    def job_id(url: str) -> str:
+        """Extract LinkedIn job ID from URL"""
+        if 'currentJobId=' in url:
+            return parse_qs(urlparse(url).query).get('currentJobId', [''])[0]
+        elif '/view/' in url:
+            return url.split('/view/')[-1].split('?')[0]
+        return ''
+
+class SelectorStats:
+    """
+    Per-domain hit counts for each field's selectors.
+
+    A probe is one selector tried on one page; a hit is the selector that
+    supplied the field. Once a domain has ``EXTRACTOR_MIN_PAGES`` pages, its
+    selectors are tried in order of smoothed hit rate, (hits + 1) /
+    (probes + 2), so the selector a site actually uses moves to the front.
+    Selectors never tried score 0.5 and ties keep the extractor's order,
+    so a failing favourite soon yields to the next candidate. At most
+    ``EXTRACTOR_STATS_DOMAINS`` domains are tracked, least recently seen
+    dropped first.
+    """
+
+    def __init__(self, min_pages: Optional[int] = None, max_domains: Optional[int] = None):
+        self.min_pages = int(os.getenv('EXTRACTOR_MIN_PAGES', 5)) if min_pages is None else min_pages
+        self.max_domains = max_domains or int(os.getenv('EXTRACTOR_STATS_DOMAINS', 500))
+        self._domains: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _score(counts: Optional[List[int]]) -> float:
+        probes, hits = counts or (0, 0)
+        return (hits + 1) / (probes + 2)
+
+    def ordered(self, domain: str, selectors: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """``selectors`` reordered by the domain's observed hit rates"""
+        with self._lock:
+            entry = self._domains.get(domain)
+            if entry is None or entry['pages'] < self.min_pages:
+                return selectors
+            fields = entry['fields']
+            return {field: sorted(field_selectors, key=lambda selector: -self._score(fields.get(field, {}).get(selector)))
+                    for field, field_selectors in selectors.items()}
+
+    def record(self, domain: str, extractor: str, selectors: Dict[str, List[str]], matches: Dict[str, str]):
+        """Count the probes one page made, given the order used and the selector that matched each field"""
+        with self._lock:
+            entry = self._domains.get(domain)
+            if entry is None:
+                entry = self._domains[domain] = {'extractor': extractor, 'pages': 0, 'lookups': 0,
+                                                 'first_probe_hits': 0, 'fields': {}}
+                while len(self._domains) > self.max_domains:
+                    self._domains.popitem(last=False)
+            self._domains.move_to_end(domain)
+            entry['pages'] += 1
+            for field, matched in matches.items():
+                probed = selectors[field]
+                if matched:
+                    probed = probed[:probed.index(matched) + 1]
+                    entry['first_probe_hits'] += len(probed) == 1
+                entry['lookups'] += 1
+                counts = entry['fields'].setdefault(field, {})
+                for selector in probed:
+                    counts.setdefault(selector, [0, 0])[0] += 1
+                if matched:
+                    counts[matched][1] += 1
+
+    def stats(self, domain: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Hit statistics per domain
+
+        Returns:
+            {domain: {'extractor', 'pages', 'lookups', 'first_probe_rate', 'fields': {field: [{'selector', 'probes',
+            'hits', 'hit_rate'}, ...]}}}, selectors listed best first
+        """
+        with self._lock:
+            domains = {domain: self._domains[domain]} if domain in self._domains else \
+                {} if domain else dict(self._domains)
+            result = {}
+            for name, entry in domains.items():
+                fields = {}
+                for field, counts in entry['fields'].items():
+                    ranked = sorted(counts.items(), key=lambda item: -self._score(item[1]))
+                    fields[field] = [{'selector': selector, 'probes': probes, 'hits': hits,
+                                      'hit_rate': round(hits / probes, 3) if probes else 0.0}
+                                     for selector, (probes, hits) in ranked]
+                lookups = entry['lookups']
+                result[name] = {'extractor': entry['extractor'], 'pages': entry['pages'], 'lookups': lookups,
+                                'first_probe_rate': round(entry['first_probe_hits'] / lookups, 3) if lookups else 0.0,
+                                'fields': fields}
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._domains.clear()
+
+class ExtractorRegistry:
+    """
+    Picks the extractor for a posting URL by domain and orders its
+    selectors by what has worked on that domain before.
+    """
+
+    def __init__(self, default: Extractor, stats: Optional[SelectorStats] = None):
+        self.default = default
+        self.extractors: List[Extractor] = []
+        self.selector_stats = stats or SelectorStats()
+
+    def register(self, extractor: Extractor) -> Extractor:
+        """Add an extractor; later registrations win over earlier ones for the same domain"""
+        self.extractors.insert(0, extractor)
+        return extractor
+
+    def for_url(self, url: str) -> Extractor:
+        domain = domain_of(url)
+        return next((extractor for extractor in self.extractors if extractor.matches(domain)), self.default)
+
+    def extract(self, url: str, response) -> Dict[str, Any]:
+        """
+        Extract job information from a fetched posting page
+
+        Args:
+            url: Job posting URL
+            response: requests or httpx response for the URL
+
+        Returns:
+            Dictionary with extracted job information
+        """
+        domain = domain_of(url)
+        extractor = self.for_url(url)
+        selectors = self.selector_stats.ordered(domain, extractor.selectors)
+        matches = {}
+        job_info = extractor.extract(url, response, selectors, matches)
+        if matches:
+            self.selector_stats.record(domain, extractor.name, selectors, matches)
+        return job_info
+
+    def failure(self, url: str, error: Exception) -> Dict[str, Any]:
+        """Result for a posting that couldn't be fetched or parsed"""
+        return self.for_url(url).failure(url, error)
+
+    def stats(self, domain: Optional[str] = None) -> Dict[str, Any]:
+        """Selector statistics per domain (see SelectorStats.stats)"""
+        return self.selector_stats.stats(domain)
+
+# Global extractor registry instance
+extractor_registry = ExtractorRegistry(
+    Extractor('generic', GENERIC_SELECTORS, description_classes=GENERIC_DESCRIPTION_CLASSES)
+)
+extractor_registry.register(Extractor('indeed', INDEED_SELECTORS, domains=('indeed.com',), label='Indeed'))
+extractor_registry.register(LinkedInExtractor('linkedin', LINKEDIN_SELECTORS, domains=('linkedin.com',),
+                                              label='LinkedIn'))
@@ -0,0 +1,336 @@
+import os
+import re
+import math
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import event, func
+
+from models import db, Job
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Keeps tech tokens such as c++, c#, node.js and .net intact
+TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9+#]*(?:\.[a-z0-9]+)*|\.net")
+
+STOP_WORDS = frozenset("""
+a about above after again all also am an and any are as at be been being below between both but by can
+could did do does doing down during each etc few for from further had has have having he her here hers
+him his how i if in into is it its itself just me more most must my no nor not now of off on once only or
+other our ours out over own per same she should so some such than that the their theirs them then there
+these they this those through to too under until up us very via was we well were what when where which
+while who whom why will with within without would you your yours
+able ability across candidate candidates company experience including join looking new position role
+strong team teams work working year years opportunity responsibilities requirements preferred required
+""".split())
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens with stop words and one-letter noise removed"""
+    return [token for token in TOKEN_PATTERN.findall((text or '').lower())
+            if len(token) > 1 and token not in STOP_WORDS]
+
+def job_text(title: Optional[str], description: Optional[str]) -> str:
+    # The title is short but highly specific, so it counts double
+    return f"{title or ''} {title or ''} {description or ''}"
+
+class FitScorer:
+    """
+    Local CV-to-job fit scoring with sparse TF-IDF vectors.
+
+    Each job's term frequencies are tokenized once and cached in memory;
+    SQLAlchemy events keep the cache current as jobs are added, edited or
+    deleted, and comparing each cached job's ``Job.version`` (bumped on
+    every write) with the table's picks up jobs that other processes added,
+    edited or deleted. That comparison only runs when a cheap per-user
+    aggregate (job count and the sums of ids and versions) has changed
+    since the last one, so an unchanged table costs one query. Document frequencies are maintained incrementally, so adding
+    a job only marks the weighted matrix stale and it is rebuilt (in time
+    linear in the number of stored terms) on the next ranking. Ranking is
+    one sparse matrix-vector product over all jobs.
+
+    With ``user_id`` set the scorer only holds that user's jobs; see
+    UserFitScorers.
+    """
+
+    def __init__(self, max_keywords: int = 10, user_id: Optional[int] = None):
+        self.max_keywords = max_keywords
+        self.user_id = user_id
+        self.vocabulary: Dict[str, int] = {}
+        self.terms: List[str] = []
+        self._rows: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}  # job_id -> (term ids, log tf)
+        self._versions: Dict[int, Optional[int]] = {}  # job_id -> Job.version the row was built from
+        self._df = np.zeros(1024, dtype=np.int64)
+        self._matrix: Optional[sparse.csr_matrix] = None
+        self._matrix_ids = np.zeros(0, dtype=np.int64)
+        self._idf = np.zeros(0)
+        self._pending: Dict[int, Tuple[str, Optional[int]]] = {}  # job_id -> (text, version)
+        self._deleted: Set[int] = set()
+        self._digest: Optional[Tuple[int, int, int]] = None  # (count, sum of ids, sum of versions) last seen
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def init_app(self, app):
+        """Register the model listeners that keep job vectors current"""
+        app.extensions['fit_scorer'] = self
+        if not event.contains(Job, 'after_insert', self._on_job_saved):
+            event.listen(Job, 'after_insert', self._on_job_saved)
+            event.listen(Job, 'after_update', self._on_job_saved)
+            event.listen(Job, 'after_delete', self._on_job_deleted)
+
+    def _on_job_saved(self, mapper, connection, target):
+        # An update bumps the version in SQL, leaving it unknown here until refresh reads it back
+        version = target.__dict__.get('version')
+        with self._lock:
+            self._pending[target.id] = (job_text(target.title, target.description),
+                                        version if isinstance(version, int) else None)
+            self._deleted.discard(target.id)
+
+    def _on_job_deleted(self, mapper, connection, target):
+        with self._lock:
+            self._pending.pop(target.id, None)
+            self._deleted.add(target.id)
+
+    def add_job(self, job_id: int, text: str, version: Optional[int] = None):
+        """Tokenize a job and add (or replace) its term vector; ``version`` is the Job.version it reflects"""
+        with self._lock:
+            self.remove_job(job_id)
+            counts = Counter(tokenize(text))
+            ids = np.fromiter((self._term_id(term) for term in counts), dtype=np.int64, count=len(counts))
+            weights = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))
+            self._rows[job_id] = (ids, weights)
+            self._versions[job_id] = version
+            self._df[ids] += 1
+            self._matrix = None
+
+    def remove_job(self, job_id: int):
+        with self._lock:
+            self._versions.pop(job_id, None)
+            row = self._rows.pop(job_id, None)
+            if row is not None:
+                self._df[row[0]] -= 1
+                self._matrix = None
+
+    def _term_id(self, term: str) -> int:
+        term_id = self.vocabulary.get(term)
+        if term_id is None:
+            term_id = self.vocabulary[term] = len(self.terms)
+            self.terms.append(term)
+            if term_id >= len(self._df):
+                self._df = np.concatenate([self._df, np.zeros(len(self._df), dtype=np.int64)])
+        return term_id
+
+    def _jobs(self, *columns):
+        query = db.session.query(*columns)
+        return query if self.user_id is None else query.filter(Job.user_id == self.user_id)
+
+    def _table_digest(self) -> Tuple[int, int, int]:
+        """Aggregate that changes whenever a job is added, edited or deleted"""
+        count, id_sum, version_sum = self._jobs(func.count(Job.id), func.coalesce(func.sum(Job.id), 0),
+                                                func.coalesce(func.sum(Job.version), 0)).one()
+        return count, id_sum, version_sum
+
+    def refresh(self):
+        """Bring the cache in line with the Job table (needs an app context)"""
+        with self._lock:
+            if not self._loaded:
+                # Taken before loading, so writes that land while loading show up as a change
+                self._digest = self._table_digest()
+                for job_id, title, description, version in self._jobs(Job.id, Job.title, Job.description,
+                                                                       Job.version):
+                    self.add_job(job_id, job_text(title, description), version)
+                self._pending.clear()
+                self._deleted.clear()
+                self._loaded = True
+                owner = '' if self.user_id is None else f" for user {self.user_id}"
+                logger.info(f"Fit scorer loaded {len(self._rows)} jobs{owner}, {len(self.terms)} terms")
+                return
+
+            for job_id in self._deleted:
+                self.remove_job(job_id)
+            for job_id, (text, version) in self._pending.items():
+                self.add_job(job_id, text, version)
+            self._pending.clear()
+            self._deleted.clear()
+
+            # Jobs written by other processes never fired our listeners; their versions give them away
+            digest = self._table_digest()
+            if digest == self._digest:
+                return
+            self._digest = digest
+            db_versions = dict(self._jobs(Job.id, Job.version).all())
+            for job_id in set(self._rows) - set(db_versions):
+                self.remove_job(job_id)
+            stale = [job_id for job_id, version in db_versions.items() if self._versions.get(job_id) != version]
+            if stale:
+                for job_id, title, description, version in self._jobs(Job.id, Job.title, Job.description,
+                                                                       Job.version).filter(Job.id.in_(stale)):
+                    self.add_job(job_id, job_text(title, description), version)
+
+    def _build(self):
+        """Weight cached term frequencies by IDF and L2-normalise each job row"""
+        job_ids = np.fromiter(self._rows.keys(), dtype=np.int64, count=len(self._rows))
+        rows = list(self._rows.values())
+        n_terms = len(self.terms)
+
+        self._idf = np.log((1.0 + len(rows)) / (1.0 + self._df[:n_terms])) + 1.0
+        if rows:
+            indices = np.concatenate([ids for ids, _ in rows])
+            data = np.concatenate([weights for _, weights in rows]) * self._idf[indices]
+            indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+            np.cumsum([len(ids) for ids, _ in rows], out=indptr[1:])
+            matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(rows), n_terms))
+            norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+            norms[norms == 0] = 1.0
+            matrix = sparse.diags(1.0 / norms) @ matrix
+        else:
+            matrix = sparse.csr_matrix((0, n_terms))
+
+        self._matrix = matrix.tocsr()
+        self._matrix_ids = job_ids
+
+    def _query_vector(self, cv_text: str) -> Tuple[np.ndarray, Set[int]]:
+        counts = Counter(token for token in tokenize(cv_text) if token in self.vocabulary)
+        vector = np.zeros(len(self.terms))
+        for term, count in counts.items():
+            term_id = self.vocabulary[term]
+            vector[term_id] = (1.0 + math.log(count)) * self._idf[term_id]
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector, {self.vocabulary[term] for term in counts}
+
+    def rank(self, cv_text: str, job_ids: Optional[Iterable[int]] = None,
+             limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Rank cached jobs by fit with a CV
+
+        Args:
+            cv_text: Extracted CV text
+            job_ids: Restrict ranking to these jobs (default: all)
+            limit: Return only the best ``limit`` jobs
+
+        Returns:
+            List of {'job_id', 'score' (0-100), 'matched', 'missing'} dicts,
+            best fit first; keywords are ordered by their weight in the job
+        """
+        with self._lock:
+            if self._matrix is None:
+                self._build()
+            matrix, matrix_ids = self._matrix, self._matrix_ids
+            query, cv_terms = self._query_vector(cv_text)
+
+        if matrix.shape[0] == 0:
+            return []
+
+        scores = matrix @ query
+        candidates = np.arange(len(matrix_ids))
+        if job_ids is not None:
+            candidates = np.flatnonzero(np.isin(matrix_ids, np.fromiter(job_ids, dtype=np.int64)))
+
+        if limit is not None and 0 < limit < len(candidates):
+            top = np.argpartition(-scores[candidates], limit - 1)[:limit]
+            candidates = candidates[top]
+        order = candidates[np.argsort(-scores[candidates], kind='stable')]
+
+        cv_term_ids = np.fromiter(cv_terms, dtype=np.int64, count=len(cv_terms))
+        results = []
+        for row in order:
+            start, stop = matrix.indptr[row], matrix.indptr[row + 1]
+            term_ids = matrix.indices[start:stop]
+            by_weight = term_ids[np.argsort(-matrix.data[start:stop], kind='stable')]
+            in_cv = np.isin(by_weight, cv_term_ids)
+            results.append({
+                'job_id': int(matrix_ids[row]),
+                'score': round(float(scores[row]) * 100, 1),
+                'matched': [self.terms[i] for i in by_weight[in_cv][:self.max_keywords]],
+                'missing': [self.terms[i] for i in by_weight[~in_cv][:self.max_keywords]],
+            })
+        return results
+
+    def score_jobs(self, cv_text: str, job_ids: Optional[Iterable[int]] = None,
+                   limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Sync with the database, then rank jobs by fit (see rank)
+
+        Returns:
+            Ranked fit list, or an empty list if scoring failed
+        """
+        try:
+            self.refresh()
+            return self.rank(cv_text, job_ids=job_ids, limit=limit)
+        except Exception as e:
+            logger.error(f"Fit scoring failed: {e}")
+            return []
+
+class UserFitScorers:
+    """
+    One FitScorer per user, so each user's vocabulary, IDF weights and
+    matrix cover only their own jobs: another user's postings never shift
+    their scores, and ranking touches none of them.
+
+    A user's scorer is loaded on their first request; beyond
+    ``FIT_SCORER_USERS`` (default 32) the least recently used one is dropped
+    and reloaded from the database if that user comes back.
+    """
+
+    def __init__(self, max_users: Optional[int] = None, max_keywords: int = 10):
+        self.max_users = max_users or int(os.getenv('FIT_SCORER_USERS', 32))
+        self.max_keywords = max_keywords
+        self._scorers: 'OrderedDict[int, FitScorer]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Register the model listeners that keep loaded users' job vectors current"""
+        app.extensions['fit_scorer'] = self
+        if not event.contains(Job, 'after_insert', self._on_job_saved):
+            event.listen(Job, 'after_insert', self._on_job_saved)
+            event.listen(Job, 'after_update', self._on_job_saved)
+            event.listen(Job, 'after_delete', self._on_job_deleted)
+
+    def _loaded(self, user_id: int) -> Optional[FitScorer]:
+        # Users without a loaded scorer read the table when they next need one
+        with self._lock:
+            return self._scorers.get(user_id)
+
+    def _on_job_saved(self, mapper, connection, target):
+        scorer = self._loaded(target.user_id)
+        if scorer is not None:
+            scorer._on_job_saved(mapper, connection, target)
+
+    def _on_job_deleted(self, mapper, connection, target):
+        scorer = self._loaded(target.user_id)
+        if scorer is not None:
+            scorer._on_job_deleted(mapper, connection, target)
+
+    def scorer(self, user_id: int) -> FitScorer:
+        """The user's scorer, created (unloaded) if needed"""
+        with self._lock:
+            scorer = self._scorers.get(user_id)
+            if scorer is None:
+                scorer = self._scorers[user_id] = FitScorer(self.max_keywords, user_id=user_id)
+                while len(self._scorers) > self.max_users:
+                    self._scorers.popitem(last=False)
+            else:
+                self._scorers.move_to_end(user_id)
+            return scorer
+
+    def score_jobs(self, cv_text: str, user_id: int, job_ids: Optional[Iterable[int]] = None,
+                   limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Rank one user's jobs by fit with a CV (see FitScorer.score_jobs)
+
+        Args:
+            cv_text: Extracted CV text
+            user_id: Owner of the jobs to rank
+            job_ids: Restrict ranking to these jobs (default: all of the user's)
+            limit: Return only the best ``limit`` jobs
+        """
+        return self.scorer(user_id).score_jobs(cv_text, job_ids=job_ids, limit=limit)
+
+# Global fit scorer instance (partitioned by user)
+fit_scorer = UserFitScorers()
@@ -0,0 +1,133 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+from sqlalchemy import event, inspect, update
+
+from models import Job, JobNote, FollowUp, Contact
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class FragmentCache:
+    """
+    In-memory cache of rendered template fragments.
+
+    Templates mark a region with ``{% cache 'name', key, ... %}`` ...
+    ``{% endcache %}``; the region is rendered once per distinct key and
+    later renders reuse the HTML. Keys name the data the region shows, so
+    job fragments are keyed by job id and ``Job.version``, a stamp bumped on
+    every write to the job or its notes, follow-ups and contacts: a changed
+    job gets a new key, and its old fragment simply ages out. Beyond
+    ``max_entries`` (``FRAGMENT_CACHE_SIZE``, default 5000, 0 disables) the
+    least recently used fragment is evicted.
+
+    The stamp lives in the database, so every process sees the same
+    versions, while each keeps its own fragments.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = int(os.getenv('FRAGMENT_CACHE_SIZE', 5000)) if max_entries is None else max_entries
+        self._entries: 'OrderedDict[tuple, Any]' = OrderedDict()  # key -> rendered markup
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get_or_render(self, key: tuple, render: Callable[[], Any]) -> Any:
+        """
+        Cached fragment for ``key``, rendering and storing it on a miss
+
+        Args:
+            key: Hashable fragment key
+            render: Renders the fragment (the template body of the cache tag)
+
+        Returns:
+            The rendered fragment
+        """
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return fragment
+            self.misses += 1
+
+        # Rendered outside the lock; two requests missing together both render, and the second put wins
+        fragment = render()
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[key] = fragment
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return fragment
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'entries': len(self._entries), 'max_entries': self.max_entries, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions,
+                    'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0}
+
+    def init_app(self, app):
+        """Add the ``{% cache %}`` template tag and the listeners that bump job version stamps"""
+        app.extensions['fragment_cache'] = self
+        app.jinja_env.add_extension(FragmentCacheExtension)
+        app.jinja_env.fragment_cache = self
+        if not event.contains(Job, 'before_update', _bump_job_version):
+            event.listen(Job, 'before_update', _bump_job_version)
+            for child in (JobNote, FollowUp, Contact):
+                event.listen(child, 'after_insert', _bump_parent_version)
+                event.listen(child, 'after_update', _bump_parent_version)
+                event.listen(child, 'after_delete', _bump_parent_version)
+                # Loads the previous job_id when it is reassigned on an expired object, so the job it leaves is bumped too
+                event.listen(child.job_id, 'set', _keep_previous_job, active_history=True)
+
+class FragmentCacheExtension(Extension):
+    """``{% cache 'name', key, ... %}body{% endcache %}`` backed by the environment's fragment_cache"""
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            key.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_render', [nodes.List(key)]), [], [], body).set_lineno(lineno)
+
+    def _render(self, key, caller):
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return caller()
+        return cache.get_or_render(tuple(key), caller)
+
+def _bump_job_version(mapper, connection, target):
+    # Relationship-only changes don't touch the row; the SQL expression keeps concurrent bumps distinct
+    if inspect(target).session.is_modified(target, include_collections=False):
+        target.version = Job.__table__.c.version + 1
+
+def _keep_previous_job(target, value, oldvalue, initiator):
+    """No-op; registered with active_history so SQLAlchemy loads the old job_id before replacing it"""
+
+def _bump_parent_version(mapper, connection, target):
+    job_ids = {target.job_id}
+    history = inspect(target).attrs.job_id.history
+    job_ids.update(job_id for job_id in history.deleted or () if job_id is not None)
+    jobs = Job.__table__
+    connection.execute(update(jobs).where(jobs.c.id.in_(job_ids)).values(version=jobs.c.version + 1))
+
+# Global fragment cache instance
+fragment_cache = FragmentCache()
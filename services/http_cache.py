@@ -0,0 +1,262 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Response headers worth keeping alongside a cached body
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control')
+
+class HTTPCache:
+    """
+    Disk-backed HTTP response cache for the job scraper.
+
+    Successful GET responses are stored as ``<aa>/<sha256(url)>.body`` with a
+    JSON sidecar holding the status, validators and store time. Within
+    ``ttl`` seconds an entry is served without touching the network; after
+    that it is revalidated with ``If-None-Match`` / ``If-Modified-Since``,
+    so an unchanged page costs a 304 instead of a full download. The total
+    body size is kept under ``max_bytes`` by evicting least recently used
+    entries (recency survives restarts through file access times).
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl: Optional[float] = None,
+                 max_bytes: Optional[int] = None):
+        self.cache_dir = cache_dir or os.getenv('SCRAPER_CACHE_DIR', os.path.join('instance', 'http_cache'))
+        self.ttl = float(os.getenv('SCRAPER_CACHE_TTL', 3600)) if ttl is None else ttl
+        self.max_bytes = int(float(os.getenv('SCRAPER_CACHE_MAX_MB', 100)) * 1024 * 1024) \
+            if max_bytes is None else max_bytes
+        self._lru: 'OrderedDict[str, int]' = OrderedDict()  # key -> body size, oldest first
+        self._size = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'uncacheable': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _paths(self, key: str):
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return f"{base}.body", f"{base}.json"
+
+    def _load_index(self):
+        """Rebuild the LRU order from disk once per process"""
+        if self._loaded:
+            return
+        entries = []
+        if os.path.isdir(self.cache_dir):
+            for root, _, files in os.walk(self.cache_dir):
+                for filename in files:
+                    if filename.endswith('.body'):
+                        path = os.path.join(root, filename)
+                        try:
+                            stat = os.stat(path)
+                        except OSError:
+                            continue
+                        entries.append((stat.st_atime, filename[:-len('.body')], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._lru[key] = size
+            self._size += size
+        self._loaded = True
+
+    def fetch(self, url: str, send: Callable[..., requests.Response]) -> requests.Response:
+        """
+        GET a URL through the cache
+
+        Args:
+            url: URL to fetch
+            send: ``send(url, headers=...)`` performing the real request
+
+        Returns:
+            A fresh, revalidated or newly fetched response
+        """
+        cached, headers, entry = self.lookup(url)
+        if cached is not None:
+            return cached
+        response = send(url, headers=headers) if headers else send(url)
+        return self.complete(url, response, entry)
+
+    def lookup(self, url: str) -> Tuple[Optional[requests.Response], Dict[str, str], Optional[Dict[str, Any]]]:
+        """
+        First half of fetch, for callers that send requests themselves
+
+        Returns:
+            (fresh cached response or None, conditional request headers,
+            stale entry to pass to complete)
+        """
+        if not self.enabled:
+            return None, {}, None
+
+        key = self._key(url)
+        entry = self._read(key)
+        if entry is not None and time.time() - entry['meta']['stored_at'] < self.ttl:
+            self._record('hits', key)
+            return self._response(url, entry), {}, entry
+
+        headers = {}
+        if entry is not None:
+            if entry['meta']['headers'].get('ETag'):
+                headers['If-None-Match'] = entry['meta']['headers']['ETag']
+            if entry['meta']['headers'].get('Last-Modified'):
+                headers['If-Modified-Since'] = entry['meta']['headers']['Last-Modified']
+        return None, headers, entry
+
+    def complete(self, url: str, response, entry: Optional[Dict[str, Any]] = None):
+        """
+        Second half of fetch: turn a 304 into the cached page, or store a new one
+
+        Args:
+            url: URL that was fetched
+            response: requests or httpx response
+            entry: Stale entry returned by lookup
+
+        Returns:
+            The response to use
+        """
+        if not self.enabled:
+            return response
+
+        key = self._key(url)
+        if response.status_code == 304 and entry is not None:
+            entry['meta']['stored_at'] = time.time()
+            for name in STORED_HEADERS:
+                if response.headers.get(name):
+                    entry['meta']['headers'][name] = response.headers[name]
+            self._write_meta(key, entry['meta'])
+            self._record('revalidated', key)
+            return self._response(url, entry)
+
+        self._record('misses', key)
+        self.store(url, response)
+        return response
+
+    def store(self, url: str, response):
+        """Cache a response if it is a cacheable 200"""
+        cache_control = response.headers.get('Cache-Control', '').lower()
+        if response.status_code != 200 or 'no-store' in cache_control or len(response.content) > self.max_bytes:
+            with self._lock:
+                self._stats['uncacheable'] += 1
+            return
+
+        key = self._key(url)
+        body_path, meta_path = self._paths(key)
+        meta = {
+            'url': url,
+            'status': response.status_code,
+            'headers': {name: response.headers[name] for name in STORED_HEADERS if response.headers.get(name)},
+            'stored_at': time.time(),
+            'encoding': response.encoding,
+        }
+        try:
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            self._atomic_write(body_path, response.content)
+            self._write_meta(key, meta)
+        except OSError as e:
+            logger.error(f"Failed to cache {url}: {e}")
+            return
+
+        with self._lock:
+            self._load_index()
+            self._size += len(response.content) - self._lru.pop(key, 0)
+            self._lru[key] = len(response.content)
+            self._stats['stores'] += 1
+            self._evict()
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._lru:
+            key, size = self._lru.popitem(last=False)
+            self._size -= size
+            self._stats['evictions'] += 1
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        body_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as file:
+                meta = json.load(file)
+            with open(body_path, 'rb') as file:
+                body = file.read()
+        except (OSError, ValueError):
+            return None
+        return {'meta': meta, 'body': body}
+
+    def _write_meta(self, key: str, meta: Dict[str, Any]):
+        self._atomic_write(self._paths(key)[1], json.dumps(meta).encode('utf-8'))
+
+    def _atomic_write(self, path: str, data: bytes):
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_path, 'wb') as file:
+                file.write(data)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _record(self, outcome: str, key: str):
+        with self._lock:
+            self._load_index()
+            self._stats[outcome] += 1
+            if outcome != 'misses' and key in self._lru:
+                self._lru.move_to_end(key)
+                try:
+                    os.utime(self._paths(key)[0])
+                except OSError:
+                    pass
+
+    def _response(self, url: str, entry: Dict[str, Any]) -> requests.Response:
+        """Rebuild a requests.Response from a cache entry"""
+        response = requests.Response()
+        response.status_code = entry['meta']['status']
+        response._content = entry['body']
+        response.headers = CaseInsensitiveDict(entry['meta']['headers'])
+        response.encoding = entry['meta'].get('encoding')
+        response.url = url
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, hit rate and current size"""
+        with self._lock:
+            self._load_index()
+            stats = dict(self._stats)
+            lookups = stats['hits'] + stats['revalidated'] + stats['misses']
+            stats.update({
+                'lookups': lookups,
+                'hit_rate': round((stats['hits'] + stats['revalidated']) / lookups, 3) if lookups else 0.0,
+                'entries': len(self._lru),
+                'size_bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+            })
+            return stats
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            self._load_index()
+            for key in list(self._lru):
+                for path in self._paths(key):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+            self._lru.clear()
+            self._size = 0
@@ -0,0 +1,270 @@
+import os
+import re
+import zlib
+import hashlib
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import and_, delete, event, inspect, insert, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from models import db, Job, JobSignature, JobLSHBucket
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Largest prime below 2**32, so every permuted hash fits in a uint32
+HASH_PRIME = 4294967291
+
+WORD_PATTERN = re.compile(r"\w+")
+
+STATUS_ORDER = ['saved', 'applied', 'interview', 'offered']
+
+def dedup_text(job) -> str:
+    return f"{job.title or ''} {job.description or ''}"
+
+class JobDeduplicator:
+    """
+    Near-duplicate job detection with MinHash signatures and banded LSH.
+
+    Each job's title and description are cut into word shingles and reduced
+    to a fixed-size MinHash signature. The signature is split into bands;
+    each band is hashed into a ``JobLSHBucket`` row, so the jobs that could
+    be near-duplicates of a new posting are found with indexed lookups
+    instead of a comparison against every job. Candidates are then confirmed
+    by estimated Jaccard similarity against ``threshold``. Buckets carry
+    the job's owner, so jobs are only ever matched against the same user's.
+
+    The default 32 bands of 4 rows find pairs above ~0.5 similarity with
+    high probability, which leaves the threshold free to be tuned (per call
+    or with ``JOB_DEDUP_THRESHOLD``) without rebuilding buckets. Changing
+    ``JOB_LSH_BANDS`` does require running the backfill.
+    """
+
+    def __init__(self, threshold: Optional[float] = None, num_perm: int = 128, bands: Optional[int] = None,
+                 shingle_size: int = 3, seed: int = 1):
+        self.threshold = threshold or float(os.getenv('JOB_DEDUP_THRESHOLD', 0.8))
+        self.num_perm = num_perm
+        self.bands = bands or int(os.getenv('JOB_LSH_BANDS', 32))
+        self.rows = num_perm // self.bands
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, HASH_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, HASH_PRIME, size=num_perm, dtype=np.uint64)
+
+    def init_app(self, app):
+        """Register the model listeners that index jobs as they are written"""
+        app.extensions['job_deduplicator'] = self
+        if not event.contains(Job, 'after_insert', self._on_job_saved):
+            event.listen(Job, 'after_insert', self._on_job_saved)
+            event.listen(Job, 'after_update', self._on_job_updated)
+            event.listen(Job, 'before_delete', self._on_job_deleted)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        MinHash signature of a text's word shingles
+
+        Returns:
+            uint32 array of length num_perm, or None for empty text
+        """
+        words = WORD_PATTERN.findall((text or '').lower())
+        if not words:
+            return None
+        size = min(self.shingle_size, len(words))
+        shingles = {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+        hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        # a * h + b stays below 2**64 because a, b and h are all below 2**32
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % HASH_PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def band_keys(self, signature: np.ndarray) -> List[int]:
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            keys.append(int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), 'big', signed=True))
+        return keys
+
+    @staticmethod
+    def similarity(signature_a: np.ndarray, signature_b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.mean(signature_a == signature_b))
+
+    def _on_job_saved(self, mapper, connection, target):
+        self.index_job(connection, target.id, target.user_id, dedup_text(target))
+
+    def _on_job_updated(self, mapper, connection, target):
+        state = inspect(target)
+        if state.attrs.title.history.has_changes() or state.attrs.description.history.has_changes():
+            self.index_job(connection, target.id, target.user_id, dedup_text(target))
+
+    def _on_job_deleted(self, mapper, connection, target):
+        self._unindex(connection, target.id)
+        connection.execute(update(JobSignature.__table__)
+                           .where(JobSignature.__table__.c.duplicate_of_id == target.id)
+                           .values(duplicate_of_id=None, similarity=None))
+
+    def _unindex(self, connection, job_id: int):
+        connection.execute(delete(JobLSHBucket.__table__).where(JobLSHBucket.__table__.c.job_id == job_id))
+        connection.execute(delete(JobSignature.__table__).where(JobSignature.__table__.c.job_id == job_id))
+
+    def index_job(self, connection, job_id: int, user_id: int, text: str,
+                  threshold: Optional[float] = None) -> Optional[Tuple[int, float]]:
+        """
+        (Re)compute a job's signature and buckets and flag it if it duplicates an older job
+
+        Runs on the caller's connection so it joins the surrounding transaction.
+
+        Args:
+            connection: SQLAlchemy connection
+            job_id: Job to index
+            user_id: The job's owner; only their older jobs are candidates
+            text: Text to fingerprint (see dedup_text)
+            threshold: Similarity needed to flag (default: self.threshold)
+
+        Returns:
+            (duplicate_of_id, similarity) if flagged, otherwise None
+        """
+        self._unindex(connection, job_id)
+
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        keys = self.band_keys(signature)
+
+        match = self._best_match(connection, job_id, user_id, signature, keys, threshold or self.threshold)
+        connection.execute(insert(JobSignature.__table__).values(
+            job_id=job_id, minhash=signature.tobytes(),
+            duplicate_of_id=match[0] if match else None,
+            similarity=match[1] if match else None))
+        connection.execute(insert(JobLSHBucket.__table__),
+                           [{'job_id': job_id, 'user_id': user_id, 'band': band, 'bucket': key}
+                            for band, key in enumerate(keys)])
+        if match:
+            logger.info(f"Job {job_id} looks like a duplicate of job {match[0]} ({match[1]:.0%} similar)")
+        return match
+
+    def _best_match(self, connection, job_id: int, user_id: int, signature: np.ndarray, keys: List[int],
+                    threshold: float) -> Optional[Tuple[int, float]]:
+        signatures, buckets = JobSignature.__table__, JobLSHBucket.__table__
+        # Only older jobs count as originals, so a pair is always flagged from the newer side
+        candidates = select(buckets.c.job_id).distinct().where(
+            buckets.c.user_id == user_id,
+            buckets.c.job_id < job_id,
+            or_(*[and_(buckets.c.band == band, buckets.c.bucket == key) for band, key in enumerate(keys)]))
+        rows = connection.execute(
+            select(signatures.c.job_id, signatures.c.minhash, signatures.c.duplicate_of_id)
+            .where(signatures.c.job_id.in_(candidates))).all()
+
+        best = None
+        for candidate_id, minhash, duplicate_of_id in rows:
+            score = self.similarity(signature, np.frombuffer(minhash, dtype=np.uint32))
+            if score >= threshold and (best is None or score > best[1]):
+                # Point at the original, not at another copy of it
+                best = (duplicate_of_id or candidate_id, score)
+        return best
+
+    def duplicate_of(self, job_id: int) -> Optional[Tuple[Job, float]]:
+        """
+        Older job this one was flagged as a near-duplicate of
+
+        Returns:
+            (original Job, similarity) or None
+        """
+        try:
+            flagged = JobSignature.query.filter(JobSignature.job_id == job_id,
+                                                JobSignature.duplicate_of_id.isnot(None)).first()
+            if flagged is None:
+                return None
+            original = db.session.get(Job, flagged.duplicate_of_id)
+            return (original, flagged.similarity) if original else None
+        except SQLAlchemyError as e:
+            logger.error(f"Duplicate lookup failed for job {job_id}: {e}")
+            db.session.rollback()
+            return None
+
+    def merge(self, duplicate_id: int, original_id: int) -> bool:
+        """
+        Fold a duplicate job into the original and delete it
+
+        Notes, follow-ups, contacts and applications move to the original;
+        empty fields on the original are filled from the duplicate, and the
+        further-along status and earliest application date are kept.
+
+        Returns:
+            True if merged, False otherwise
+        """
+        try:
+            duplicate, original = db.session.get(Job, duplicate_id), db.session.get(Job, original_id)
+            if duplicate is None or original is None or duplicate_id == original_id:
+                return False
+
+            for child in list(duplicate.notes) + list(duplicate.follow_ups) + list(duplicate.contacts) \
+                    + list(duplicate.applications):
+                child.job = original
+
+            for field in ('title', 'company', 'description', 'location', 'salary_range', 'job_type'):
+                if not getattr(original, field) and getattr(duplicate, field):
+                    setattr(original, field, getattr(duplicate, field))
+            if STATUS_ORDER.index(duplicate.status or 'saved') > STATUS_ORDER.index(original.status or 'saved'):
+                original.status = duplicate.status
+            if duplicate.date_applied and (not original.date_applied or duplicate.date_applied < original.date_applied):
+                original.date_applied = duplicate.date_applied
+
+            JobSignature.query.filter_by(duplicate_of_id=duplicate_id).update(
+                {JobSignature.duplicate_of_id: original_id}, synchronize_session=False)
+            db.session.delete(duplicate)
+            db.session.commit()
+            logger.info(f"Merged job {duplicate_id} into job {original_id}")
+            return True
+
+        except (SQLAlchemyError, ValueError) as e:
+            logger.error(f"Failed to merge job {duplicate_id} into {original_id}: {e}")
+            db.session.rollback()
+            return False
+
+    def backfill(self, threshold: Optional[float] = None, batch_size: int = 500,
+                 merge: bool = False) -> Dict[str, int]:
+        """
+        Re-index every job and flag (or merge) near-duplicates
+
+        Jobs are processed oldest first, so the earliest posting of a role is
+        kept as the original. Each batch is committed separately.
+
+        Args:
+            threshold: Similarity needed to flag (default: self.threshold)
+            batch_size: Jobs per transaction
+            merge: Merge flagged duplicates into their originals
+
+        Returns:
+            Counts of indexed, flagged and merged jobs
+        """
+        stats = {'indexed': 0, 'flagged': 0, 'merged': 0}
+        flagged: List[Tuple[int, int]] = []
+        last_id = 0
+        while True:
+            batch = db.session.query(Job.id, Job.user_id, Job.title, Job.description)\
+                .filter(Job.id > last_id).order_by(Job.id).limit(batch_size).all()
+            if not batch:
+                break
+            connection = db.session.connection()
+            for job_id, user_id, title, description in batch:
+                match = self.index_job(connection, job_id, user_id, f"{title or ''} {description or ''}", threshold)
+                stats['indexed'] += 1
+                if match:
+                    stats['flagged'] += 1
+                    flagged.append((job_id, match[0]))
+            db.session.commit()
+            last_id = batch[-1][0]
+
+        if merge:
+            for duplicate_id, original_id in flagged:
+                if self.merge(duplicate_id, original_id):
+                    stats['merged'] += 1
+
+        logger.info(f"Duplicate backfill: {stats}")
+        return stats
+
+# Global job deduplicator instance
+job_deduplicator = JobDeduplicator()
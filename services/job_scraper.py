@@ -1,21 +1,216 @@
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse, parse_qs
+from urllib.parse import urlparse
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import zip_longest
+import os
+import threading
 import time
-import re
+
+from services.http_cache import HTTPCache
+from services.extractors import extractor_registry
+from services.tracing import tracer, traced
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Job boards offered in the search form
+JOBSPY_SITES = ('indeed', 'linkedin', 'zip_recruiter', 'glassdoor')
+
+# JobSpy result columns -> job dictionary keys
+JOBSPY_COLUMNS = {
+    'title': 'title',
+    'company': 'company',
+    'location': 'location',
+    'description': 'description',
+    'job_url': 'url',
+    'date_posted': 'date_posted',
+    'min_amount': 'salary',
+}
+
+NON_ALPHANUMERIC = r'[^0-9a-z]+'
+
+def jobs_from_frame(jobs, site: str) -> List[Dict[str, Any]]:
+    """Convert a JobSpy DataFrame to job dictionaries with column operations rather than a row loop"""
+    frame = jobs.reindex(columns=list(JOBSPY_COLUMNS)).rename(columns=JOBSPY_COLUMNS)
+    frame['date_posted'] = frame['date_posted'].astype(str).where(frame['date_posted'].notna(), '')
+    frame = frame.astype(object).where(frame.notna(), '')
+    frame['source'] = site
+    return frame.to_dict('records')
+
+def dedupe_jobs(jobs: List[Dict[str, Any]], seen: set) -> List[Dict[str, Any]]:
+    """
+    Drop jobs whose URL or normalised title/company/location is in ``seen`` or repeated
+    
+    ``seen`` is updated with the keys of the jobs kept.
+    """
+    if not jobs:
+        return []
+    import pandas as pd
+    
+    frame = pd.DataFrame(jobs, columns=['url', 'title', 'company', 'location']).fillna('').astype(str)
+    normalised = {column: frame[column].str.lower().str.replace(NON_ALPHANUMERIC, '', regex=True)
+                  for column in ('title', 'company', 'location')}
+    identity = normalised['title'] + '|' + normalised['company'] + '|' + normalised['location']
+    url = frame['url'].str.strip().str.rstrip('/')
+    
+    # Postings without a title can only be matched by URL
+    titled = normalised['title'].ne('')
+    repeated = (titled & (identity.isin(seen) | identity.duplicated())) \
+        | (url.ne('') & (url.isin(seen) | url.duplicated()))
+    keep = ~repeated.to_numpy()
+    seen.update(identity[keep & titled.to_numpy()])
+    seen.update(url[keep & url.ne('').to_numpy()])
+    return [job for job, kept in zip(jobs, keep) if kept]
+
+class HostThrottle:
+    """
+    Per-host politeness: at most ``max_per_host`` requests in flight to one
+    host, and request starts to the same host spaced ``delay`` seconds apart.
+    """
+    
+    def __init__(self, max_per_host: int = 2, delay: float = 0.5):
+        self.max_per_host = max_per_host
+        self.delay = delay
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def slot(self, host: str):
+        with self._lock:
+            semaphore = self._semaphores.setdefault(host, threading.BoundedSemaphore(self.max_per_host))
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + self.delay
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+class SearchCache:
+    """
+    In-memory cache of JobSpy results keyed by the full search (site, term,
+    location, result count, age and country). Entries expire after ``ttl``
+    seconds; beyond ``max_entries`` the least recently used one is evicted.
+    """
+    
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl = float(os.getenv('JOBSPY_CACHE_TTL', 900)) if ttl is None else ttl
+        self.max_entries = int(os.getenv('JOBSPY_CACHE_SIZE', 128)) if max_entries is None else max_entries
+        self._entries: 'OrderedDict[tuple, tuple]' = OrderedDict()  # key -> (stored_at, jobs)
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+    
+    @staticmethod
+    def key(site: str, search_term: str, location: str, results_wanted: int, hours_old: Optional[int],
+            country: str) -> tuple:
+        return (site, ' '.join(search_term.lower().split()), ' '.join(location.lower().split()),
+                results_wanted, hours_old, country.lower())
+    
+    def get(self, key: tuple) -> Optional[List[Dict[str, Any]]]:
+        """Copies of the cached jobs, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] >= self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return [dict(job) for job in entry[1]]
+    
+    def put(self, key: tuple, jobs: List[Dict[str, Any]]):
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), [dict(job) for job in jobs])
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                    'evictions': self.evictions, 'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0}
+
 class JobScraper:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+    def __init__(self, max_workers: Optional[int] = None, max_per_host: Optional[int] = None,
+                 host_delay: Optional[float] = None):
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        }
+        self.max_workers = max_workers or int(os.getenv('SCRAPER_MAX_WORKERS', 8))
+        self.throttle = HostThrottle(
+            max_per_host=max_per_host or int(os.getenv('SCRAPER_MAX_PER_HOST', 2)),
+            delay=float(os.getenv('SCRAPER_HOST_DELAY', 0.5)) if host_delay is None else host_delay
+        )
+        self.jobspy_country = os.getenv('JOBSPY_COUNTRY', 'USA')
+        self.jobspy_hours_old = int(os.getenv('JOBSPY_HOURS_OLD', 72))
+        self.search_cache = SearchCache()
+        self.cache = HTTPCache()
+        self.extractors = extractor_registry
+        self._local = threading.local()
+    
+    @property
+    def session(self) -> requests.Session:
+        """One session per thread; requests.Session is not safe to share across threads"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers.update(self.headers)
+        return session
+    
+    def _fetch(self, url: str) -> requests.Response:
+        """GET a URL through the HTTP cache; only misses and revalidations hit the network"""
+        return self.cache.fetch(url, self._send)
+    
+    def _send(self, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """GET a URL within the per-host concurrency and politeness limits"""
+        with tracer.span('scraper.fetch', url=url) as span:
+            with self.throttle.slot(urlparse(url).netloc.lower()):
+                response = self.session.get(url, headers=headers, timeout=10)
+            if span is not None:
+                span.set(status_code=response.status_code, bytes=len(response.content))
+            return response
     
+    def extract_many(self, urls: List[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Extract job information from many URLs concurrently
+        
+        URLs are interleaved across hosts so one slow or rate-limited site
+        doesn't tie up every worker.
+        
+        Args:
+            urls: Job posting URLs
+            
+        Yields:
+            {'index', 'url', 'job_info'} for each URL, in completion order
+        """
+        by_host: Dict[str, List[tuple]] = {}
+        for index, url in enumerate(urls):
+            by_host.setdefault(urlparse(url).netloc.lower(), []).append((index, url))
+        ordered = [item for group in zip_longest(*by_host.values()) for item in group if item]
+        
+        pool = ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(urls))),
+                                  thread_name_prefix='scrape')
+        try:
+            futures = {pool.submit(tracer.wrap(self.extract_job_info), url): (index, url) for index, url in ordered}
+            for future in as_completed(futures):
+                index, url = futures[future]
+                yield {'index': index, 'url': url, 'job_info': future.result()}
+        finally:
+            # Stop queued fetches if the consumer goes away (e.g. client disconnect)
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    @traced('scraper.extract_job_info')
     def extract_job_info(self, url: str) -> Dict[str, Any]:
         """
         Extract job information from a job posting URL
@@ -27,220 +222,35 @@ class JobScraper:
             Dictionary with extracted job information
         """
         try:
-            domain = urlparse(url).netloc.lower()
-            
-            if 'linkedin.com' in domain:
-                return self._scrape_linkedin(url)
-            elif 'indeed.com' in domain:
-                return self._scrape_indeed(url)
-            else:
-                # Generic scraping for other sites
-                return self._scrape_generic(url)
-                
-        except Exception as e:
-            logger.error(f"Failed to extract job info from {url}: {e}")
-            return {
-                'title': '',
-                'company': '',
-                'location': '',
-                'description': '',
-                'error': str(e)
-            }
-    
-    def _scrape_linkedin(self, url: str) -> Dict[str, Any]:
-        """Scrape LinkedIn job posting"""
-        try:
-            # LinkedIn has anti-scraping measures, so we'll extract what we can from the URL
-            job_id = self._extract_linkedin_job_id(url)
-            
-            response = self.session.get(url, timeout=10)
-            if response.status_code != 200:
-                return {
-                    'title': '',
-                    'company': '',
-                    'location': '',
-                    'description': 'Unable to access LinkedIn job posting. LinkedIn has anti-scraping measures.',
-                    'job_id': job_id
-                }
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Try to extract basic information
-            title = self._extract_text_by_selectors(soup, [
-                'h1.top-card-layout__title',
-                '.job-title',
-                'h1'
-            ])
-            
-            company = self._extract_text_by_selectors(soup, [
-                '.topcard__org-name-link',
-                '.job-details-jobs-unified-top-card__company-name',
-                '.company-name'
-            ])
-            
-            location = self._extract_text_by_selectors(soup, [
-                '.topcard__flavor',
-                '.job-details-jobs-unified-top-card__bullet',
-                '.location'
-            ])
-            
-            # Description is often loaded dynamically, so we may not get it
-            description = self._extract_text_by_selectors(soup, [
-                '.description__text',
-                '.job-description',
-                '.jobs-description__content'
-            ])
-            
-            return {
-                'title': title,
-                'company': company,
-                'location': location,
-                'description': description or 'Description not available - please copy manually from LinkedIn',
-                'job_id': job_id,
-                'source': 'linkedin'
-            }
-            
+            response = self._fetch(url)
         except Exception as e:
-            logger.error(f"LinkedIn scraping failed: {e}")
-            return {
-                'title': '',
-                'company': '',
-                'location': '',
-                'description': f'LinkedIn scraping failed: {str(e)}. Please enter details manually.',
-                'source': 'linkedin'
-            }
+            return self.failed_job_info(url, e)
+        return self.job_info_from_response(url, response)
     
-    def _scrape_indeed(self, url: str) -> Dict[str, Any]:
-        """Scrape Indeed job posting"""
-        try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            title = self._extract_text_by_selectors(soup, [
-                '[data-testid="jobsearch-JobInfoHeader-title"]',
-                '.jobsearch-JobInfoHeader-title',
-                'h1.icl-u-xs-mb--xs'
-            ])
-            
-            company = self._extract_text_by_selectors(soup, [
-                '[data-testid="inlineHeader-companyName"]',
-                '.icl-u-lg-mr--sm',
-                '.companyName'
-            ])
-            
-            location = self._extract_text_by_selectors(soup, [
-                '[data-testid="job-location"]',
-                '.icl-u-colorForeground--secondary',
-                '.locationsContainer'
-            ])
-            
-            # Indeed job descriptions
-            description = self._extract_text_by_selectors(soup, [
-                '#jobDescriptionText',
-                '.jobsearch-jobDescriptionText',
-                '.jobDescription'
-            ])
-            
-            return {
-                'title': title,
-                'company': company,
-                'location': location,
-                'description': description,
-                'source': 'indeed'
-            }
+    @traced('scraper.parse')
+    def job_info_from_response(self, url: str, response) -> Dict[str, Any]:
+        """
+        Build extract_job_info's result from an already fetched page
+        
+        Args:
+            url: Job posting URL
+            response: requests or httpx response for the URL
             
-        except Exception as e:
-            logger.error(f"Indeed scraping failed: {e}")
-            return {
-                'title': '',
-                'company': '',
-                'location': '',
-                'description': f'Indeed scraping failed: {str(e)}',
-                'source': 'indeed'
-            }
-    
-    def _scrape_generic(self, url: str) -> Dict[str, Any]:
-        """Generic scraping for other job sites"""
+        Returns:
+            Dictionary with extracted job information
+        """
         try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Generic selectors that might work on various sites
-            title = self._extract_text_by_selectors(soup, [
-                'h1',
-                '.job-title',
-                '.position-title',
-                '[class*="title"]'
-            ])
-            
-            company = self._extract_text_by_selectors(soup, [
-                '.company',
-                '.employer',
-                '[class*="company"]',
-                '[class*="employer"]'
-            ])
-            
-            location = self._extract_text_by_selectors(soup, [
-                '.location',
-                '.job-location',
-                '[class*="location"]'
-            ])
-            
-            # Look for large text blocks that might be descriptions
-            description_elem = soup.find(['div', 'section'], 
-                                       class_=re.compile(r'description|content|details'))
-            description = description_elem.get_text(strip=True) if description_elem else ''
-            
-            return {
-                'title': title,
-                'company': company,
-                'location': location,
-                'description': description,
-                'source': 'generic'
-            }
-            
+            return self.extractors.extract(url, response)
         except Exception as e:
-            logger.error(f"Generic scraping failed for {url}: {e}")
-            return {
-                'title': '',
-                'company': '',
-                'location': '',
-                'description': f'Scraping failed: {str(e)}',
-                'source': 'generic'
-            }
+            return self.failed_job_info(url, e)
     
-    def _extract_linkedin_job_id(self, url: str) -> str:
-        """Extract LinkedIn job ID from URL"""
-        try:
-            if 'currentJobId=' in url:
-                parsed = parse_qs(urlparse(url).query)
-                return parsed.get('currentJobId', [''])[0]
-            elif '/view/' in url:
-                return url.split('/view/')[-1].split('?')[0]
-            else:
-                return ''
-        except:
-            return ''
-    
-    def _extract_text_by_selectors(self, soup: BeautifulSoup, selectors: list) -> str:
-        """Try multiple CSS selectors to extract text"""
-        for selector in selectors:
-            try:
-                element = soup.select_one(selector)
-                if element:
-                    text = element.get_text(strip=True)
-                    if text:
-                        return text
-            except:
-                continue
-        return ''
+    def failed_job_info(self, url: str, error: Exception) -> Dict[str, Any]:
+        """Result for a posting that couldn't be fetched or parsed"""
+        return self.extractors.failure(url, error)
     
     def scrape_with_jobspy(self, site: str = 'indeed', search_term: str = '', 
-                         location: str = '', results_wanted: int = 10) -> Optional[list]:
+                         location: str = '', results_wanted: int = 10, hours_old: Optional[int] = None,
+                         country: Optional[str] = None, fresh: bool = False) -> Optional[list]:
         """
         Use JobSpy library for scraping (Indeed works best)
         
@@ -249,43 +259,43 @@ class JobScraper:
             search_term: Job search term
             location: Location filter
             results_wanted: Number of results to fetch
+            hours_old: Only jobs posted within this many hours (default: JOBSPY_HOURS_OLD, 0 for any age)
+            country: Country for Indeed/Glassdoor (default: JOBSPY_COUNTRY)
+            fresh: Skip the search cache lookup (the result is still cached)
             
         Returns:
-            List of job dictionaries or None if failed
+            List of job dictionaries or None if failed; identical searches
+            within JOBSPY_CACHE_TTL are answered from the search cache
         """
+        hours_old = self.jobspy_hours_old if hours_old is None else hours_old
+        country = country or self.jobspy_country
+        key = SearchCache.key(site, search_term, location, results_wanted, hours_old, country)
+        cached = None if fresh else self.search_cache.get(key)
+        if cached is not None:
+            logger.info(f"Returning {len(cached)} cached jobs from {site} for '{search_term}'")
+            return cached
+        
         try:
             from jobspy import scrape_jobs
             
-            jobs = scrape_jobs(
-                site_name=site,
-                search_term=search_term,
-                location=location,
-                results_wanted=results_wanted,
-                hours_old=72,  # Jobs posted within last 72 hours
-                country_indeed='USA'  # or 'UK' for UK Indeed
-            )
+            with tracer.span('jobspy.scrape_jobs', site=site, results_wanted=results_wanted):
+                jobs = scrape_jobs(
+                    site_name=site,
+                    search_term=search_term,
+                    location=location,
+                    results_wanted=results_wanted,
+                    hours_old=hours_old or None,
+                    country_indeed=country
+                )
             
             if jobs is not None and not jobs.empty:
-                # Convert DataFrame to list of dictionaries
-                job_list = []
-                for _, row in jobs.iterrows():
-                    job_dict = {
-                        'title': row.get('title', ''),
-                        'company': row.get('company', ''),
-                        'location': row.get('location', ''),
-                        'description': row.get('description', ''),
-                        'url': row.get('job_url', ''),
-                        'date_posted': row.get('date_posted', ''),
-                        'salary': row.get('min_amount', ''),
-                        'source': site
-                    }
-                    job_list.append(job_dict)
-                
+                job_list = jobs_from_frame(jobs, site)
                 logger.info(f"Successfully scraped {len(job_list)} jobs from {site}")
-                return job_list
             else:
                 logger.warning(f"No jobs found on {site} for '{search_term}' in '{location}'")
-                return []
+                job_list = []
+            self.search_cache.put(key, job_list)
+            return job_list
                 
         except ImportError:
             logger.error("JobSpy library not installed. Run: pip install jobspy")
@@ -293,6 +303,37 @@ class JobScraper:
         except Exception as e:
             logger.error(f"JobSpy scraping failed: {e}")
             return None
+    
+    def search_sites(self, sites: List[str], search_term: str = '', location: str = '',
+                     results_wanted: int = 10, hours_old: Optional[int] = None,
+                     country: Optional[str] = None, fresh: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Search several job boards concurrently, yielding each one's results as it finishes
+        
+        Jobs already yielded for an earlier site (same URL, or the same title,
+        company and location) are dropped, so syndicated postings appear once.
+        
+        Args:
+            sites: JobSpy site names
+            search_term, location, results_wanted, hours_old, country, fresh: As for scrape_with_jobspy
+            
+        Yields:
+            {'site', 'jobs', 'duplicates', 'error'} per site, in completion order
+        """
+        seen = set()
+        pool = ThreadPoolExecutor(max_workers=max(1, len(sites)), thread_name_prefix='jobspy')
+        try:
+            futures = {pool.submit(tracer.wrap(self.scrape_with_jobspy), site, search_term, location, results_wanted,
+                                   hours_old, country, fresh): site for site in sites}
+            for future in as_completed(futures):
+                site, jobs = futures[future], future.result()
+                if jobs is None:
+                    yield {'site': site, 'jobs': [], 'duplicates': 0, 'error': f'Search failed on {site}'}
+                    continue
+                unique = dedupe_jobs(jobs, seen)
+                yield {'site': site, 'jobs': unique, 'duplicates': len(jobs) - len(unique), 'error': None}
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
 
 # Global scraper instance
 job_scraper = JobScraper()
\ No newline at end of file
@@ -0,0 +1,341 @@
+import re
+import json
+import html
+import logging
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import lxml.html
+import soupsieve
+from bs4 import BeautifulSoup
+from lxml import etree
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+JOB_FIELDS = ('title', 'company', 'location', 'description')
+
+# JSON-LD blocks are located in the raw bytes, so the fast path never builds a DOM
+JSON_LD_PATTERN = re.compile(
+    rb'<script[^>]*type\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script\s*>', re.I | re.S)
+
+# Comment/CDATA wrappers some sites put around the JSON
+JSON_LD_WRAPPER = re.compile(rb'^\s*(?:<!--|<!\[CDATA\[)|(?:-->|\]\]>)\s*$')
+
+# One compound selector: optional tag, then any of .class, #id, [attr], [attr="v"], [attr*="v"]
+SELECTOR_PATTERN = re.compile(r'^([a-zA-Z][a-zA-Z0-9]*)?((?:[.#][\w-]+|\[[\w-]+(?:[*^$]?=(?:"[^"]*"|\'[^\']*\'|[^\]]*))?\])*)$')
+PART_PATTERN = re.compile(r'\.([\w-]+)|#([\w-]+)|\[([\w-]+)(?:([*^$]?=)(?:"([^"]*)"|\'([^\']*)\'|([^\]]*)))?\]')
+
+META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w.:-]+)', re.I)
+
+VISIBLE_TEXT_XPATH = 'descendant-or-self::text()[not(ancestor::script or ancestor::style or ancestor::template)]'
+
+BLOCK_TAGS = ('p', 'div', 'li', 'br', 'h1', 'h2', 'h3', 'h4', 'tr', 'section')
+
+class JobPageParser:
+    """
+    Extracts job fields from a posting page as cheaply as the page allows.
+
+    1. Fast path: most job boards embed a schema.org ``JobPosting`` as
+       JSON-LD for search engines. Those blocks are found with a regex over
+       the raw bytes and read with ``json``; no HTML tree is built at all.
+    2. Selector path: fields the JSON-LD didn't supply are read with CSS
+       selectors. The page is parsed by lxml's C parser and each selector is
+       compiled once to XPath, so Python only walks the subtrees that match
+       rather than building a BeautifulSoup object for every node. Selectors
+       too complex to compile fall back to BeautifulSoup (lxml builder).
+
+    Selector-to-XPath translations are shared; lxml parsers and compiled
+    XPath objects are kept per thread, since ``JobScraper.extract_many``
+    parses pages concurrently.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._translations: Dict[str, Optional[str]] = {}
+
+    @property
+    def _cache(self) -> Dict[str, Any]:
+        cache = getattr(self._local, 'cache', None)
+        if cache is None:
+            cache = self._local.cache = {'xpaths': {}, 'parsers': {},
+                                         'visible_text': etree.XPath(VISIBLE_TEXT_XPATH)}
+        return cache
+
+    def parse(self, content: bytes, selectors: Dict[str, List[str]],
+              description_classes: Optional[str] = None, encoding: Optional[str] = None,
+              matches: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """
+        Extract job fields from page content
+
+        Args:
+            content: Raw page bytes
+            selectors: Field name -> CSS selectors, tried in order
+            description_classes: Regex for div/section classes to use as the
+                description when no description selector matches
+            encoding: Page encoding if known (e.g. from the Content-Type header)
+            matches: If given, filled with field -> the selector that matched
+                ('' if none did) for every field looked up by selector
+
+        Returns:
+            Dictionary with title, company, location and description (empty
+            strings if not found), plus job_type/salary when JSON-LD has
+            them, and 'structured': True when JSON-LD was used
+        """
+        result = {field: '' for field in JOB_FIELDS}
+
+        posting = self.find_job_posting(content)
+        if posting:
+            result.update({field: value for field, value in self.posting_fields(posting).items() if value})
+            result['structured'] = True
+
+        missing = {field: field_selectors for field, field_selectors in selectors.items() if not result.get(field)}
+        if description_classes and not result['description']:
+            missing.setdefault('description', [])
+        if not missing:
+            return result
+
+        document = _Document(self, content, encoding)
+        for field, field_selectors in missing.items():
+            result[field], selector = document.first_match(field_selectors)
+            if matches is not None and field_selectors:
+                matches[field] = selector
+        if description_classes and not result['description']:
+            result['description'] = document.find_by_class(('div', 'section'), re.compile(description_classes))
+        return result
+
+    def compile(self, selector: str) -> Optional[etree.XPath]:
+        """
+        Compile a simple compound CSS selector to XPath (see translate)
+
+        Returns:
+            XPath matching the selector's elements in document order, or None
+            if the selector needs the full CSS engine
+        """
+        xpaths = self._cache['xpaths']
+        if selector not in xpaths:
+            expression = self.translate(selector)
+            xpaths[selector] = etree.XPath(expression) if expression else None
+        return xpaths[selector]
+
+    def translate(self, selector: str) -> Optional[str]:
+        """
+        XPath expression for a simple compound CSS selector
+
+        Handles an optional tag followed by any of .class, #id, [attr],
+        [attr="v"], [attr*="v"], [attr^="v"] and [attr$="v"]; anything else
+        returns None. Other selectors are checked with soupsieve, so a
+        malformed one raises ValueError here rather than failing every page.
+        """
+        if selector in self._translations:
+            return self._translations[selector]
+        xpath = None
+        match = SELECTOR_PATTERN.match(selector.strip())
+        if match and selector.strip():
+            tests = []
+            for class_name, element_id, attribute, operator, *values in PART_PATTERN.findall(match.group(2)):
+                value = next((v for v in values if v), '')
+                if "'" in value or "'" in class_name + element_id:
+                    tests = None
+                    break
+                if class_name:
+                    tests.append(f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')")
+                elif element_id:
+                    tests.append(f"@id='{element_id}'")
+                elif not operator:
+                    tests.append(f"@{attribute}")
+                elif operator != '=' and not value:
+                    tests.append('false()')  # CSS: empty substring matches never succeed
+                elif operator == '*=':
+                    tests.append(f"contains(@{attribute}, '{value}')")
+                elif operator == '^=':
+                    tests.append(f"starts-with(@{attribute}, '{value}')")
+                elif operator == '$=':
+                    tests.append(f"substring(@{attribute}, string-length(@{attribute}) - {len(value) - 1})='{value}'")
+                else:
+                    tests.append(f"@{attribute}='{value}'")
+            if tests is not None:
+                tag = (match.group(1) or '*').lower()
+                xpath = f"//{tag}" + ''.join(f"[{test}]" for test in tests)
+        if xpath is None:
+            try:
+                soupsieve.compile(selector)
+            except soupsieve.SelectorSyntaxError as e:
+                raise ValueError(f"Invalid selector {selector!r}: {e}") from None
+        self._translations[selector] = xpath
+        return xpath
+
+    def _html_parser(self, encoding: str) -> lxml.html.HTMLParser:
+        parsers = self._cache['parsers']
+        if encoding not in parsers:
+            parsers[encoding] = lxml.html.HTMLParser(encoding=encoding, remove_comments=True)
+        return parsers[encoding]
+
+    def element_text(self, element) -> str:
+        """Stripped text nodes joined without separators, like BeautifulSoup's get_text(strip=True)"""
+        return ''.join(text.strip() for text in self._cache['visible_text'](element))
+
+    def find_job_posting(self, content: bytes) -> Optional[Dict[str, Any]]:
+        """First schema.org JobPosting in the page's JSON-LD, if any"""
+        if b'ld+json' not in content:
+            return None
+        for block in JSON_LD_PATTERN.findall(content):
+            try:
+                data = json.loads(JSON_LD_WRAPPER.sub(b'', block))
+            except ValueError:
+                continue
+            for item in self._walk(data):
+                types = item.get('@type')
+                if types == 'JobPosting' or (isinstance(types, list) and 'JobPosting' in types):
+                    return item
+        return None
+
+    def _walk(self, data: Any) -> Iterator[Dict[str, Any]]:
+        if isinstance(data, list):
+            for item in data:
+                yield from self._walk(item)
+        elif isinstance(data, dict):
+            yield data
+            if '@graph' in data:
+                yield from self._walk(data['@graph'])
+
+    def posting_fields(self, posting: Dict[str, Any]) -> Dict[str, str]:
+        """Map a JobPosting object onto job fields"""
+        organization = posting.get('hiringOrganization')
+        if isinstance(organization, dict):
+            organization = organization.get('name')
+
+        return {
+            'title': self._clean(posting.get('title') or posting.get('name')),
+            'company': self._clean(organization),
+            'location': self._location(posting),
+            'description': self.html_to_text(posting.get('description')),
+            'job_type': self._employment_type(posting.get('employmentType')),
+            'salary': self._salary(posting.get('baseSalary')),
+        }
+
+    def _location(self, posting: Dict[str, Any]) -> str:
+        places = posting.get('jobLocation') or []
+        places = places if isinstance(places, list) else [places]
+        locations = []
+        for place in places:
+            address = place.get('address') if isinstance(place, dict) else place
+            if isinstance(address, dict):
+                country = address.get('addressCountry')
+                if isinstance(country, dict):
+                    country = country.get('name')
+                parts = [address.get('addressLocality'), address.get('addressRegion'), country]
+                address = ', '.join(self._clean(part) for part in parts if self._clean(part))
+            address = self._clean(address)
+            if address and address not in locations:
+                locations.append(address)
+        location = '; '.join(locations)
+        if posting.get('jobLocationType') == 'TELECOMMUTE':
+            location = f"Remote ({location})" if location else 'Remote'
+        return location
+
+    def _employment_type(self, employment_type: Any) -> str:
+        types = employment_type if isinstance(employment_type, list) else [employment_type]
+        return ', '.join(str(kind).replace('_', '-').capitalize() for kind in types if kind)
+
+    def _salary(self, salary: Any) -> str:
+        if not isinstance(salary, dict):
+            return self._clean(salary)
+        value, unit = salary.get('value'), ''
+        if isinstance(value, dict):
+            unit = value.get('unitText') or ''
+            low, high = value.get('minValue'), value.get('maxValue')
+            value = [low, high] if low and high else value.get('value') or low or high
+        amounts = value if isinstance(value, list) else [value]
+        amount = '-'.join(self._number(amount) for amount in amounts if amount)
+        if not amount:
+            return ''
+        text = f"{salary.get('currency') or ''} {amount}".strip()
+        return f"{text} per {unit.lower()}" if unit else text
+
+    def _number(self, amount: Any) -> str:
+        if not isinstance(amount, (int, float)):
+            return self._clean(amount)
+        return f"{amount:,.0f}" if amount == int(amount) else f"{amount:,.2f}"
+
+    @staticmethod
+    def _clean(value: Any) -> str:
+        return ' '.join(html.unescape(str(value)).split()) if value else ''
+
+    @staticmethod
+    def html_to_text(markup: Any) -> str:
+        """Plain text of an HTML fragment, one line per block element"""
+        if not markup:
+            return ''
+        markup = str(markup)
+        if '&lt;' in markup:
+            markup = html.unescape(markup)
+        if '<' not in markup:
+            return html.unescape(markup).strip()
+        try:
+            root = lxml.html.fragment_fromstring(markup, create_parent='div')
+        except Exception:
+            return re.sub(r'<[^>]+>', ' ', markup).strip()
+        for element in root.iter(*BLOCK_TAGS):
+            element.tail = '\n' + (element.tail or '')
+        lines = (' '.join(line.split()) for line in root.text_content().splitlines())
+        return '\n'.join(line for line in lines if line)
+
+class _Document:
+    """One page, parsed on first use"""
+
+    def __init__(self, engine: JobPageParser, content: bytes, encoding: Optional[str]):
+        self.engine = engine
+        self.content = content
+        self.encoding = encoding
+        self._root = None
+        self._soup = None
+
+    @property
+    def root(self):
+        if self._root is None:
+            encoding = self.encoding or _declared_encoding(self.content) or 'utf-8'
+            try:
+                self._root = lxml.html.document_fromstring(self.content, parser=self.engine._html_parser(encoding))
+            except (LookupError, ValueError, etree.ParserError):
+                self._root = lxml.html.document_fromstring(self.content.decode('utf-8', 'replace'))
+        return self._root
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        # Only selectors the XPath compiler can't express pay for a BeautifulSoup tree
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.content, 'lxml', from_encoding=self.encoding)
+        return self._soup
+
+    def first_match(self, selectors: List[str]) -> Tuple[str, str]:
+        """(text, selector) for the first selector whose first match is non-empty, or ('', '')"""
+        for selector in selectors:
+            try:
+                xpath = self.engine.compile(selector)
+            except ValueError as e:
+                logger.warning(str(e))
+                continue
+            if xpath is not None:
+                elements = xpath(self.root)
+                text = self.engine.element_text(elements[0]) if elements else ''
+            else:
+                element = self.soup.select_one(selector)
+                text = element.get_text(strip=True) if element else ''
+            if text:
+                return text, selector
+        return '', ''
+
+    def find_by_class(self, tags: tuple, pattern: re.Pattern) -> str:
+        """Text of the first of ``tags`` whose class attribute matches ``pattern``"""
+        for element in self.root.iter(*tags):
+            if pattern.search(element.get('class') or ''):
+                return self.engine.element_text(element)
+        return ''
+
+def _declared_encoding(content: bytes) -> Optional[str]:
+    match = META_CHARSET_PATTERN.search(content[:4096])
+    return match.group(1).decode('ascii', 'ignore') if match else None
+
+# Global job page parser instance
+job_page_parser = JobPageParser()
@@ -0,0 +1,155 @@
+import PyPDF2
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_EXCEPTION
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class PDFExtractionError(Exception):
+    """Raised when a PDF cannot be extracted within the configured limits"""
+
+def _extract_page_range(filepath: str, start: int, stop: int) -> List[str]:
+    """Extract pages [start, stop) of a PDF (runs inside a worker process)"""
+    with open(filepath, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [pdf_reader.pages[page_num].extract_text() or '' for page_num in range(start, stop)]
+
+class PDFExtractor:
+    """
+    PDF text extraction engine.
+
+    Small documents are read serially in-process. Documents with more than
+    ``parallel_threshold`` pages are split into page ranges and fanned out
+    across a process pool, since PyPDF2's text extraction is pure Python and
+    CPU bound. Page outputs are collected in a list and joined once, so the
+    cost is linear in document size. Every document is subject to a page cap
+    (extra pages are skipped) and a wall-clock deadline.
+
+    The pool is created on first use and kept for the life of the process
+    (``shutdown`` stops it). Its workers are started by a fork server (or
+    spawned), never forked from this process: the app runs request and
+    extraction threads, and a fork can copy a lock another thread holds.
+    Each worker re-reads the PDF for its range, so documents get two ranges
+    per worker, not more.
+    """
+
+    def __init__(self, parallel_threshold: Optional[int] = None, max_pages: Optional[int] = None,
+                 timeout: Optional[float] = None, max_workers: Optional[int] = None):
+        self.parallel_threshold = parallel_threshold or int(os.getenv('PDF_PARALLEL_THRESHOLD', 100))
+        self.max_pages = max_pages or int(os.getenv('PDF_MAX_PAGES', 1000))
+        self.timeout = timeout or float(os.getenv('PDF_EXTRACTION_TIMEOUT', 60))
+        self.max_workers = max_workers or int(os.getenv('PDF_MAX_WORKERS', 0)) or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def page_count(self, filepath: str) -> int:
+        """Return the number of pages in a PDF"""
+        with open(filepath, 'rb') as file:
+            return len(PyPDF2.PdfReader(file).pages)
+
+    def extract(self, filepath: str) -> str:
+        """
+        Extract text from a PDF within the configured limits
+
+        Args:
+            filepath: Path to the PDF
+
+        Returns:
+            Extracted text with pages separated by newlines
+
+        Raises:
+            PDFExtractionError: If extraction exceeds the time limit
+        """
+        deadline = time.monotonic() + self.timeout
+
+        with open(filepath, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            total_pages = len(pdf_reader.pages)
+            page_limit = min(total_pages, self.max_pages)
+            if total_pages > self.max_pages:
+                logger.warning(f"{filepath} has {total_pages} pages; extracting the first {self.max_pages}")
+
+            if page_limit <= self.parallel_threshold or self.max_workers < 2:
+                pages = self._extract_serial(pdf_reader, page_limit, deadline)
+            else:
+                pages = None
+
+        if pages is None:
+            pages = self._extract_parallel(filepath, page_limit, deadline)
+
+        return "\n".join(pages).strip()
+
+    def _extract_serial(self, pdf_reader: PyPDF2.PdfReader, page_limit: int, deadline: float) -> List[str]:
+        pages = []
+        for page_num in range(page_limit):
+            if time.monotonic() > deadline:
+                raise PDFExtractionError(
+                    f"PDF extraction timed out after {self.timeout:g}s ({page_num}/{page_limit} pages)")
+            pages.append(pdf_reader.pages[page_num].extract_text() or '')
+        return pages
+
+    def _page_ranges(self, page_limit: int) -> List[Tuple[int, int]]:
+        # Two ranges per worker: enough that one slow range doesn't dominate, few enough
+        # that re-reading the document per range stays small next to the pages themselves
+        step = max(1, -(-page_limit // (self.max_workers * 2)))
+        return [(start, min(start + step, page_limit)) for start in range(0, page_limit, step)]
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context(method))
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        """Drop a broken pool so the next document starts a fresh one"""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _extract_parallel(self, filepath: str, page_limit: int, deadline: float) -> List[str]:
+        ranges = self._page_ranges(page_limit)
+        logger.info(f"Extracting {page_limit} pages of {filepath} in {len(ranges)} ranges "
+                    f"across {self.max_workers} processes")
+
+        pool = self._get_pool()
+        futures = []
+        try:
+            futures = [pool.submit(_extract_page_range, filepath, start, stop) for start, stop in ranges]
+            done, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()),
+                                  return_when=FIRST_EXCEPTION)
+            if not_done:
+                for future in done:
+                    future.result()  # surface a worker error before reporting a timeout
+                raise PDFExtractionError(f"PDF extraction timed out after {self.timeout:g}s "
+                                         f"({len(done)}/{len(futures)} page ranges finished)")
+
+            pages: List[str] = []
+            for future in futures:
+                pages.extend(future.result())
+            return pages
+        except BrokenProcessPool:
+            self._discard_pool(pool)
+            raise
+        finally:
+            # Ranges not started yet are dropped; running ones finish and are discarded
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pool (a later parallel extraction starts a new one)"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+# Global PDF extractor instance
+pdf_extractor = PDFExtractor()
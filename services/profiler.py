@@ -0,0 +1,356 @@
+import os
+import sys
+import hmac
+import json
+import time
+import uuid
+import logging
+import threading
+import functools
+import contextvars
+from urllib.parse import urlencode
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Header or query parameter carrying PROFILER_TOKEN to profile a request (or view reports)
+PROFILE_HEADER = 'X-Profile'
+PROFILE_PARAM = 'profile'
+
+_current_session: contextvars.ContextVar[Optional['ProfileSession']] = \
+    contextvars.ContextVar('profile_session', default=None)
+
+class ProfileSession:
+    """Stack samples for one profiled request and the background work it handed off"""
+
+    def __init__(self, profiler: 'Profiler', label: str, **meta):
+        self.profiler = profiler
+        self.id = f"{datetime.utcnow():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+        self.label = label
+        self.meta = meta
+        self.started_at = datetime.utcnow()
+        self._start = time.perf_counter()
+        self.duration = None
+        self.counts: Counter = Counter()  # collapsed stack -> samples
+        self.samples = 0
+        self.threads: Dict[int, str] = {}  # thread id -> role shown at the stack root
+        self._open = 1  # the request itself, plus followed background tasks
+        self.truncated = False
+        self._lock = threading.Lock()
+
+    def attach(self, role: str):
+        with self._lock:
+            self.threads[threading.get_ident()] = role
+
+    def detach(self):
+        with self._lock:
+            self.threads.pop(threading.get_ident(), None)
+
+    def hold(self):
+        with self._lock:
+            self._open += 1
+
+    def release(self):
+        """Close one piece of work; the report is written once the request and everything it followed are done"""
+        with self._lock:
+            self._open -= 1
+            done = self._open == 0 and self.duration is None
+            if done:
+                self.duration = time.perf_counter() - self._start
+        if done:
+            self.profiler._finish(self)
+
+    def expire(self):
+        """Write the report now, without waiting for followed work (that may never run)"""
+        with self._lock:
+            if self.duration is not None:
+                return
+            self.duration = time.perf_counter() - self._start
+            self.truncated = True
+            self.threads.clear()
+        self.profiler._finish(self)
+
+class Profiler:
+    """
+    On-demand sampling profiler for single requests.
+
+    A request carrying PROFILER_TOKEN in the ``X-Profile`` header (or the
+    ``profile`` query parameter) is sampled every ``PROFILER_INTERVAL_MS``
+    by a background thread reading ``sys._current_frames()``; the profiled
+    code runs unmodified. Background work the request hands to
+    ``follow``-wrapped callables (text extraction) is sampled too, and the
+    report is written once it finishes. Reports hold collapsed stacks
+    (flamegraph.pl / speedscope format) and are kept in ``PROFILE_DIR``,
+    newest ``PROFILE_KEEP`` only. A session still open after
+    ``PROFILER_MAX_SECONDS`` is cut short and written as it is.
+
+    The app has no user roles, so the token stands in for admin access:
+    whoever holds it can profile requests and read the reports. Without
+    PROFILER_TOKEN no request hooks are installed at all, and requests
+    without the token only pay for one header lookup.
+    """
+
+    def __init__(self, token: Optional[str] = None, directory: Optional[str] = None,
+                 interval_ms: Optional[float] = None, keep: Optional[int] = None):
+        self.token = token if token is not None else os.getenv('PROFILER_TOKEN', '')
+        self.directory = directory or os.getenv('PROFILE_DIR', os.path.join('instance', 'profiles'))
+        self.interval = (float(os.getenv('PROFILER_INTERVAL_MS', 5)) if interval_ms is None else interval_ms) / 1000
+        self.keep = keep or int(os.getenv('PROFILE_KEEP', 50))
+        self.max_seconds = float(os.getenv('PROFILER_MAX_SECONDS', 300))
+        self._exempt: Set[str] = set()  # endpoints never profiled (the report pages themselves)
+        self._sessions: List[ProfileSession] = []
+        self._labels: Dict[Any, str] = {}  # code object -> frame label
+        self._sampler: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token)
+
+    def authorized(self, request) -> bool:
+        """True if the request carries the profiler token"""
+        supplied = request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_PARAM)
+        # Compared as bytes: compare_digest rejects non-ASCII str
+        return self.enabled and bool(supplied) and hmac.compare_digest(supplied.encode(), self.token.encode())
+
+    def exempt(self, view: Callable) -> Callable:
+        """Decorator for views that shouldn't be profiled even when they carry the token"""
+        self._exempt.add(view.__name__)
+        return view
+
+    def start(self, label: str, **meta) -> ProfileSession:
+        """
+        Begin sampling the calling thread
+
+        Args:
+            label: Report title, e.g. 'GET /analytics/overview'
+            **meta: Stored with the report
+
+        Returns:
+            The session; call ``release`` on it when the profiled work ends
+        """
+        session = ProfileSession(self, label, **meta)
+        session.attach('request')
+        _current_session.set(session)
+        with self._lock:
+            self._sessions.append(session)
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample, name='profiler', daemon=True)
+                self._sampler.start()
+        return session
+
+    def stop(self, session: ProfileSession):
+        """End the request part of a session (background work it followed may continue)"""
+        session.detach()
+        _current_session.set(None)
+        session.release()
+
+    def follow(self, fn: Callable) -> Callable:
+        """
+        Sample ``fn`` as part of the current profiled request, on whichever thread it runs
+
+        Returns ``fn`` unchanged when the current request isn't being profiled.
+        """
+        session = _current_session.get()
+        if session is None:
+            return fn
+        session.hold()
+        role = getattr(fn, '__name__', 'background')
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            session.attach(role)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                session.detach()
+                session.release()
+        return wrapper
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            module = os.path.splitext(os.path.basename(code.co_filename))[0]
+            name = getattr(code, 'co_qualname', code.co_name)  # co_qualname is Python 3.11+
+            label = self._labels[code] = f"{module}.{name}:{code.co_firstlineno}".replace(';', ':')
+        return label
+
+    def _sample(self):
+        try:
+            self._sample_sessions()
+        except Exception as e:
+            logger.error(f"Profiler sampler stopped: {e}")
+            # Let the next profiled request start a new sampler
+            with self._lock:
+                self._sampler = None
+
+    def _sample_sessions(self):
+        while True:
+            with self._lock:
+                sessions = list(self._sessions)
+                if not sessions:
+                    self._sampler = None
+                    return
+            for session in sessions:
+                if time.perf_counter() - session._start > self.max_seconds:
+                    session.expire()
+            frames = sys._current_frames()
+            for session in sessions:
+                with session._lock:
+                    threads = list(session.threads.items())
+                for thread_id, role in threads:
+                    frame = frames.get(thread_id)
+                    stack = []
+                    while frame is not None:
+                        stack.append(self._label(frame.f_code))
+                        frame = frame.f_back
+                    if stack:
+                        stack.append(role)
+                        session.counts[';'.join(reversed(stack))] += 1
+                        session.samples += 1
+            del frames
+            time.sleep(self.interval)
+
+    def _finish(self, session: ProfileSession):
+        with self._lock:
+            if session in self._sessions:
+                self._sessions.remove(session)
+        report = {
+            'id': session.id,
+            'label': session.label,
+            'started_at': session.started_at.isoformat(),
+            'duration_ms': round(session.duration * 1000, 1),
+            'interval_ms': self.interval * 1000,
+            'samples': session.samples,
+            'truncated': session.truncated,
+            'stacks': dict(session.counts.most_common()),
+        }
+        report.update(session.meta)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, f'{session.id}.json'), 'w', encoding='utf-8') as file:
+                json.dump(report, file)
+            self._prune()
+            logger.info(f"Profile {session.id} written: {session.label}, {session.samples} samples")
+        except OSError as e:
+            logger.error(f"Failed to write profile {session.id}: {e}")
+
+    def _prune(self):
+        names = sorted(name for name in os.listdir(self.directory) if name.endswith('.json'))
+        for name in names[:-self.keep]:
+            os.remove(os.path.join(self.directory, name))
+
+    def _path(self, profile_id: str) -> Optional[str]:
+        path = os.path.join(self.directory, f'{profile_id}.json')
+        # ids are generated here; anything else can't name a report
+        return path if os.path.basename(profile_id) == profile_id and os.path.exists(path) else None
+
+    def reports(self) -> List[Dict[str, Any]]:
+        """Stored reports without their stacks, newest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        reports = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            if name.endswith('.json'):
+                report = self.report(name[:-len('.json')])
+                if report:
+                    report.pop('stacks')
+                    reports.append(report)
+        return reports
+
+    def report(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        path = self._path(profile_id)
+        if path is None:
+            return None
+        try:
+            with open(path, encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to read profile {profile_id}: {e}")
+            return None
+
+    @staticmethod
+    def collapsed(report: Dict[str, Any]) -> str:
+        """Report stacks as 'frame;frame;frame count' lines for flamegraph.pl or speedscope"""
+        return ''.join(f'{stack} {count}\n' for stack, count in report['stacks'].items())
+
+    @staticmethod
+    def flamegraph(report: Dict[str, Any], min_share: float = 0.005) -> Dict[str, Any]:
+        """
+        Merge a report's stacks into a call tree for rendering
+
+        Args:
+            report: A stored report
+            min_share: Children below this share of all samples are folded into their parent
+
+        Returns:
+            {'name', 'count', 'share', 'children': [...]} with children largest first
+        """
+        root = {'name': report['label'], 'count': 0, 'children': {}}
+        for stack, count in report['stacks'].items():
+            root['count'] += count
+            node = root
+            for frame in stack.split(';'):
+                node = node['children'].setdefault(frame, {'name': frame, 'count': 0, 'children': {}})
+                node['count'] += count
+        total = root['count'] or 1
+
+        def finish(node):
+            children = [child for child in node['children'].values() if child['count'] / total >= min_share]
+            node['children'] = [finish(child) for child in sorted(children, key=lambda child: -child['count'])]
+            node['share'] = node['count'] / total
+            return node
+        return finish(root)
+
+    @staticmethod
+    def hottest(report: Dict[str, Any], limit: int = 20) -> List[Dict[str, Any]]:
+        """Functions with the most samples at the top of the stack (self time), then including callees"""
+        own, total = Counter(), Counter()
+        for stack, count in report['stacks'].items():
+            frames = stack.split(';')[1:]  # drop the thread role
+            if frames:
+                own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        samples = report['samples'] or 1
+        return [{'function': frame, 'self': count, 'total': total[frame], 'self_share': count / samples,
+                 'total_share': total[frame] / samples} for frame, count in own.most_common(limit)]
+
+    def init_app(self, app):
+        """Profile requests that carry the token; installs nothing unless PROFILER_TOKEN is set"""
+        from flask import g, request
+
+        app.extensions['profiler'] = self
+        if not self.enabled:
+            return
+
+        @app.before_request
+        def start_profile():
+            if PROFILE_HEADER in request.headers or PROFILE_PARAM in request.args:
+                if request.endpoint not in self._exempt and self.authorized(request):
+                    rule = request.url_rule.rule if request.url_rule else request.path
+                    # The token must not end up in reports, which the profile pages display
+                    query = urlencode([(key, value) for key, value in request.args.items(multi=True)
+                                       if key != PROFILE_PARAM])
+                    path = f'{request.path}?{query}' if query else request.path
+                    g.profile_session = self.start(f'{request.method} {rule}', path=path, endpoint=request.endpoint)
+
+        @app.after_request
+        def record_profile(response):
+            session = g.get('profile_session')
+            if session is not None:
+                session.meta['status_code'] = response.status_code
+                response.headers['X-Profile-Id'] = session.id
+            return response
+
+        @app.teardown_request
+        def stop_profile(error=None):
+            session = g.pop('profile_session', None)
+            if session is not None:
+                self.stop(session)
+
+# Global profiler instance
+profiler = Profiler()
@@ -0,0 +1,103 @@
+from collections import namedtuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy import Table, select
+from sqlalchemy.sql import Select
+
+from models import db, Job
+
+# A field is a column name, or (column name, default, formatter): the formatter
+# is applied to non-null values, and without one the default replaces falsy ones
+FieldSpec = Union[str, Tuple[str, Any], Tuple[str, Any, Optional[Callable[[Any], Any]]]]
+
+def us_date(value) -> str:
+    return value.strftime('%m/%d/%Y')
+
+class ReadModel:
+    """
+    Read-only projection of a table for list pages and JSON endpoints.
+
+    ``select()`` is a plain Core SELECT of just the listed columns, so rows
+    skip ORM entity loading, the identity map and attribute
+    instrumentation; ``all()`` returns them as namedtuples (tuple-backed,
+    no per-row ``__dict__``) that templates read like model instances.
+    ``serialize`` is generated once per model as straight-line code, one
+    dict literal per row, instead of looping over fields.
+
+    Records are snapshots: they aren't tracked by the session and can't be
+    modified or lazy-load relationships. Use the model for anything else.
+    """
+
+    def __init__(self, name: str, table: Table, fields: Iterable[FieldSpec]):
+        specs = [(field, None, None) if isinstance(field, str) else tuple(field) + (None,) * (3 - len(field))
+                 for field in fields]
+        self.name = name
+        self.table = table
+        self.fields = [spec[0] for spec in specs]
+        self.columns = [table.c[field] for field in self.fields]
+        self.record = namedtuple(name, self.fields)
+        self.serialize = self._compile(specs)
+
+    @property
+    def c(self):
+        """The table's columns, for building filters and ordering that stay in Core"""
+        return self.table.c
+
+    def _compile(self, specs) -> Callable[[tuple], Dict[str, Any]]:
+        namespace: Dict[str, Any] = {}
+        items = []
+        for position, (field, default, formatter) in enumerate(specs):
+            value = f'r[{position}]'
+            if formatter is not None:
+                namespace[f'f{position}'] = formatter
+                namespace[f'd{position}'] = default
+                expression = f'f{position}({value}) if {value} is not None else d{position}'
+            elif default is not None:
+                namespace[f'd{position}'] = default
+                expression = f'{value} or d{position}'
+            else:
+                expression = value
+            items.append(f'{field!r}: {expression}')
+        source = f"def serialize(r):\n    return {{{', '.join(items)}}}\n"
+        exec(compile(source, f'<{self.name} serializer>', 'exec'), namespace)
+        return namespace['serialize']
+
+    def select(self) -> Select:
+        """SELECT of this model's columns; add where/order_by with ``self.c``"""
+        return select(*self.columns)
+
+    def all(self, statement: Optional[Select] = None) -> List[tuple]:
+        """
+        Run a projection query
+
+        Args:
+            statement: A ``select()`` of this model with filters applied (default: every row)
+
+        Returns:
+            List of records, in the statement's order
+        """
+        result = db.session.execute(statement if statement is not None else self.select())
+        return list(map(self.record._make, result.tuples()))
+
+    def serialize_all(self, records: Iterable[tuple]) -> List[Dict[str, Any]]:
+        serialize = self.serialize
+        return [serialize(record) for record in records]
+
+# Fields the Kanban board renders for each card
+JOB_CARD = ReadModel('JobCard', Job.__table__, (
+    'id', 'title', 'company', 'location', 'status', 'date_added', 'date_applied', 'salary_range', 'version',
+))
+
+# /api/search/jobs results, formatted as the dashboard's search expects
+JOB_SEARCH_RESULT = ReadModel('JobSearchResult', Job.__table__, (
+    'id',
+    ('title', 'Untitled Job'),
+    ('company', 'Unknown Company'),
+    ('location', ''),
+    'status',
+    ('date_added', None, us_date),
+    ('date_applied', None, us_date),
+    'url',
+    ('salary_range', ''),
+    ('description', ''),
+))
@@ -0,0 +1,355 @@
+import math
+import os
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import or_, select, update
+
+from models import db, Job, SavedSearch, SearchRun
+from services.job_scraper import job_scraper, JobScraper
+from services.tracing import tracer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Extra look-back when narrowing a search to the time since its watermark;
+# JobSpy dates postings by day, so anything newer may still be on the watermark's day
+WATERMARK_SLACK_HOURS = 24
+
+class SearchScheduler:
+    """
+    Runs saved JobSpy searches on their own cadence and files new postings as Jobs.
+
+    A poller thread wakes every ``SEARCH_SCHEDULER_POLL`` seconds, claims the
+    searches whose ``next_run_at`` has passed and hands them to a pool of
+    ``SEARCH_SCHEDULER_WORKERS`` threads. No more searches are claimed than
+    there are idle workers, so a slow job board backs the queue up in the
+    database rather than in memory.
+
+    Every run, scheduled or "Run now", first claims its search with an
+    atomic UPDATE that sets ``running_since`` only if it is empty, and
+    clears it when the run ends, so several app processes never run one
+    search at once. A claim older than ``SEARCH_CLAIM_TIMEOUT`` seconds
+    (default 3600) is taken to belong to a process that died mid-run.
+
+    Each search keeps a watermark: the start of its last successful run.
+    Postings dated before it are skipped and the JobSpy query itself is
+    narrowed to the hours since it, so a daily search fetches a day of
+    postings rather than ``JOBSPY_HOURS_OLD``. Postings whose URL is already
+    tracked are skipped with one IN query per site, and new Jobs are inserted
+    ``SEARCH_INSERT_BATCH`` at a time. Every run is recorded as a SearchRun.
+    """
+
+    def __init__(self, scraper: Optional[JobScraper] = None, poll_interval: Optional[float] = None,
+                 max_workers: Optional[int] = None, batch_size: Optional[int] = None):
+        self.scraper = scraper or job_scraper
+        self.poll_interval = poll_interval or float(os.getenv('SEARCH_SCHEDULER_POLL', 60))
+        self.max_workers = max_workers or int(os.getenv('SEARCH_SCHEDULER_WORKERS', 2))
+        self.batch_size = batch_size or int(os.getenv('SEARCH_INSERT_BATCH', 100))
+        self.claim_timeout = timedelta(seconds=float(os.getenv('SEARCH_CLAIM_TIMEOUT', 3600)))
+        self.app = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._running: Set[int] = set()
+        self._lock = threading.Lock()
+        self._lock_file = None  # held while this process is the one polling (see start)
+
+    def init_app(self, app):
+        """Bind the scheduler to a Flask app so workers can use its database session"""
+        self.app = app
+        app.extensions['search_scheduler'] = self
+
+    def start(self, lock_path: Optional[str] = None) -> bool:
+        """
+        Start the poller thread (no-op if running, or if SEARCH_SCHEDULER_ENABLED is false)
+
+        Args:
+            lock_path: File locked for as long as this process polls, so that of
+                several server processes sharing it only one polls; the others
+                skip starting. Claims are atomic in the database either way,
+                this only saves the redundant polling.
+
+        Returns:
+            True if this process is polling
+        """
+        if self.app is None:
+            raise RuntimeError("SearchScheduler.init_app() has not been called")
+        if os.getenv('SEARCH_SCHEDULER_ENABLED', 'true').lower() in ('0', 'false', 'no'):
+            logger.info("Search scheduler disabled by SEARCH_SCHEDULER_ENABLED")
+            return False
+        with self._lock:
+            if self._thread is not None:
+                return True
+            if lock_path is not None and not self._acquire(lock_path):
+                logger.info(f"Search scheduler already polling in another process ({lock_path})")
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._poll, name='search-scheduler', daemon=True)
+            self._thread.start()
+        logger.info(f"Search scheduler polling every {self.poll_interval:g}s with {self.max_workers} workers")
+        return True
+
+    def _acquire(self, lock_path: str) -> bool:
+        import fcntl
+
+        os.makedirs(os.path.dirname(lock_path) or '.', exist_ok=True)
+        lock_file = open(lock_path, 'a')
+        try:
+            # Released by the kernel if this process dies, so a replacement process can take over
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _poll(self):
+        while True:
+            try:
+                self.run_due()
+            except Exception as e:
+                logger.error(f"Search scheduler poll failed: {e}")
+            if self._stop.wait(self.poll_interval):
+                return
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='saved-search')
+            return self._pool
+
+    def _submit(self, search_id: int, claimed_at: datetime) -> Future:
+        def run():
+            try:
+                with tracer.span('search.run', root=True, search_id=search_id):
+                    return self.run(search_id)
+            finally:
+                self.release(search_id, claimed_at)
+                with self._lock:
+                    self._running.discard(search_id)
+        return self._executor().submit(tracer.wrap(run))
+
+    def run_due(self) -> List[Future]:
+        """
+        Claim due searches for the idle workers and queue them
+
+        Returns:
+            Futures resolving to each claimed search's run metrics
+        """
+        with self._lock:
+            idle = self.max_workers - len(self._running)
+        if idle <= 0:
+            return []
+
+        futures = []
+        with self.app.app_context():
+            now = datetime.utcnow()
+            due = db.session.execute(
+                select(SavedSearch.id, SavedSearch.interval_minutes)
+                .where(SavedSearch.enabled.is_(True), SavedSearch.next_run_at <= now)
+                .order_by(SavedSearch.next_run_at)
+                .limit(idle)
+            ).all()
+            for search_id, interval in due:
+                # Another process may have claimed it, or started it with "Run now", since the SELECT
+                if self.claim(search_id, SavedSearch.next_run_at <= now,
+                              next_run_at=now + timedelta(minutes=interval), now=now):
+                    futures.append(self._queue(search_id, now))
+        return futures
+
+    def run_now(self, search_id: int) -> Optional[Future]:
+        """Queue a search immediately, off schedule; None if it is already running"""
+        with self.app.app_context():
+            now = datetime.utcnow()
+            if not self.claim(search_id, now=now):
+                return None
+        return self._queue(search_id, now)
+
+    def claim(self, search_id: int, *conditions, now: Optional[datetime] = None, **values) -> bool:
+        """
+        Mark a search as running in the database, unless a run already holds it
+
+        Call inside an app context. The claim is released when the run ends;
+        a caller that claims a search without running it (to delete it, say)
+        keeps it claimed.
+
+        Args:
+            search_id: SavedSearch id
+            *conditions: Further conditions the row must meet
+            now: Claim time, recorded in ``running_since``
+            **values: Other columns to set along with the claim
+
+        Returns:
+            True if this call claimed the search
+        """
+        now = now or datetime.utcnow()
+        claimed = db.session.execute(
+            update(SavedSearch)
+            .where(SavedSearch.id == search_id, self._unclaimed(now), *conditions)
+            .values(running_since=now, **values)
+        ).rowcount
+        db.session.commit()
+        return bool(claimed)
+
+    def release(self, search_id: int, claimed_at: datetime):
+        """Clear a run's claim (left alone if it expired and another process has claimed the search since)"""
+        with self.app.app_context():
+            db.session.execute(
+                update(SavedSearch)
+                .where(SavedSearch.id == search_id, SavedSearch.running_since == claimed_at)
+                .values(running_since=None)
+            )
+            db.session.commit()
+
+    def _unclaimed(self, now: datetime):
+        return or_(SavedSearch.running_since.is_(None), SavedSearch.running_since < now - self.claim_timeout)
+
+    def _queue(self, search_id: int, claimed_at: datetime) -> Future:
+        # The database claim is what keeps runs exclusive; this set only counts busy workers
+        with self._lock:
+            self._running.add(search_id)
+        return self._submit(search_id, claimed_at)
+
+    def is_running(self, search: SavedSearch) -> bool:
+        """True if a process (this one or another) holds the search's claim"""
+        return search.running_since is not None and search.running_since >= datetime.utcnow() - self.claim_timeout
+
+    def run(self, search_id: int) -> Dict[str, Any]:
+        """
+        Run one saved search and ingest the postings newer than its watermark
+
+        Args:
+            search_id: SavedSearch id
+
+        Returns:
+            The run's metrics: status, duration, fetched, new, duplicates, stale and error
+        """
+        with self.app.app_context():
+            search = db.session.get(SavedSearch, search_id)
+            if search is None:
+                return {'status': 'failed', 'error': f'Saved search {search_id} not found'}
+
+            started_at = datetime.utcnow()
+            run = SearchRun(saved_search_id=search.id, started_at=started_at)
+            db.session.add(run)
+            db.session.commit()
+
+            started = time.perf_counter()
+            errors = []
+            try:
+                errors = self._ingest(search, run, started_at)
+                sites = len(search.site_list)
+                run.status = 'failed' if len(errors) == sites else 'partial' if errors else 'success'
+                run.error = '; '.join(errors) or None
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Saved search {search_id} failed: {e}")
+                run.status, run.error = 'failed', str(e)
+
+            run.duration = round(time.perf_counter() - started, 3)
+            search.last_run_at = started_at
+            # Sites that failed may have had postings from before this run, so only a clean run moves the watermark
+            if run.status == 'success':
+                search.watermark = started_at
+            db.session.commit()
+
+            logger.info(f"Saved search '{search.name}' {run.status} in {run.duration:.1f}s: "
+                        f"{run.fetched} fetched, {run.new} new, {run.duplicates} duplicates, {run.stale} stale")
+            return {'status': run.status, 'duration': run.duration, 'fetched': run.fetched, 'new': run.new,
+                    'duplicates': run.duplicates, 'stale': run.stale, 'error': run.error}
+
+    def _ingest(self, search: SavedSearch, run: SearchRun, now: datetime) -> List[str]:
+        """Fetch every site of a search, inserting new postings in batches; returns per-site errors"""
+        watermark_day = search.watermark.date().isoformat() if search.watermark else ''
+        batch, errors = [], []
+        results = self.scraper.search_sites(
+            search.site_list, search.search_term, search.location or '', search.results_wanted,
+            self.hours_old(search, now), search.country, fresh=True
+        )
+        for result in results:
+            if result['error']:
+                errors.append(result['error'])
+                continue
+            run.fetched += len(result['jobs']) + result['duplicates']
+            run.duplicates += result['duplicates']
+
+            jobs = []
+            for job in result['jobs']:
+                # JobSpy dates are days ('YYYY-MM-DD'); undated postings fall through to the URL check
+                if watermark_day and job['date_posted'] and str(job['date_posted'])[:10] < watermark_day:
+                    run.stale += 1
+                else:
+                    jobs.append(job)
+
+            tracked = self._tracked_urls((job['url'] for job in jobs), search.user_id)
+            for job in jobs:
+                if job['url'] in tracked:
+                    run.duplicates += 1
+                    continue
+                tracked.add(job['url'])
+                batch.append(self._job_from_posting(job, search.user_id, now))
+                if len(batch) >= self.batch_size:
+                    run.new += self._insert(batch)
+                    batch = []
+        if batch:
+            run.new += self._insert(batch)
+        return errors
+
+    def hours_old(self, search: SavedSearch, now: datetime) -> Optional[int]:
+        """The search's age limit, narrowed to the time since its watermark"""
+        hours_old = self.scraper.jobspy_hours_old if search.hours_old is None else search.hours_old
+        if search.watermark is None:
+            return hours_old
+        since = math.ceil((now - search.watermark).total_seconds() / 3600) + WATERMARK_SLACK_HOURS
+        return min(hours_old, since) if hours_old else since
+
+    @staticmethod
+    def _tracked_urls(urls, user_id: int) -> Set[str]:
+        urls = {url for url in urls if url}
+        if not urls:
+            return set()
+        return set(db.session.scalars(select(Job.url).where(Job.user_id == user_id, Job.url.in_(urls))))
+
+    @staticmethod
+    def _job_from_posting(job: Dict[str, Any], user_id: int, now: datetime) -> Job:
+        salary = job.get('salary')
+        return Job(
+            user_id=user_id,
+            url=job['url'],
+            title=job.get('title', ''),
+            company=job.get('company', ''),
+            description=job.get('description', ''),
+            location=job.get('location', ''),
+            salary_range=f"{salary:,.0f}" if isinstance(salary, (int, float)) else str(salary or ''),
+            job_type=job.get('job_type', ''),
+            status='saved',
+            date_added=now
+        )
+
+    def _insert(self, batch: List[Job]) -> int:
+        """One transaction per batch; duplicate detection still indexes each Job as it is flushed"""
+        db.session.add_all(batch)
+        db.session.commit()
+        return len(batch)
+
+    def shutdown(self, wait: bool = True):
+        """Stop polling and the worker pool"""
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+            pool, self._pool = self._pool, None
+            lock_file, self._lock_file = self._lock_file, None
+        if thread is not None:
+            thread.join(self.poll_interval if wait else 0)
+        if pool is not None:
+            pool.shutdown(wait=wait)
+        if lock_file is not None:
+            lock_file.close()
+
+# Global search scheduler instance
+search_scheduler = SearchScheduler()
@@ -0,0 +1,380 @@
+import os
+import json
+import time
+import random
+import logging
+import threading
+import contextvars
+import functools
+import inspect
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Longest SQL statement kept on a db.query span
+MAX_STATEMENT_LENGTH = 500
+
+# Unfinished traces held at once, and how long one is held for its root span, before it is dropped
+MAX_PENDING_TRACES = 1000
+PENDING_TRACE_SECONDS = 600
+
+_current_span: contextvars.ContextVar[Optional['Span']] = contextvars.ContextVar('current_span', default=None)
+
+class Span:
+    """One timed stage of a trace"""
+
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'attributes', 'start_ns', 'end_ns',
+                 '_start', 'duration', 'error', 'thread', 'token')
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace_id = trace_id
+        self.span_id = f'{random.getrandbits(64):016x}'
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter()
+        self.end_ns = None
+        self.duration = None
+        self.error = None
+        self.thread = threading.current_thread().name
+        self.token = None  # context variable token of a span opened with Tracer.start
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def finish(self):
+        self.duration = time.perf_counter() - self._start
+        self.end_ns = self.start_ns + int(self.duration * 1e9)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """OTLP-style span record (one line of the trace file)"""
+        return {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_id or '',
+            'name': self.name,
+            'startTimeUnixNano': self.start_ns,
+            'endTimeUnixNano': self.end_ns,
+            'durationMs': round(self.duration * 1000, 3),
+            'thread': self.thread,
+            'attributes': self.attributes,
+            'status': {'code': 'ERROR', 'message': self.error} if self.error else {'code': 'OK'},
+        }
+
+class Tracer:
+    """
+    Minimal request tracer writing OTLP-shaped spans to a JSON-lines file.
+
+    Spans nest through a context variable, so work in the same thread or
+    asyncio task picks up its parent automatically; ``wrap`` and ``bind``
+    carry the current span into thread pools and onto other event loops.
+
+    Tracing is off unless ``TRACE_FILE`` is set. A trace's spans are held
+    until its root span ends, then written together if the root took at
+    least ``TRACE_SLOW_MS`` (default 0, everything) and the trace was
+    sampled (``TRACE_SAMPLE_RATE``, default 1.0). Spans from background
+    work that outlives its request follow the decision made for the trace.
+    A trace whose root never ends (or whose late spans arrive after its
+    decision has been forgotten) is dropped after ``PENDING_TRACE_SECONDS``,
+    or sooner if more than ``MAX_PENDING_TRACES`` are waiting.
+    """
+
+    def __init__(self, path: Optional[str] = None, sample_rate: Optional[float] = None,
+                 slow_ms: Optional[float] = None):
+        self.path = path if path is not None else os.getenv('TRACE_FILE', '')
+        self.sample_rate = float(os.getenv('TRACE_SAMPLE_RATE', 1.0)) if sample_rate is None else sample_rate
+        self.slow_ms = float(os.getenv('TRACE_SLOW_MS', 0)) if slow_ms is None else slow_ms
+        self._pending: 'OrderedDict[str, List[Span]]' = OrderedDict()  # trace id -> spans, oldest trace first
+        self._decided: 'OrderedDict[str, bool]' = OrderedDict()  # trace id -> kept, for late spans
+        self._file = None
+        self._lock = threading.Lock()
+        self.written = self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def current(self) -> Optional[Span]:
+        return _current_span.get()
+
+    @contextmanager
+    def span(self, name: str, root: bool = False, **attributes) -> Iterator[Optional[Span]]:
+        """
+        Time a block as a child of the current span
+
+        Args:
+            name: Stage name, e.g. 'ai.customize_cv'
+            root: Start a new trace if there is no current span (otherwise
+                spans outside a trace are skipped)
+            **attributes: Recorded on the span
+
+        Yields:
+            The span (None when not tracing), for adding attributes
+        """
+        parent = _current_span.get()
+        if not self.enabled or (parent is None and not root):
+            yield None
+            return
+        if parent is None:
+            if random.random() >= self.sample_rate:
+                yield None
+                return
+            span = Span(name, f'{random.getrandbits(128):032x}', None, attributes)
+        else:
+            span = Span(name, parent.trace_id, parent.span_id, attributes)
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            _current_span.reset(token)
+            self.finish(span)
+
+    def start(self, name: str, **attributes) -> Optional[Span]:
+        """Open a root span without a with-block (for request hooks); pair with ``end``"""
+        if not self.enabled or random.random() >= self.sample_rate:
+            return None
+        span = Span(name, f'{random.getrandbits(128):032x}', None, attributes)
+        span.token = _current_span.set(span)
+        return span
+
+    def end(self, span: Optional[Span], error: Optional[BaseException] = None):
+        if span is None:
+            return
+        if span.token is not None:
+            try:
+                _current_span.reset(span.token)
+            except ValueError:
+                _current_span.set(None)  # ended from a different context
+        if error is not None:
+            span.error = f'{type(error).__name__}: {error}'
+        self.finish(span)
+
+    def finish(self, span: Span):
+        span.finish()
+        with self._lock:
+            if span.trace_id in self._decided:
+                if self._decided[span.trace_id]:
+                    self._write([span])
+                return
+            spans = self._pending.setdefault(span.trace_id, [])
+            spans.append(span)
+            if span.parent_id is not None:
+                self._expire_pending()
+                return
+
+            del self._pending[span.trace_id]
+            keep = span.duration * 1000 >= self.slow_ms
+            self._decide(span.trace_id, keep)
+            if keep:
+                self._write(spans)
+            else:
+                self.dropped += 1
+
+    def _decide(self, trace_id: str, keep: bool):
+        self._decided[trace_id] = keep
+        while len(self._decided) > 10000:
+            self._decided.popitem(last=False)
+
+    def _expire_pending(self):
+        """Drop the oldest unfinished traces beyond the count or age limit (call with the lock held)"""
+        cutoff = time.perf_counter() - PENDING_TRACE_SECONDS
+        while self._pending:
+            trace_id, spans = next(iter(self._pending.items()))
+            if len(self._pending) <= MAX_PENDING_TRACES and spans[0]._start >= cutoff:
+                return
+            del self._pending[trace_id]
+            self._decide(trace_id, False)  # later spans of it are dropped on arrival
+            self.dropped += 1
+
+    def _write(self, spans: List[Span]):
+        try:
+            if self._file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(''.join(json.dumps(span.to_dict(), default=str) + '\n' for span in spans))
+            self._file.flush()
+            self.written += len(spans)
+        except OSError as e:
+            logger.error(f"Failed to write trace spans to {self.path}: {e}")
+
+    def traced(self, name: Optional[str] = None, **attributes) -> Callable:
+        """Decorator recording each call of a function (or coroutine function) as a span"""
+        def decorator(fn):
+            span_name = name or fn.__qualname__
+
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled or _current_span.get() is None:
+                        return await fn(*args, **kwargs)
+                    with self.span(span_name, **attributes):
+                        return await fn(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or _current_span.get() is None:
+                    return fn(*args, **kwargs)
+                with self.span(span_name, **attributes):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def wrap(self, fn: Callable) -> Callable:
+        """
+        Bind ``fn`` to the caller's context, for running it on another thread
+
+        Wrap once per submission: a copied context can't be entered by two
+        threads at the same time.
+        """
+        if _current_span.get() is None:
+            return fn
+        context = contextvars.copy_context()
+        return functools.partial(context.run, fn)
+
+    def bind(self, coroutine):
+        """Run a coroutine under the caller's current span, wherever its task is created"""
+        parent = _current_span.get()
+        if parent is None:
+            return coroutine
+
+        async def bound():
+            _current_span.set(parent)
+            return await coroutine
+        return bound()
+
+    def read(self, trace_id: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Traces from the trace file, slowest first
+
+        Args:
+            trace_id: Only this trace
+            limit: Most traces returned
+
+        Returns:
+            [{'trace_id', 'name', 'duration_ms', 'spans': [span dicts, parents first]}]
+        """
+        if not self.path or not os.path.exists(self.path):
+            return []
+        traces: Dict[str, List[Dict[str, Any]]] = {}
+        with open(self.path, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    span = json.loads(line)
+                except ValueError:
+                    continue
+                if trace_id is None or span['traceId'] == trace_id:
+                    traces.setdefault(span['traceId'], []).append(span)
+
+        result = []
+        for spans_id, spans in traces.items():
+            root = next((span for span in spans if not span['parentSpanId']), None)
+            if root is None:
+                continue
+            spans.sort(key=lambda span: span['startTimeUnixNano'])
+            result.append({'trace_id': spans_id, 'name': root['name'], 'duration_ms': root['durationMs'],
+                           'spans': spans})
+        result.sort(key=lambda trace: -trace['duration_ms'])
+        return result[:limit]
+
+    @staticmethod
+    def breakdown(trace: Dict[str, Any]) -> List[str]:
+        """Indented lines, one per span, with its duration and share of the root"""
+        children: Dict[str, List[Dict[str, Any]]] = {}
+        for span in trace['spans']:
+            children.setdefault(span['parentSpanId'], []).append(span)
+        total = trace['duration_ms'] or 1
+        lines = []
+
+        def walk(span, depth):
+            status = '' if span['status']['code'] == 'OK' else f"  !! {span['status'].get('message', '')}"
+            lines.append(f"{'  ' * depth}{span['name']:<{max(1, 48 - 2 * depth)}}{span['durationMs']:>10.1f} ms"
+                         f"{span['durationMs'] / total:>7.0%}{status}")
+            for child in children.get(span['spanId'], []):
+                walk(child, depth + 1)
+        for root in children.get('', []):
+            walk(root, 0)
+        return lines
+
+    def init_app(self, app):
+        """Trace every request, the templates it renders and every SQL statement run inside a trace"""
+        from flask import before_render_template, g, request, template_rendered
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        app.extensions['tracer'] = self
+        if not self.enabled:
+            return
+
+        @app.before_request
+        def start_request_span():
+            rule = request.url_rule.rule if request.url_rule else request.path
+            g.trace_span = self.start(f'{request.method} {rule}', path=request.path)
+
+        @app.after_request
+        def record_response(response):
+            span = g.get('trace_span')
+            if span is not None:
+                span.set(status_code=response.status_code)
+                response.headers['X-Trace-Id'] = span.trace_id
+            return response
+
+        @app.teardown_request
+        def end_request_span(error=None):
+            self.end(g.pop('trace_span', None), error)
+
+        def start_render_span(sender, template, context, **extra):
+            parent = _current_span.get()
+            if parent is not None:
+                span = Span('render', parent.trace_id, parent.span_id, {'template': template.name})
+                g.setdefault('trace_renders', []).append(span)
+
+        def end_render_span(sender, template, context, **extra):
+            renders = g.get('trace_renders')
+            if renders:
+                self.finish(renders.pop())
+
+        before_render_template.connect(start_render_span, app, weak=False)
+        template_rendered.connect(end_render_span, app, weak=False)
+
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            event.listen(Engine, 'handle_error', _handle_error)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    parent = _current_span.get()
+    if parent is None:
+        return
+    span = Span('db.query', parent.trace_id, parent.span_id,
+                {'db.statement': statement[:MAX_STATEMENT_LENGTH], 'db.executemany': executemany})
+    conn.info.setdefault('trace_spans', []).append(span)
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get('trace_spans')
+    if spans:
+        span = spans.pop()
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            span.set(**{'db.rowcount': cursor.rowcount})
+        tracer.finish(span)
+
+def _handle_error(context):
+    spans = context.connection.info.get('trace_spans') if context.connection is not None else None
+    if spans:
+        span = spans.pop()
+        span.error = f'{type(context.original_exception).__name__}: {context.original_exception}'
+        tracer.finish(span)
+
+# Global tracer instance
+tracer = Tracer()
+traced = tracer.traced
@@ -0,0 +1,52 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app.py reads its configuration at import time, so point it at a scratch database first
+_workdir = tempfile.mkdtemp(prefix='jobtracker-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_workdir, 'tests.db')}"
+os.environ['SEARCH_SCHEDULER_ENABLED'] = 'false'
+for name in ('ANTHROPIC_API_KEY', 'TRACE_FILE', 'PROFILER_TOKEN'):
+    os.environ.pop(name, None)
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """The Flask app on an empty database, with uploads kept under tmp_path"""
+    from app import app as flask_app
+    from models import db, upgrade_schema
+    from services.artifact_store import artifact_store
+    from services.cv_processor import cv_processor
+
+    uploads = str(tmp_path / 'uploads')
+    monkeypatch.setattr(cv_processor, 'upload_folder', uploads)
+    monkeypatch.setattr(cv_processor, 'blob_folder', os.path.join(uploads, 'blobs'))
+    monkeypatch.setattr(artifact_store, 'upload_folder', uploads)
+    monkeypatch.setattr(artifact_store, 'artifact_folder', os.path.join(uploads, 'artifacts'))
+    os.makedirs(uploads)
+
+    with flask_app.app_context():
+        db.drop_all()
+        upgrade_schema()
+        yield flask_app
+        db.session.remove()
+
+
+@pytest.fixture
+def make_job(app):
+    """Insert a Job for the default user (keyword arguments override the defaults)"""
+    from models import db, Job, DEFAULT_USER_ID
+
+    def make(**fields):
+        values = {'user_id': DEFAULT_USER_ID, 'url': 'https://example.com/jobs/1', 'title': 'Python Engineer',
+                  'company': 'Example Corp', 'description': 'Build APIs in Python.'}
+        values.update(fields)
+        job = Job(**values)
+        db.session.add(job)
+        db.session.commit()
+        return job
+    return make
@@ -0,0 +1,138 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import db, Application, GeneratedArtifact
+from services.artifact_store import artifact_store
+
+LONG_AGO = datetime.utcnow() - timedelta(days=60)
+
+
+def age(filepath: str, days: int = 60):
+    """Backdate a file's modification time"""
+    then = time.time() - days * 86400
+    os.utime(filepath, (then, then))
+
+
+def write(filepath: str, text: str = 'old cover letter') -> str:
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    with open(filepath, 'w') as file:
+        file.write(text)
+    return filepath
+
+
+def age_file(filepath: str) -> str:
+    write(filepath)
+    age(filepath)
+    return filepath
+
+
+@pytest.fixture
+def job(make_job):
+    return make_job()
+
+
+def stale(artifact_path: str):
+    """Mark the artifact stored at a path as unused for longer than the retention period"""
+    GeneratedArtifact.query.filter_by(filepath=artifact_path).update({GeneratedArtifact.last_used_at: LONG_AGO})
+    db.session.commit()
+    age(artifact_path)
+
+
+def test_identical_text_is_stored_once_and_linked(app, job):
+    first = artifact_store.save('Dear hiring manager', 'cover_letter', job.id)
+    second = artifact_store.save('Dear hiring manager', 'cover_letter', job.id)
+
+    assert first == second
+    assert GeneratedArtifact.query.count() == 1
+    assert Application.query.one().cover_letter_path == first
+
+
+def test_missing_file_is_rewritten_and_relinked(app, job):
+    filepath = artifact_store.save('Dear hiring manager', 'cover_letter', job.id)
+    artifact = GeneratedArtifact.query.one()
+    artifact.filepath = os.path.join(artifact_store.artifact_folder, 'moved.txt.gz')
+    db.session.commit()
+    os.remove(filepath)
+
+    assert artifact_store.save('Dear hiring manager', 'cover_letter', job.id) == filepath
+    assert os.path.exists(filepath)
+    db.session.expire_all()
+    assert GeneratedArtifact.query.one().filepath == filepath
+
+
+def test_sweep_removes_only_stale_unreferenced_artifacts(app, job):
+    superseded = artifact_store.save('First draft', 'custom_cv', job.id)
+    recent = artifact_store.save('Second draft', 'custom_cv', job.id)
+    linked = artifact_store.save('Final draft', 'custom_cv', job.id)
+    stale(superseded)
+    stale(linked)
+
+    stats = artifact_store.sweep()
+
+    assert stats['unreferenced'] == 1
+    assert not os.path.exists(superseded)
+    assert os.path.exists(recent) and os.path.exists(linked)
+    assert {artifact.filepath for artifact in GeneratedArtifact.query} == {recent, linked}
+
+
+def test_sweep_removes_old_orphan_and_legacy_files(app, job):
+    old_orphan = age_file(os.path.join(artifact_store.artifact_folder, '1', 'ab', 'ab12-custom_cv.txt.gz'))
+    new_orphan = write(os.path.join(artifact_store.artifact_folder, '1', 'cd', 'cd34-custom_cv.txt.gz'))
+    old_legacy = age_file(os.path.join(artifact_store.upload_folder, 'cover_letter_1_20240101.txt'))
+    linked_legacy = age_file(os.path.join(artifact_store.upload_folder, 'custom_cv_1_20240101.txt'))
+    new_legacy = write(os.path.join(artifact_store.upload_folder, 'custom_cv_1_20240601.txt'))
+    db.session.add(Application(job_id=job.id, user_id=job.user_id, custom_cv_path=linked_legacy))
+    db.session.commit()
+
+    stats = artifact_store.sweep()
+
+    assert (stats['orphan_files'], stats['legacy_files']) == (1, 1)
+    assert not os.path.exists(old_orphan) and not os.path.exists(old_legacy)
+    assert all(os.path.exists(path) for path in (new_orphan, linked_legacy, new_legacy))
+
+
+def test_dry_run_counts_without_removing(app, job):
+    superseded = artifact_store.save('First draft', 'custom_cv', job.id)
+    artifact_store.save('Final draft', 'custom_cv', job.id)
+    stale(superseded)
+    orphan = age_file(os.path.join(artifact_store.artifact_folder, '1', 'ab', 'ab12-custom_cv.txt.gz'))
+    legacy = age_file(os.path.join(artifact_store.upload_folder, 'cover_letter_1_20240101.txt'))
+
+    stats = artifact_store.sweep(dry_run=True)
+
+    assert (stats['unreferenced'], stats['orphan_files'], stats['legacy_files']) == (1, 1, 1)
+    assert stats['bytes_freed'] > 0
+    assert all(os.path.exists(path) for path in (superseded, orphan, legacy))
+    assert GeneratedArtifact.query.count() == 2
+
+
+def test_zero_retention_days_is_honoured(app, job):
+    superseded = artifact_store.save('First draft', 'custom_cv', job.id)
+    artifact_store.save('Final draft', 'custom_cv', job.id)
+    GeneratedArtifact.query.filter_by(filepath=superseded)\
+        .update({GeneratedArtifact.last_used_at: datetime.utcnow() - timedelta(minutes=1)})
+    db.session.commit()
+
+    assert artifact_store.sweep()['unreferenced'] == 0
+    assert artifact_store.sweep(retention_days=0)['unreferenced'] == 1
+    assert not os.path.exists(superseded)
+
+
+def test_sweep_skips_an_artifact_relinked_after_it_was_selected(app, job, monkeypatch):
+    superseded = artifact_store.save('First draft', 'custom_cv', job.id)
+    artifact_store.save('Final draft', 'custom_cv', job.id)
+    stale(superseded)
+    batches = artifact_store._unreferenced_batches
+
+    def relink_after_select(cutoff, batch_size):
+        for batch in batches(cutoff, batch_size):
+            artifact_store.save('First draft', 'custom_cv', job.id)
+            yield batch
+    monkeypatch.setattr(artifact_store, '_unreferenced_batches', relink_after_select)
+
+    assert artifact_store.sweep()['unreferenced'] == 0
+    assert os.path.exists(superseded)
+    assert Application.query.one().custom_cv_path == superseded
@@ -0,0 +1,73 @@
+import io
+import os
+
+from werkzeug.datastructures import FileStorage
+
+from models import db, StoredBlob, User
+from services.cv_processor import cv_processor
+
+
+def upload(data: bytes, filename: str = 'cv.txt', user_id: int = 1):
+    return cv_processor.store_uploaded_file(FileStorage(stream=io.BytesIO(data), filename=filename), user_id)
+
+
+def test_identical_uploads_share_one_blob(app):
+    first = upload(b'Jane Doe\nPython developer')
+    second = upload(b'Jane Doe\nPython developer')
+
+    assert first.filename != second.filename
+    assert first.filepath == second.filepath
+    blob = StoredBlob.query.one()
+    assert blob.ref_count == 2
+    assert blob.filepath.startswith(os.path.join(cv_processor.blob_folder, '1', blob.sha256[:2]))
+
+
+def test_blob_is_deleted_with_its_last_reference(app):
+    first = upload(b'Jane Doe\nPython developer')
+    upload(b'Jane Doe\nPython developer')
+    filepath = first.filepath
+
+    assert cv_processor.delete_file(filepath)
+    assert os.path.exists(filepath)
+    assert StoredBlob.query.one().ref_count == 1
+
+    assert cv_processor.delete_file(filepath)
+    assert not os.path.exists(filepath)
+    assert StoredBlob.query.count() == 0
+
+
+def test_same_bytes_with_another_extension_get_their_own_blob(app):
+    upload(b'plain text', 'cv.txt')
+    upload(b'plain text', 'cv.doc')
+
+    assert sorted(blob.extension for blob in StoredBlob.query) == ['doc', 'txt']
+
+
+def test_users_do_not_share_blobs(app):
+    db.session.add(User(id=2, name='Other User', email='other@example.com'))
+    db.session.commit()
+
+    mine = upload(b'Jane Doe\nPython developer', user_id=1)
+    theirs = upload(b'Jane Doe\nPython developer', user_id=2)
+
+    assert mine.filepath != theirs.filepath
+    assert [blob.ref_count for blob in StoredBlob.query.order_by(StoredBlob.user_id)] == [1, 1]
+    assert cv_processor.delete_file(theirs.filepath, user_id=2)
+    assert os.path.exists(mine.filepath)
+
+
+def test_wrong_owner_or_repeated_delete_keeps_the_blob(app):
+    db.session.add(User(id=2, name='Other User', email='other@example.com'))
+    db.session.commit()
+    mine = upload(b'Jane Doe\nPython developer')
+    upload(b'Jane Doe\nPython developer')
+    filepath = mine.filepath
+
+    assert not cv_processor.delete_file(filepath, user_id=2)
+    assert not cv_processor.delete_file(filepath, user_id=2)
+    assert StoredBlob.query.one().ref_count == 2
+
+    assert cv_processor.delete_file(filepath)
+    assert cv_processor.delete_file(filepath)
+    assert not cv_processor.delete_file(filepath)
+    assert StoredBlob.query.count() == 0
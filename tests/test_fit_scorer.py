@@ -0,0 +1,52 @@
+from sqlalchemy import event, text
+
+from models import db
+from services.fit_scorer import FitScorer
+
+CV = 'Python developer building Flask APIs on PostgreSQL'
+
+
+def ranked(scorer: FitScorer):
+    return [row['job_id'] for row in scorer.score_jobs(CV)]
+
+
+def count_statements():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    return statements, lambda: event.remove(db.engine, 'before_cursor_execute', record)
+
+
+def test_unchanged_table_is_checked_with_one_query(app, make_job):
+    make_job(title='Python Engineer', description='Flask APIs on PostgreSQL')
+    scorer = FitScorer(user_id=1)
+    scorer.refresh()
+
+    statements, stop = count_statements()
+    try:
+        scorer.refresh()
+        scorer.refresh()
+    finally:
+        stop()
+    assert len(statements) == 2
+
+
+def test_edits_from_other_processes_are_picked_up(app, make_job):
+    python = make_job(title='Python Engineer', description='Flask APIs on PostgreSQL')
+    nurse = make_job(url='https://example.com/jobs/2', title='Nurse', description='Night shifts on a hospital ward')
+    scorer = FitScorer(user_id=1)
+    assert ranked(scorer)[0] == python.id
+
+    # Raw SQL fires no ORM events, as with a write made by another worker
+    db.session.execute(text("UPDATE job SET title = 'Python Developer', description = 'Flask APIs on PostgreSQL', "
+                            "version = version + 1 WHERE id = :id"), {'id': nurse.id})
+    db.session.execute(text("UPDATE job SET title = 'Nurse', description = 'Night shifts on a hospital ward', "
+                            "version = version + 1 WHERE id = :id"), {'id': python.id})
+    db.session.commit()
+    assert ranked(scorer)[0] == nurse.id
+
+    db.session.execute(text('DELETE FROM job WHERE id = :id'), {'id': nurse.id})
+    db.session.commit()
+    assert ranked(scorer) == [python.id]
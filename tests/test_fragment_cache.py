@@ -0,0 +1,75 @@
+from datetime import datetime
+
+from models import db, Job, JobNote, FollowUp
+from services.fragment_cache import FragmentCache
+
+
+def version(job_id: int) -> int:
+    db.session.expire_all()
+    return db.session.get(Job, job_id).version
+
+
+def test_job_edit_bumps_version(app, make_job):
+    job = make_job()
+    assert version(job.id) == 1
+
+    job.status = 'applied'
+    db.session.commit()
+    assert version(job.id) == 2
+
+
+def test_child_writes_bump_the_parent_version(app, make_job):
+    job = make_job()
+    note = JobNote(job_id=job.id, user_id=job.user_id, content='Recruiter called')
+    db.session.add(note)
+    db.session.commit()
+    assert version(job.id) == 2
+
+    note.content = 'Recruiter called back'
+    db.session.commit()
+    assert version(job.id) == 3
+
+    db.session.add(FollowUp(job_id=job.id, user_id=job.user_id, title='Chase', reminder_date=datetime(2024, 6, 1)))
+    db.session.commit()
+    assert version(job.id) == 4
+
+    db.session.delete(note)
+    db.session.commit()
+    assert version(job.id) == 5
+
+
+def test_moving_a_note_bumps_both_jobs(app, make_job):
+    first, second = make_job(), make_job(url='https://example.com/jobs/2')
+    note = JobNote(job_id=first.id, user_id=first.user_id, content='Referral')
+    db.session.add(note)
+    db.session.commit()
+
+    note.job_id = second.id
+    db.session.commit()
+    assert (version(first.id), version(second.id)) == (3, 2)
+
+
+def test_cache_renders_once_per_key_and_evicts_least_recently_used():
+    cache = FragmentCache(max_entries=2)
+    renders = []
+
+    def render(key):
+        return cache.get_or_render(key, lambda: renders.append(key) or f'<div>{key}</div>')
+
+    assert render(('card', 1, 1)) == '<div>(\'card\', 1, 1)</div>'
+    render(('card', 1, 1))
+    render(('card', 2, 1))
+    render(('card', 1, 1))  # now the most recently used
+    render(('card', 3, 1))  # evicts card 2
+    render(('card', 2, 1))
+
+    assert renders == [('card', 1, 1), ('card', 2, 1), ('card', 3, 1), ('card', 2, 1)]
+    assert cache.stats()['evictions'] == 2
+
+
+def test_disabled_cache_always_renders():
+    cache = FragmentCache(max_entries=0)
+    calls = []
+    for _ in range(2):
+        cache.get_or_render(('card', 1, 1), lambda: calls.append(1) or 'x')
+    assert len(calls) == 2
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from models import db, Job, JobNote, JobSignature, User
+from services.job_deduplicator import job_deduplicator
+
+DESCRIPTION = ("We are hiring a backend engineer to design and run the Python services behind our payments "
+               "platform. You will own APIs built with Flask and PostgreSQL, improve observability, review code "
+               "and mentor two junior engineers. Experience with queues, caching and cloud infrastructure helps.")
+
+
+def test_repost_is_flagged_as_duplicate_of_the_older_job(app, make_job):
+    original = make_job(description=DESCRIPTION)
+    repost = make_job(url='https://example.com/jobs/2', description=DESCRIPTION + ' Apply today.')
+    unrelated = make_job(url='https://example.com/jobs/3', title='Nurse',
+                         description='Ward nurse for night shifts at a busy city hospital.')
+
+    match = job_deduplicator.duplicate_of(repost.id)
+    assert match is not None
+    assert match[0].id == original.id
+    assert match[1] >= job_deduplicator.threshold
+    assert job_deduplicator.duplicate_of(original.id) is None
+    assert job_deduplicator.duplicate_of(unrelated.id) is None
+
+
+def test_other_users_jobs_are_never_matched(app, make_job):
+    db.session.add(User(id=2, name='Other User', email='other@example.com'))
+    db.session.commit()
+    make_job(description=DESCRIPTION)
+    theirs = make_job(user_id=2, description=DESCRIPTION)
+
+    assert job_deduplicator.duplicate_of(theirs.id) is None
+
+
+def test_merge_folds_the_duplicate_into_the_original(app, make_job):
+    original = make_job(description=DESCRIPTION, location=None)
+    duplicate = make_job(url='https://example.com/jobs/2', description=DESCRIPTION, location='Remote',
+                         status='interview', date_applied=datetime(2024, 5, 1))
+    db.session.add(JobNote(job_id=duplicate.id, user_id=duplicate.user_id, content='Phone screen booked'))
+    db.session.commit()
+    copy = make_job(url='https://example.com/jobs/3', description=DESCRIPTION)
+    original_id, duplicate_id = original.id, duplicate.id
+
+    assert job_deduplicator.merge(duplicate_id, original_id)
+
+    db.session.expire_all()
+    assert db.session.get(Job, duplicate_id) is None
+    merged = db.session.get(Job, original_id)
+    assert merged.status == 'interview'
+    assert merged.location == 'Remote'
+    assert merged.date_applied == datetime(2024, 5, 1)
+    assert [note.content for note in merged.notes] == ['Phone screen booked']
+    # Jobs flagged against the merged-away copy now point at the original
+    assert JobSignature.query.filter_by(job_id=copy.id).one().duplicate_of_id == original_id
+
+
+def test_merge_refuses_a_job_into_itself(app, make_job):
+    job = make_job()
+    assert not job_deduplicator.merge(job.id, job.id)
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import db, Job, SavedSearch
+from services.search_scheduler import SearchScheduler, WATERMARK_SLACK_HOURS
+
+
+class FakeScraper:
+    """Stands in for JobScraper.search_sites with canned per-site results"""
+
+    jobspy_hours_old = 72
+
+    def __init__(self, results=None):
+        self.results = results or []
+        self.calls = []
+
+    def search_sites(self, sites, search_term, location, results_wanted, hours_old, country, fresh=False):
+        self.calls.append({'sites': sites, 'hours_old': hours_old})
+        return iter(self.results)
+
+
+def posting(url, date_posted=None, title='Python Engineer'):
+    return {'url': url, 'title': title, 'company': 'Example Corp', 'description': 'Build APIs in Python.',
+            'location': 'Remote', 'salary': None, 'job_type': 'fulltime', 'date_posted': date_posted}
+
+
+@pytest.fixture
+def saved_search(app):
+    search = SavedSearch(user_id=1, name='Python', search_term='python', sites='indeed,linkedin',
+                         watermark=datetime(2024, 5, 10, 9, 0))
+    db.session.add(search)
+    db.session.commit()
+    return search
+
+
+def test_hours_old_without_watermark_uses_the_search_limit():
+    scheduler = SearchScheduler(scraper=FakeScraper())
+    now = datetime(2024, 5, 11)
+
+    assert scheduler.hours_old(SavedSearch(hours_old=None), now) == 72
+    assert scheduler.hours_old(SavedSearch(hours_old=24), now) == 24
+
+
+def test_hours_old_is_narrowed_to_the_time_since_the_watermark():
+    scheduler = SearchScheduler(scraper=FakeScraper())
+    now = datetime(2024, 5, 11, 12, 0)
+    search = SavedSearch(hours_old=None, watermark=now - timedelta(hours=9, minutes=30))
+
+    assert scheduler.hours_old(search, now) == 10 + WATERMARK_SLACK_HOURS
+    # A narrower limit on the search itself still wins
+    search.hours_old = 12
+    assert scheduler.hours_old(search, now) == 12
+    # 0 means any age, so only the watermark limits it
+    search.hours_old = 0
+    assert scheduler.hours_old(search, now) == 10 + WATERMARK_SLACK_HOURS
+
+
+def test_run_skips_stale_and_tracked_postings(app, saved_search, make_job):
+    make_job(url='https://example.com/jobs/tracked')
+    scraper = FakeScraper([
+        {'site': 'indeed', 'error': None, 'duplicates': 1, 'jobs': [
+            posting('https://example.com/jobs/old', '2024-05-09'),
+            posting('https://example.com/jobs/same-day', '2024-05-10'),
+            posting('https://example.com/jobs/undated'),
+            posting('https://example.com/jobs/tracked', '2024-05-11'),
+        ]},
+        {'site': 'linkedin', 'error': None, 'duplicates': 0, 'jobs': [
+            posting('https://example.com/jobs/new', '2024-05-11'),
+        ]},
+    ])
+    scheduler = SearchScheduler(scraper=scraper)
+    scheduler.init_app(app)
+
+    stats = scheduler.run(saved_search.id)
+
+    assert stats['status'] == 'success'
+    assert (stats['fetched'], stats['new'], stats['stale'], stats['duplicates']) == (6, 3, 1, 2)
+    urls = {url for (url,) in db.session.query(Job.url)}
+    assert urls == {'https://example.com/jobs/tracked', 'https://example.com/jobs/same-day',
+                    'https://example.com/jobs/undated', 'https://example.com/jobs/new'}
+    assert scraper.calls[0]['hours_old'] is not None
+
+
+def test_watermark_only_moves_after_a_clean_run(app, saved_search):
+    watermark = saved_search.watermark
+    scraper = FakeScraper([
+        {'site': 'indeed', 'error': None, 'duplicates': 0, 'jobs': [posting('https://example.com/jobs/new')]},
+        {'site': 'linkedin', 'error': 'Search failed on linkedin', 'duplicates': 0, 'jobs': []},
+    ])
+    scheduler = SearchScheduler(scraper=scraper)
+    scheduler.init_app(app)
+
+    assert scheduler.run(saved_search.id)['status'] == 'partial'
+    db.session.expire_all()
+    assert db.session.get(SavedSearch, saved_search.id).watermark == watermark
+
+    scraper.results = scraper.results[:1]
+    assert scheduler.run(saved_search.id)['status'] == 'success'
+    db.session.expire_all()
+    assert db.session.get(SavedSearch, saved_search.id).watermark > watermark
+
+
+def test_claimed_search_is_not_run_again(app, saved_search):
+    scheduler = SearchScheduler(scraper=FakeScraper())
+    scheduler.init_app(app)
+
+    assert scheduler.claim(saved_search.id)
+    assert not scheduler.claim(saved_search.id)
+    assert scheduler.run_now(saved_search.id) is None
+    db.session.expire_all()
+    assert scheduler.is_running(db.session.get(SavedSearch, saved_search.id))
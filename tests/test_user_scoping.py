@@ -0,0 +1,112 @@
+import asyncio
+import io
+import json
+import os
+import types
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from models import db, Application, GeneratedArtifact, Job, StoredBlob, User
+from services.artifact_store import artifact_store
+from services.cv_processor import cv_processor
+
+
+@pytest.fixture
+def other_user(app):
+    db.session.add(User(id=2, name='Other User', email='other@example.com'))
+    db.session.commit()
+    return 2
+
+
+@pytest.fixture
+def client_as(app, other_user):
+    """Test client whose session signs requests in as the given user"""
+    def make(user_id):
+        client = app.test_client()
+        with client.session_transaction() as user_session:
+            user_session['user_id'] = user_id
+        return client
+    return make
+
+
+def upload(data: bytes, user_id: int):
+    return cv_processor.store_uploaded_file(FileStorage(stream=io.BytesIO(data), filename='cv.txt'), user_id)
+
+
+def test_other_users_job_is_not_found(app, make_job, client_as):
+    job = make_job()
+    client = client_as(2)
+
+    assert client.get(f'/job/{job.id}').status_code == 404
+    assert client.post('/update_job_status', json={'job_id': job.id, 'status': 'applied'}).status_code == 404
+    assert client.post(f'/delete_job/{job.id}').status_code == 404
+    db.session.expire_all()
+    assert db.session.get(Job, job.id).status == 'saved'
+    assert client_as(1).get(f'/job/{job.id}').status_code == 200
+
+
+def test_other_users_cv_document_is_not_found(app, client_as):
+    document = upload(b'Jane Doe\nPython developer', user_id=1)
+    cv_processor.mark_extraction(document.id, 'done')
+    client = client_as(2)
+
+    assert client.get(f'/cv_documents/{document.id}/status').status_code == 404
+    assert client.get(f'/get_cv_text/{document.filename}').get_json()['success'] is False
+    assert client.get('/get_cv_list').get_json()['cvs'] == []
+    assert client_as(1).get(f'/cv_documents/{document.id}/status').get_json()['status'] == 'done'
+
+
+def test_other_user_cannot_touch_my_blob(app, other_user):
+    mine = upload(b'Jane Doe\nPython developer', user_id=1)
+    upload(b'Jane Doe\nPython developer', user_id=other_user)
+
+    assert not cv_processor.delete_file(mine.filepath, user_id=other_user)
+    blob = StoredBlob.query.filter_by(user_id=1).one()
+    assert (blob.filepath, blob.ref_count) == (mine.filepath, 1)
+    assert os.path.exists(mine.filepath)
+
+
+def test_other_user_cannot_touch_my_artifact(app, make_job, other_user):
+    mine = make_job()
+    theirs = make_job(user_id=other_user, url='https://example.com/jobs/2')
+    my_path = artifact_store.save('Dear hiring manager', 'cover_letter', mine.id, 1)
+    mine_before = GeneratedArtifact.query.filter_by(user_id=1).one().last_used_at
+
+    their_path = artifact_store.save('Dear hiring manager', 'cover_letter', theirs.id, other_user)
+
+    assert their_path != my_path
+    artifact = GeneratedArtifact.query.filter_by(user_id=1).one()
+    assert (artifact.filepath, artifact.last_used_at) == (my_path, mine_before)
+    assert Application.query.filter_by(user_id=1).one().cover_letter_path == my_path
+    assert Application.query.filter_by(user_id=other_user).one().cover_letter_path == their_path
+
+
+def test_async_ai_endpoint_hides_other_users_jobs(app, make_job, client_as, monkeypatch):
+    import asgi
+
+    job = make_job()
+
+    class Messages:
+        async def create(self, **kwargs):
+            return types.SimpleNamespace(content=[types.SimpleNamespace(text='Tailored CV')], usage=None)
+    monkeypatch.setattr(asgi.async_ai_service, 'client', types.SimpleNamespace(messages=Messages()))
+
+    def call(user_id):
+        client = client_as(user_id)
+        cookie = client.get_cookie(app.config['SESSION_COOKIE_NAME'])
+        scope = {'type': 'http', 'method': 'POST', 'path': f'/api/ai/customize_cv/{job.id}', 'query_string': b'',
+                 'headers': [(b'cookie', f'{cookie.key}={cookie.value}'.encode())]}
+        messages = [{'type': 'http.request', 'body': json.dumps({'cv_text': 'CV'}).encode()}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+        asyncio.run(asgi.application(scope, receive, send))
+        return sent[0]['status']
+
+    assert call(2) == 404
+    assert call(1) == 200
@@ -0,0 +1,12 @@
+"""
+WSGI entry point for production.
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+``python app.py`` remains the development server. Startup migration,
+warm-up and shutdown are the ``migrate``, ``warm_up`` and ``shut_down``
+functions in app.py; gunicorn.conf.py calls them from its server hooks.
+"""
+from app import app
+
+application = app